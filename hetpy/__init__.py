@@ -30,10 +30,18 @@ from .models.edge import Edge
 from .models.hetGraph import HetGraph
 from .models.hetPaths import HetPaths, NodeTypeTuple, EdgeTypeMapping
 from .models.metaPath import MetaPath
+from .models.projectionCache import ProjectionCache
+from .models.blockedProjection import BlockedProjection
+from .models.projectionPlan import ProjectionPlan
 
 # Enums
-from .enums.projectionEnums import CombineEdgeTypes
+from .enums.projectionEnums import CombineEdgeTypes, ProjectionEngine, InstanceCountMode, EvaluationOrder
+from .enums.nodeIdEnums import NodeIdStrategy
 
 # Util Functions
 from .graphUtils.graphCreationUtils import fromCSV, from_iGraph, from_json
-from .graphUtils.metaProjections import create_meta_projection
+from .graphUtils.metaProjections import create_meta_projection, create_meta_projections, find_meta_path_instances, count_meta_path_instances, plan_meta_projection, stream_meta_projection, write_meta_projection, create_blocked_meta_projection
+from .graphUtils.maintainedProjections import MaintainedProjection
+from .graphUtils.metaPathSimilarity import pathsim_topk, pathsim_topk_all
+from .graphUtils.randomWalks import metapath_random_walks
+from .utils.utils import setNodeIdStrategy
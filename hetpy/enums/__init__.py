@@ -1 +1,2 @@
-from .projectionEnums import CombineEdgeTypes
\ No newline at end of file
+from .projectionEnums import CombineEdgeTypes, ProjectionEngine, InstanceCountMode, EvaluationOrder
+from .nodeIdEnums import NodeIdStrategy
\ No newline at end of file
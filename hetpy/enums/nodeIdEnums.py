@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class NodeIdStrategy(Enum):
+    UUID = "uuid"
+    SEQUENTIAL = "sequential"
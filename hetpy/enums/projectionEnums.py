@@ -4,3 +4,20 @@ from enum import Enum
 class CombineEdgeTypes(Enum):
     NONE = None
     SUM = "sum"
+
+
+class ProjectionEngine(Enum):
+    TRAVERSAL = "traversal"
+    MATRIX = "matrix"
+
+
+class InstanceCountMode(Enum):
+    TOTAL = "total"
+    SOURCE = "source"
+    PAIR = "pair"
+
+
+class EvaluationOrder(Enum):
+    LEFT_TO_RIGHT = "left_to_right"
+    RIGHT_TO_LEFT = "right_to_left"
+    MATRIX_CHAIN = "matrix_chain"
@@ -2,7 +2,8 @@ class TypeException(Exception):
     """
     An exception to throw when the type of some object is undefined or invalid.
     """
-    def __init__(self, details):            
+    def __init__(self, details, mismatches: dict = None):            
         # Call the base class constructor with the parameters it needs
         message = f"A type error occured: {details}"
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
+        self.mismatches = {} if mismatches is None else mismatches
\ No newline at end of file
@@ -2,6 +2,7 @@ from typing import List
 from hetpy.exceptions.commonExceptions import NotDefinedException
 
 from hetpy.models import Node, Edge, HetGraph, HetPaths, MetaPath
+from hetpy.utils.utils import reserveNodeIds
 
 import pandas as pd
 import igraph as ig
@@ -45,7 +46,7 @@ def fromCSV(filepath: str,type_column: str, connection_column: str, consider_edg
     nodes = []
     edges = []
 
-    index_to_nodeid_map = {}
+    index_to_node_map = {}
 
     # preliminary create all nodes. Needed to create correct edge objects.
     for row in data.to_dict("records"):
@@ -53,17 +54,17 @@ def fromCSV(filepath: str,type_column: str, connection_column: str, consider_edg
         for key, value in node_attribute_column_map.items():
             node_attributes[key] = row[value]
         node = Node(row[type_column], node_attributes)
-        index_to_nodeid_map[str(row[index_column])] = node.id
+        index_to_node_map[str(row[index_column])] = node
         nodes.append(node)
     
     for row in data.to_dict("records"):
         for entry in literal_eval(row[connection_column]):
-            source = nodes[[node.id for node in nodes].index(index_to_nodeid_map[str(row[index_column])])]
-            target = nodes[[node.id for node in nodes].index(index_to_nodeid_map[str(entry)])]
+            source = index_to_node_map[str(row[index_column])]
+            target = index_to_node_map[str(entry)]
             edge = Edge(source, target, directed=consider_edge_directions)
             edges.append(edge)
 
-    hetGraph = HetGraph(nodes, edges, **graphArgs)
+    hetGraph = HetGraph(nodes, edges, **{"copy": False, **graphArgs})
 
     return hetGraph
 
@@ -99,7 +100,7 @@ def from_iGraph(graph: ig.Graph, type_attribute: str = "Type", path_list: HetPat
     nodes = [Node(vertex[type_attribute], attributes={**{name: vertex[name] for name in attribute_names}, "iGraphIndex": vertex.index}) for vertex in graph.vs]
     #nodes_by_original_index = {node.attributes["iGraphIndex"]: node for node in nodes}
     edges = [Edge(nodes[edge.source], nodes[edge.target], directed=graph.is_directed(), type=edge[type_attribute] if type_attribute in edge.attribute_names() else '', attributes={**{name: edge[name] for name in edge.attribute_names()}, "iGraphIndex": edge.index}) for edge in graph.es]
-    het_graph = HetGraph(nodes, edges, path_list, meta_paths)
+    het_graph = HetGraph(nodes, edges, path_list, meta_paths, copy=False)
     return het_graph
 
 
@@ -118,15 +119,15 @@ def from_json(filepath: str) -> HetGraph:
 
     nodes = []
     for defined_node in data["nodes"]:
-        node_object = Node(type=defined_node["type"], attributes=defined_node["attributes"])
-        if "id" in defined_node.keys():
-            node_object.id  = defined_node["id"] #overwrite id to preserve defined one
+        node_object = Node(type=defined_node["type"], attributes=defined_node["attributes"], id=defined_node.get("id")) # preserve defined ids
         nodes.append(node_object)
+    nodes_by_id = {node.id: node for node in nodes}
+    reserveNodeIds(nodes_by_id.keys())
 
     edges = []
     for defined_edge in data["edges"]:
-        source_node = nodes[[node.id for node in nodes].index(defined_edge["source"])]
-        target_node = nodes[[node.id for node in nodes].index(defined_edge["target"])]
+        source_node = nodes_by_id[defined_edge["source"]]
+        target_node = nodes_by_id[defined_edge["target"]]
         edge = Edge(source = source_node, target = target_node, directed = defined_edge["directed"], type = defined_edge["type"], attributes = defined_edge["attributes"])
         edges.append(edge)
     
@@ -139,9 +140,9 @@ def from_json(filepath: str) -> HetGraph:
 
     meta_paths = []
     for meta_path_definition in data["meta_path_definitions"]:
-        meta_paths.append(MetaPath(path=meta_path_definition["path"], description=meta_path_definition["description"], abbreviation=meta_path_definition["abbreviation"]))
+        meta_paths.append(MetaPath(path=meta_path_definition["path"], description=meta_path_definition["description"], abbreviation=meta_path_definition["abbreviation"], directed=meta_path_definition.get("directed", False)))
 
-    return HetGraph(nodes=nodes, edges=edges, path_list = paths, meta_paths=meta_paths)
+    return HetGraph(nodes=nodes, edges=edges, path_list = paths, meta_paths=meta_paths, copy=False)
 
 
 
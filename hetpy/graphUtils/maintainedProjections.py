@@ -0,0 +1,242 @@
+from collections import Counter
+from copy import deepcopy
+
+from typing import List
+
+from hetpy.models import MetaPath, HetGraph, HetPaths
+from hetpy.models.edge import Edge
+
+from hetpy.exceptions.commonExceptions import NotDefinedException
+
+
+class MaintainedProjection:
+    """
+    A meta projection that stays up to date while its graph changes. The projection subscribes to the changes of the graph and patches the weights of its
+    edges whenever edges are added or deleted instead of being recomputed.
+
+    The projection counts meta path instances like the commuting matrix of the MATRIX projection engine with summed edge weights: every edge can be used
+    in both directions unless the meta path is directed, multi-edges are collapsed and instances that return to their starting node are dropped.
+    When a connection between two nodes appears or disappears, only the instances through that connection are counted: for the commuting matrix
+    A_1 ... A_k of the meta path the change is the sum of A_1 ... A_(i-1) D_i A'_(i+1) ... A'_k over all positions i, where D_i is the change of the
+    adjacency matrix at position i and A' are the adjacency matrices after the change.
+    """
+
+    graph: HetGraph
+    """The graph that the projection is maintained for."""
+
+    metapath: MetaPath
+    """The meta path that the projection is based on."""
+
+    directed: bool
+    """Whether the edges of the projection are directed."""
+
+    projection: HetGraph
+    """The projection graph. Its edges carry the number of meta path instances between their nodes as Weight attribute."""
+
+    counts: dict
+    """Maps the (source id, target id) pairs of the projection edges to the number of meta path instances between them."""
+
+    def __init__(self, graph: HetGraph, metapath: MetaPath, directed: bool = False) -> None:
+        """
+        Counts the meta path instances of the graph, creates the projection and subscribes to the changes of the graph.
+
+        Parameters
+        ----------
+            graph : hetpy.HetGraph
+                The graph that the projection is maintained for.
+            metapath : hetpy.MetaPath
+                The meta path that the projection is based on. It has to be defined on the graph.
+            directed : bool
+                Specifies whether the projection graph should be a directed graph or not.
+
+        Raises
+        ----------
+            NotDefinedException
+                Raised when the meta path is not defined on the graph.
+        """
+        if metapath.path not in [metapath.path for metapath in graph.meta_paths]:
+            raise NotDefinedException(f"The metapath {metapath.abbreviation} you are trying to use as a projection is not defined on the graph you are trying to compress.")
+        self.graph = graph
+        self.metapath = metapath
+        self.directed = directed
+        self.__build()
+        graph.add_listener(self)
+
+    def close(self) -> None:
+        """
+        Stops maintaining the projection. The projection keeps its current state.
+        """
+        self.graph.remove_listener(self)
+
+    def __build(self) -> None:
+        """
+        Indexes the adjacency of the graph by edge type, counts all meta path instances and creates the projection graph.
+        """
+        self.__startingType, self.__endingType = self.__endTypes(self.graph.paths, self.metapath)
+        self.__forward = {edge_type: {} for edge_type in self.metapath.path}
+        self.__backward = {edge_type: {} for edge_type in self.metapath.path}
+        self.__multiplicity = Counter()
+        self.__nodes = {node.id: node for node in self.graph.nodes}
+        for edge in self.graph.edges:
+            if self.__changeMultiplicity(edge, 1):
+                self.__changeAdjacency(edge, 1)
+
+        self.counts = {}
+        for node in self.graph.nodes:
+            if node.type == self.__startingType:
+                for target, count in self.__propagate({node.id: 1}, range(len(self.metapath.path)), self.__forward).items():
+                    if target != node.id and self.__nodes[target].type == self.__endingType:
+                        self.counts[(node.id, target)] = count
+
+        self.__projectionNodes = {}
+        self.__degrees = Counter()
+        for source, target in self.counts:
+            for node_id in (source, target):
+                if node_id not in self.__projectionNodes:
+                    self.__projectionNodes[node_id] = deepcopy(self.__nodes[node_id])
+                self.__degrees[node_id] += 1
+        edges = [Edge(self.__projectionNodes[source], self.__projectionNodes[target], self.directed, self.metapath.abbreviation, {'Weight': count}) for (source, target), count in self.counts.items()]
+        projection_path = ((self.__startingType, self.__endingType), self.metapath.abbreviation)
+        self.projection = HetGraph(nodes = list(self.__projectionNodes.values()), edges = edges, path_list = HetPaths([projection_path]), copy = False)
+
+    @staticmethod
+    def __endTypes(paths: HetPaths, metapath: MetaPath) -> tuple:
+        """
+        Determines the node types that instances of the meta path start and end at, in the same way as create_meta_projection.
+        """
+        starting_type = ''
+        ending_type = ''
+        for key, edge_type in paths.items():
+            if edge_type == metapath.path[0]:
+                starting_type = key[0]
+            if edge_type == metapath.path[-1]:
+                ending_type = key[1]
+        return starting_type, ending_type
+
+    def __orientations(self, edge: Edge) -> List[tuple]:
+        """
+        Returns the directions of an edge together with the edge type that the path definitions assign to them, if the meta path uses it.
+        Directed meta paths only use directed edges from their source to their target.
+        """
+        orientations = []
+        directions = [(edge.source, edge.target)] if self.metapath.directed and edge.directed else [(edge.source, edge.target), (edge.target, edge.source)]
+        for source, target in directions:
+            edge_type = self.graph.paths.get((source.type, target.type))
+            if edge_type in self.__forward:
+                orientations.append((source.id, target.id, edge_type))
+        return orientations
+
+    def __changeMultiplicity(self, edge: Edge, change: int) -> bool:
+        """
+        Counts the edges between two nodes. Returns whether the first edge between them appeared or the last one disappeared. Self loops are ignored.
+        Directed meta paths count both directions of directed edges separately.
+        """
+        if edge.source.id == edge.target.id:
+            return False
+        key = (edge.source.id, edge.target.id) if self.metapath.directed and edge.directed else frozenset((edge.source.id, edge.target.id))
+        self.__multiplicity[key] += change
+        if self.__multiplicity[key] == 0:
+            del self.__multiplicity[key]
+            return True
+        return change > 0 and self.__multiplicity[key] == 1
+
+    def __changeAdjacency(self, edge: Edge, change: int) -> None:
+        """
+        Adds the connection of an edge to the typed adjacency or removes it.
+        """
+        self.__nodes[edge.source.id] = edge.source
+        self.__nodes[edge.target.id] = edge.target
+        for source, target, edge_type in self.__orientations(edge):
+            if change > 0:
+                self.__forward[edge_type].setdefault(source, set()).add(target)
+                self.__backward[edge_type].setdefault(target, set()).add(source)
+            else:
+                self.__forward[edge_type][source].discard(target)
+                self.__backward[edge_type][target].discard(source)
+
+    def __propagate(self, vector: dict, positions, adjacency: dict) -> dict:
+        """
+        Multiplies a sparse vector with the typed adjacency matrices of the meta path at the given positions.
+        """
+        for position in positions:
+            neighbours = adjacency[self.metapath.path[position]]
+            result = Counter()
+            for node_id, count in vector.items():
+                for neighbour in neighbours.get(node_id, ()):
+                    result[neighbour] += count
+            vector = result
+        return vector
+
+    def __changeConnection(self, edge: Edge, change: int) -> None:
+        """
+        Updates the instance counts when the first edge between two nodes was added or the last one was deleted.
+        """
+        if not self.__changeMultiplicity(edge, change):
+            return
+        entries = [(position, source, target) for source, target, edge_type in self.__orientations(edge) for position, step_type in enumerate(self.metapath.path) if step_type == edge_type]
+        # the instances that lead to the changed connection are counted before the change, the ones that continue from it after the change
+        prefixes = [self.__propagate({source: 1}, range(position - 1, -1, -1), self.__backward) for position, source, _ in entries]
+        self.__changeAdjacency(edge, change)
+        suffixes = [self.__propagate({target: 1}, range(position + 1, len(self.metapath.path)), self.__forward) for position, _, target in entries]
+
+        delta = Counter()
+        for prefix, suffix in zip(prefixes, suffixes):
+            starts = [(node_id, count) for node_id, count in prefix.items() if self.__nodes[node_id].type == self.__startingType]
+            ends = [(node_id, count) for node_id, count in suffix.items() if self.__nodes[node_id].type == self.__endingType]
+            for start, start_count in starts:
+                for end, end_count in ends:
+                    if start != end:
+                        delta[(start, end)] += change * start_count * end_count
+        for key, count in delta.items():
+            if count != 0:
+                self.__updateCount(key, self.counts.get(key, 0) + count)
+
+    def __updateCount(self, key: tuple, count: int) -> None:
+        """
+        Patches the projection edge between two nodes to a new instance count. Edges are added and removed when the count changes from or to zero.
+        """
+        source, target = key
+        if key not in self.counts:
+            for node_id in key:
+                if node_id not in self.__projectionNodes:
+                    self.__projectionNodes[node_id] = deepcopy(self.__nodes[node_id])
+                    self.projection.add_node(self.__projectionNodes[node_id])
+                self.__degrees[node_id] += 1
+            self.projection.add_edge(Edge(self.__projectionNodes[source], self.__projectionNodes[target], self.directed, self.metapath.abbreviation, {'Weight': count}))
+            self.counts[key] = count
+            return
+
+        edge = self.projection.find_edge(self.__projectionNodes[source], self.__projectionNodes[target])
+        if count > 0:
+            edge.attributes['Weight'] = count
+            self.projection._mapEdgeToIGraphEdge(edge)['Weight'] = count
+            self.counts[key] = count
+            return
+
+        self.projection.delete_edge(edge)
+        del self.counts[key]
+        for node_id in key:
+            self.__degrees[node_id] -= 1
+            if self.__degrees[node_id] == 0:
+                del self.__degrees[node_id]
+                self.projection.delete_node(self.__projectionNodes.pop(node_id))
+
+    def on_edges_added(self, edges: List[Edge]) -> None:
+        """
+        Adds the meta path instances through the added edges to the projection.
+        """
+        for edge in edges:
+            self.__changeConnection(edge, 1)
+
+    def on_edges_deleted(self, edges: List[Edge]) -> None:
+        """
+        Removes the meta path instances through the deleted edges from the projection.
+        """
+        for edge in edges:
+            self.__changeConnection(edge, -1)
+
+    def on_paths_changed(self) -> None:
+        """
+        Rebuilds the projection because the path definitions determine the edge types of all connections. The projection attribute refers to a new graph afterwards.
+        """
+        self.__build()
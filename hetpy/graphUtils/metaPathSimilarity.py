@@ -0,0 +1,135 @@
+import weakref
+
+import numpy as np
+
+from typing import List
+
+from hetpy.models import MetaPath, HetGraph
+from hetpy.models.node import Node
+from hetpy.graphUtils.metaProjections import _meta_path_end_types, _typed_adjacency_matrices, _is_symmetric, _half_path_matrix
+
+from hetpy.exceptions.commonExceptions import GraphDefinitionException, NotDefinedException
+from hetpy.exceptions.typeExceptions import TypeException
+
+# the half path indices of every graph, keyed by the edge types and direction of the meta path and the starting type and valid for one version of the graph
+__similarity_indices = weakref.WeakKeyDictionary()
+
+def __half_path_index(graph: HetGraph, metapath: MetaPath, starting_type: str) -> tuple:
+    """
+    Returns the half path matrix C of a symmetric meta path, whose product C C^T is the commuting matrix of the meta path, together with C^T
+    and the squared row norms of C, which are the diagonal of the commuting matrix. Rows of C belong to the nodes of the starting type.
+    The index is cached until the graph changes.
+
+    Returns:
+    -----------
+        half_path_index : tuple
+            The half path matrix, its transpose as CSR matrix, the squared row norms, the ids of the nodes of the rows and a dict that maps them to their rows.
+    """
+    if metapath.path not in [metapath.path for metapath in graph.meta_paths]:
+        raise NotDefinedException(f"The metapath {metapath.abbreviation} you are trying to use is not defined on the graph.")
+    if starting_type not in [source_type for (source_type, _), edge_type in graph.paths.items() if edge_type == metapath.path[0]]:
+        raise TypeException(f"Nodes of type {starting_type} can not start an instance of the metapath {metapath.abbreviation}.")
+    key = (tuple(metapath.path), metapath.directed, starting_type)
+    graph_indices = __similarity_indices.setdefault(graph, {})
+    cached = graph_indices.get(key)
+    if cached is not None and cached[0] == graph.version:
+        return cached[1]
+
+    matrices, type_codes, type_labels = _typed_adjacency_matrices(graph, metapath.path, metapath.directed)
+    if not _is_symmetric(metapath.path, matrices):
+        raise GraphDefinitionException(f"The metapath {metapath.abbreviation} is not symmetric on the graph. PathSim requires a symmetric meta path.")
+
+    rows = np.flatnonzero(type_codes == type_labels.get(starting_type, -1))
+    half_path = _half_path_matrix(metapath.path, matrices, rows)
+    norms = np.asarray(half_path.multiply(half_path).sum(axis=1), dtype=np.float64).ravel()
+    node_ids = graph._vertexNodeIds()
+    row_ids = [node_ids[row] for row in rows.tolist()]
+
+    half_path_index = (half_path, half_path.T.tocsr(), norms, row_ids, {node_id: row for row, node_id in enumerate(row_ids)})
+    graph_indices[key] = (graph.version, half_path_index)
+    return half_path_index
+
+def __top_scores(row: int, columns: np.ndarray, values: np.ndarray, norms: np.ndarray, k: int) -> tuple:
+    """
+    Converts the non-zero entries of a row of the commuting matrix into PathSim scores and selects the k highest ones, without the node itself.
+    """
+    scores = 2 * values / (norms[row] + norms[columns])
+    kept = columns != row
+    columns, scores = columns[kept], scores[kept]
+    if len(scores) > k:
+        # keep all nodes that tie with the k-th score, so that ties are broken by node position
+        selected = scores >= -np.partition(-scores, k - 1)[k - 1]
+        columns, scores = columns[selected], scores[selected]
+    order = np.lexsort((columns, -scores))[:k]
+    return columns[order], scores[order]
+
+def pathsim_topk(graph: HetGraph, node: Node, metapath: MetaPath, k: int = 10) -> List[tuple]:
+    """
+    Finds the k nodes that are most similar to a node by their PathSim score on a symmetric meta path. The PathSim score of two nodes x and y is
+    2 M[x, y] / (M[x, x] + M[y, y]), where M is the commuting matrix of the meta path. Only the row of the node in M is computed as the product of its row
+    of the half path matrix with the transposed half path matrix, which only reads the nodes that share a half path endpoint with the node.
+
+    Parameters:
+    -------------
+        graph : hetpy.HetGraph
+            The graph on which the similarity is computed.
+        node : hetpy.Node
+            The node for which similar nodes are searched. The similar nodes have the same type.
+        metapath : hetpy.MetaPath
+            A symmetric meta path that is defined on the graph, like author-paper-author.
+        k : int
+            The number of returned nodes. Defaults to 10.
+
+    Returns:
+    --------------
+        similar_nodes : List[tuple]
+            Up to k (node id, score) tuples ordered by decreasing score. Nodes without a meta path instance to the node are left out.
+
+    Raises:
+    --------------
+        TypeException: Raised when instances of the meta path can not start at nodes of the type of the node.
+        NotDefinedException: Raised when the node is not part of the graph.
+    """
+    half_path, transposed, norms, row_ids, id_rows = __half_path_index(graph, metapath, node.type)
+    row = id_rows.get(node.id)
+    if row is None:
+        raise NotDefinedException(f"The node {node.id} is not a node of type {node.type} in the graph.")
+
+    products = half_path[row] @ transposed
+    columns, scores = __top_scores(row, products.indices, products.data, norms, k)
+    return [(row_ids[column], score) for column, score in zip(columns.tolist(), scores.tolist())]
+
+def pathsim_topk_all(graph: HetGraph, metapath: MetaPath, k: int = 10, block_size: int = 1024, node_type: str = None) -> dict:
+    """
+    Finds the k most similar nodes by their PathSim score on a symmetric meta path for all nodes of a type, see pathsim_topk.
+    The rows of the commuting matrix are computed in blocks, so only block_size rows are held in memory at a time.
+
+    Parameters:
+    -------------
+        graph : hetpy.HetGraph
+            The graph on which the similarity is computed.
+        metapath : hetpy.MetaPath
+            A symmetric meta path that is defined on the graph.
+        k : int
+            The number of similar nodes per node. Defaults to 10.
+        block_size : int
+            The number of rows of the commuting matrix that are computed at once. Defaults to 1024.
+        node_type : str
+            The type of the compared nodes. Defaults to None, which uses the starting type of the meta path.
+
+    Returns:
+    --------------
+        similar_nodes : dict
+            Maps the id of every node of the type to up to k (node id, score) tuples ordered by decreasing score.
+    """
+    if node_type is None:
+        node_type, _ = _meta_path_end_types(graph, metapath)
+    half_path, transposed, norms, row_ids, _ = __half_path_index(graph, metapath, node_type)
+    similar_nodes = {}
+    for first in range(0, len(row_ids), block_size):
+        products = (half_path[first:first + block_size] @ transposed).tocsr()
+        for offset in range(products.shape[0]):
+            entries = slice(products.indptr[offset], products.indptr[offset + 1])
+            columns, scores = __top_scores(first + offset, products.indices[entries], products.data[entries], norms, k)
+            similar_nodes[row_ids[first + offset]] = [(row_ids[column], score) for column, score in zip(columns.tolist(), scores.tolist())]
+    return similar_nodes
@@ -1,47 +1,30 @@
 import igraph as ig
+import numpy as np
+import csv
+import functools
 import itertools
+import multiprocessing
+import os
+import shutil
+import tempfile
+import weakref
+import zipfile
 from collections import Counter
+from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
+from scipy import sparse
 
-from typing import List
+from typing import Iterator, List
 
 
-from hetpy.enums.projectionEnums import CombineEdgeTypes
+from hetpy.enums.projectionEnums import CombineEdgeTypes, ProjectionEngine, InstanceCountMode, EvaluationOrder
 
-from hetpy.models import MetaPath, HetGraph, HetPaths
+from hetpy.models import MetaPath, HetGraph, HetPaths, BlockedProjection, ProjectionPlan
 from hetpy.models.edge import Edge
+from hetpy.models.node import Node
 
 from hetpy.exceptions.commonExceptions import GraphDefinitionException, NotDefinedException
 
-# implement own pairwise function to please python 3.9
-def __pairwise(iterable):
-    a, b = itertools.tee(iterable)
-    next(b, None)
-    return zip(a, b)
-
-
-def __check_path_for_metapath(path: List, path_definitions: HetPaths, metapath: MetaPath) -> bool:
-    """
-    Performs a type by type string comparison of a list of nodes quals the list of node types that a meta path constructs.
-    
-    Properties:
-    --------------
-        path : list
-            The sequence of vertices that needs to be checked.
-        path_definitions: hetpy.HetPaths
-            The list of node type to edge mappings that are defined on the graph.
-        metapath : hetpy.MetaPath
-            The metapath to which the actual path instance shall be compared
-    """
-    actual_edge_types = []
-    for t in __pairwise(path):
-        try:
-            defined_edge_type = path_definitions[(t[0]["Type"],t[1]["Type"])]
-            actual_edge_types.append(defined_edge_type)
-        except KeyError:
-            print("The edges of your graph contain an undefined path type. This can especially happen in undirected HetGraph objects. Please check your path definitions, you probably did not define the inverse of some path. Skipping this possible path...")
-            continue
-    return actual_edge_types == metapath.path
-
 def __combine_multi_edges(edges: List[Edge], combine_edges: CombineEdgeTypes) -> List[Edge]:
     """
     Identifies and combines edges that connect the same nodes into a single one. Combination strategies are specified by CombineEdgeTypes enum. 
@@ -72,9 +55,588 @@ def __combine_multi_edges(edges: List[Edge], combine_edges: CombineEdgeTypes) ->
         combined_edges.append(edge)
     return combined_edges
 
+def _meta_path_end_types(graph: HetGraph, metapath: MetaPath) -> tuple:
+    """
+    Determines the node types that instances of a meta path start and end at from the path definitions of the graph.
+    """
+    starting_type = ''
+    ending_type = ''
+    for key, object in graph.paths.items():
+        if object == metapath.path[0]:
+            starting_type = key[0]
+        if object == metapath.path[-1]:
+            ending_type = key[1]
+    return starting_type, ending_type
+
+def __traversal_index(graph: HetGraph, metapath: MetaPath, starting_type: str, ending_type: str) -> tuple:
+    """
+    Prepares the structures that the meta path traversal reads: the node type of every vertex, the node types that can be entered from a node type
+    at every position of the meta path and the neighbours of every vertex. Every edge can be used in both directions, unless the meta path is directed.
+
+    Returns:
+    -----------
+        traversal_index : tuple
+            The prepared structures and the length of the meta path.
+        starting_vertices : List[int]
+            The igraph vertex indices of all vertices of the starting type.
+    """
+    vertex_types = __vertex_types(graph)
+
+    step_targets = [{} for _ in metapath.path]
+    for (source_type, target_type), edge_type in graph.paths.items():
+        for step, step_type in enumerate(metapath.path):
+            if edge_type == step_type and (step < len(metapath.path) - 1 or target_type == ending_type):
+                step_targets[step].setdefault(source_type, []).append(target_type)
+
+    starting_vertices = [index for index, type in enumerate(vertex_types) if type == starting_type]
+    return (vertex_types, step_targets, __adjacency_lists(graph, metapath.directed), len(metapath.path)), starting_vertices
+
+def __meta_path_instances(traversal_index: tuple, starting_vertices: List[int], simple: bool = True):
+    """
+    Enumerates the instances of a meta path hop by hop. Every hop only enters the neighbours whose node type the path definitions map to the edge type
+    that the meta path requires at that position, so other type combinations are never expanded. Multi-edges are collapsed and self loops are never used.
+
+    Parameters:
+    -----------
+        traversal_index : tuple
+            The structures prepared by __traversal_index.
+        starting_vertices : List[int]
+            The igraph vertex indices that instances start at.
+        simple : bool
+            Whether instances must not visit a vertex twice.
+
+    Yields:
+    -----------
+        instance : tuple
+            The igraph vertex indices of a meta path instance.
+    """
+    vertex_types, step_targets, adjacency, length = traversal_index
+    typed_neighbours = {}
+    def neighbours(vertex: int, step: int):
+        if vertex not in typed_neighbours:
+            grouped = {}
+            for neighbour in adjacency[vertex]:
+                grouped.setdefault(vertex_types[neighbour], []).append(neighbour)
+            typed_neighbours[vertex] = grouped
+        grouped = typed_neighbours[vertex]
+        return itertools.chain.from_iterable(grouped.get(target_type, ()) for target_type in step_targets[step].get(vertex_types[vertex], ()))
+
+    for start in starting_vertices:
+        path = [start]
+        visited = {start}
+        frontier = [neighbours(start, 0)]
+        while len(frontier) > 0:
+            vertex = next(frontier[-1], None)
+            if vertex is None:
+                frontier.pop()
+                visited.discard(path.pop())
+                continue
+            if simple and vertex in visited:
+                continue
+            if len(path) == length:
+                yield tuple(path) + (vertex,)
+                continue
+            path.append(vertex)
+            visited.add(vertex)
+            frontier.append(neighbours(vertex, len(path) - 1))
+
+def __instance_end_pairs(traversal_index: tuple, starting_vertices: List[int]) -> List[tuple]:
+    """
+    Returns the first and last vertex of every simple meta path instance that starts at one of the starting vertices.
+    """
+    return [(instance[0], instance[-1]) for instance in __meta_path_instances(traversal_index, starting_vertices)]
+
+def find_meta_path_instances(graph: HetGraph, metapath: MetaPath, simple: bool = True) -> List[List[Node]]:
+    """
+    Finds all instances of a meta path on a graph. The search expands hop by hop and only follows edges that match the meta path at the current position.
+
+    Parameters:
+    -------------
+        graph : hetpy.HetGraph
+            The graph on which the instances are searched.
+        metapath : hetpy.MetaPath
+            The meta path whose instances are searched.
+        simple : bool
+            Whether only instances that do not visit a node twice are returned. Defaults to True.
+
+    Returns:
+    --------------
+        instances : List[List[hetpy.Node]]
+            The nodes of every meta path instance in the order of the meta path.
+    """
+    if metapath.path not in [metapath.path for metapath in graph.meta_paths]:
+        raise NotDefinedException(f"The metapath {metapath.abbreviation} you are trying to use is not defined on the graph.")
+    starting_type, ending_type = _meta_path_end_types(graph, metapath)
+    traversal_index, starting_vertices = __traversal_index(graph, metapath, starting_type, ending_type)
+    nodes = graph.nodes
+    return [[nodes[index] for index in instance] for instance in __meta_path_instances(traversal_index, starting_vertices, simple)]
+
+def count_meta_path_instances(graph: HetGraph, metapath: MetaPath, by: InstanceCountMode = InstanceCountMode.TOTAL, block_size: int = 1024) -> object:
+    """
+    Counts the instances of a meta path without enumerating them. Instances are counted like the commuting matrix of the MATRIX engine,
+    so the counts equal the weights of a projection created with combine_edges="sum" and engine="matrix".
+    The counts per node are propagated hop by hop from the end of the meta path to its start, so counting in total or per source only needs memory
+    linear in the number of nodes. Only if the meta path can return to its starting node, the returning instances are removed with the diagonal of the
+    commuting matrix, the row-wise sums of the elementwise product of the two half path products, which are computed for blocks of start nodes.
+
+    Parameters:
+    -------------
+        graph : hetpy.HetGraph
+            The graph on which the instances are counted.
+        metapath : hetpy.MetaPath
+            The meta path whose instances are counted. It has to be defined on the graph.
+        by : InstanceCountMode
+            TOTAL counts all instances, SOURCE counts the instances per start node and PAIR counts the instances per start and end node. Defaults to TOTAL.
+        block_size : int
+            The number of start nodes whose returning instances are counted at once. Defaults to 1024.
+
+    Returns:
+    --------------
+        counts : int | dict
+            The number of instances for TOTAL. For SOURCE a dict that maps the ids of the start nodes to their number of instances and for PAIR
+            a dict that maps (start id, end id) tuples to their number of instances. Nodes and pairs without instances are left out.
+    """
+    if metapath.path not in [metapath.path for metapath in graph.meta_paths]:
+        raise NotDefinedException(f"The metapath {metapath.abbreviation} you are trying to use is not defined on the graph.")
+    by = InstanceCountMode(by)
+    starting_type, ending_type = _meta_path_end_types(graph, metapath)
+    matrix_index, starting_vertices = __matrix_index(graph, metapath, starting_type, ending_type, planned=by is InstanceCountMode.PAIR)
+    path, matrices, type_codes, ending_code, _ = matrix_index
+
+    if by is InstanceCountMode.PAIR:
+        rows, columns, counts = __commuting_entries(matrix_index, starting_vertices)
+        node_ids = graph._vertexNodeIds()
+        return {(node_ids[row], node_ids[column]): count for row, column, count in zip(rows.tolist(), columns.tolist(), counts.tolist())}
+
+    counts = (type_codes == ending_code).astype(np.int64)
+    for edge_type in reversed(path):
+        counts = matrices[edge_type] @ counts
+    counts = counts[starting_vertices]
+
+    if len(path) > 1 and len(starting_vertices) > 0 and type_codes[starting_vertices[0]] == ending_code:
+        # instances that return to their starting node are the diagonal of the commuting matrix P Q, the row-wise sums of P * Q^T
+        half = len(path) // 2
+        transposed = {edge_type: matrices[edge_type].T.tocsr() for edge_type in path[half:]}
+        for first in range(0, len(starting_vertices), block_size):
+            block = starting_vertices[first:first + block_size]
+            prefix = matrices[path[0]][block]
+            for edge_type in path[1:half]:
+                prefix = prefix @ matrices[edge_type]
+            suffix = transposed[path[-1]][block]
+            for edge_type in reversed(path[half:-1]):
+                suffix = suffix @ transposed[edge_type]
+            counts[first:first + len(block)] -= np.asarray(prefix.multiply(suffix).sum(axis=1)).ravel().astype(counts.dtype)
+
+    if by is InstanceCountMode.TOTAL:
+        return int(counts.sum())
+    node_ids = graph._vertexNodeIds()
+    return {node_ids[vertex]: int(count) for vertex, count in zip(starting_vertices.tolist(), counts.tolist()) if count != 0}
+
+# the attribute-free adjacency structures of every graph, valid for one version of the graph
+__adjacency_cache = weakref.WeakKeyDictionary()
+
+def __cached_adjacency(graph: HetGraph, key: tuple, build) -> object:
+    """
+    Returns a structure that is derived from the adjacency of a graph and builds it on first use. The structures are shared by all projections
+    until the graph changes. Positions only change when deleted elements are compacted, which every deletion precedes with a new version.
+    """
+    entry = __adjacency_cache.get(graph)
+    if entry is None or entry[0] != graph.version:
+        entry = (graph.version, {})
+        __adjacency_cache[graph] = entry
+    if key not in entry[1]:
+        entry[1][key] = build()
+    return entry[1][key]
+
+def __vertex_types(graph: HetGraph) -> list:
+    """
+    Returns the node type of every vertex.
+    """
+    return __cached_adjacency(graph, ("vertex_types",), lambda: graph.graph.vs["Type"])
+
+def __vertex_type_codes(graph: HetGraph) -> tuple:
+    """
+    Returns the integer code of the node type of every vertex and the dict that maps the node types to their codes.
+    """
+    def build() -> tuple:
+        vertex_types = __vertex_types(graph)
+        type_labels = {}
+        type_codes = np.fromiter((type_labels.setdefault(type, len(type_labels)) for type in vertex_types), dtype=np.int64, count=len(vertex_types))
+        return type_codes, type_labels
+    return __cached_adjacency(graph, ("vertex_type_codes",), build)
+
+def __edge_arrays(graph: HetGraph, follow_direction: bool) -> tuple:
+    """
+    Returns the source and target vertex of every connection of the graph, ordered by source and target. Without following the direction of the edges,
+    every edge connects its nodes in both directions. Edges of undirected graphs have no direction to follow. Multi-edges are collapsed and self loops are left out, because meta path instances never use them.
+    """
+    def build() -> tuple:
+        edge_list = np.asarray(graph.graph.get_edgelist(), dtype=np.int64).reshape(-1, 2)
+        sources, targets = edge_list[:, 0], edge_list[:, 1]
+        if not (follow_direction and graph.graph.is_directed()):
+            sources, targets = np.concatenate((sources, targets)), np.concatenate((targets, sources))
+        no_loops = sources != targets
+        sources, targets = sources[no_loops], targets[no_loops]
+        order = np.lexsort((targets, sources))
+        sources, targets = sources[order], targets[order]
+        unique = np.ones(len(sources), dtype=bool)
+        unique[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+        return sources[unique], targets[unique]
+    return __cached_adjacency(graph, ("edges", follow_direction), build)
+
+def __adjacency_lists(graph: HetGraph, follow_direction: bool) -> list:
+    """
+    Returns the neighbours of every vertex in ascending order, see __edge_arrays.
+    """
+    def build() -> list:
+        sources, targets = __edge_arrays(graph, follow_direction)
+        bounds = np.cumsum(np.bincount(sources, minlength=graph.graph.vcount()))[:-1]
+        return [neighbours.tolist() for neighbours in np.split(targets, bounds)]
+    return __cached_adjacency(graph, ("lists", follow_direction), build)
+
+def __typed_adjacency_matrix(graph: HetGraph, edge_type: str, follow_direction: bool) -> sparse.csr_matrix:
+    """
+    Builds the binary sparse adjacency matrix of an edge type. Each direction of a connection belongs to the edge type that the path definitions specify
+    for the node types it connects.
+    """
+    type_codes, type_labels = __vertex_type_codes(graph)
+    sources, targets = __edge_arrays(graph, follow_direction)
+    relation_table = np.zeros((len(type_labels), len(type_labels)), dtype=bool)
+    for (source_type, target_type), path_type in graph.paths.items():
+        if source_type in type_labels and target_type in type_labels and path_type == edge_type:
+            relation_table[type_labels[source_type], type_labels[target_type]] = True
+    selected = relation_table[type_codes[sources], type_codes[targets]]
+    return sparse.csr_matrix((np.ones(np.count_nonzero(selected), dtype=np.int64), (sources[selected], targets[selected])), shape=(len(type_codes), len(type_codes)))
+
+def _typed_adjacency_matrices(graph: HetGraph, edge_types: List[str], follow_direction: bool = False) -> tuple:
+    """
+    Returns one binary sparse adjacency matrix per edge type. Every edge can be used in both directions unless the direction of the edges is followed,
+    and multi-edges are collapsed. The matrices are cached until the graph changes and must not be changed.
+
+    Parameters:
+    -----------
+        graph : hetpy.HetGraph
+            The graph whose adjacency is encoded.
+        edge_types : List[str]
+            The edge types for which matrices are built.
+        follow_direction : bool
+            Whether edges can only be used from their source to their target.
+
+    Returns:
+    -----------
+        matrices : dict
+            Maps every edge type to its adjacency matrix in CSR format.
+        type_codes : numpy.ndarray
+            The integer code of the node type of every vertex.
+        type_labels : dict
+            Maps the node types of the graph to their integer codes.
+    """
+    type_codes, type_labels = __vertex_type_codes(graph)
+    matrices = {edge_type: __cached_adjacency(graph, ("matrix", edge_type, follow_direction), lambda: __typed_adjacency_matrix(graph, edge_type, follow_direction)) for edge_type in dict.fromkeys(edge_types)}
+    return matrices, type_codes, type_labels
+
+def __relation_statistics(graph: HetGraph, metapath: MetaPath, starting_type: str, ending_type: str) -> tuple:
+    """
+    Estimates the number of nodes between the steps of a meta path and the number of entries of the adjacency matrix of every step from the node type
+    and edge type distributions of the graph. An edge between two node types can be used in both directions, so the entries of a step count the edges
+    of the edge types that the path definitions assign to both directions of its node type pairs.
+    """
+    node_counts = graph.get_node_type_dist()
+    edge_counts = graph.get_edge_type_dist()
+    path = metapath.path
+    steps = []
+    for position, edge_type in enumerate(path):
+        pairs = [(source_type, target_type) for (source_type, target_type), step_type in graph.paths.items() if step_type == edge_type]
+        if position == 0:
+            pairs = [pair for pair in pairs if pair[0] == starting_type]
+        if position == len(path) - 1:
+            pairs = [pair for pair in pairs if pair[1] == ending_type]
+        steps.append(pairs)
+
+    dimensions = [node_counts.get(starting_type, 0)]
+    for position in range(1, len(path)):
+        entered = {target_type for _, target_type in steps[position - 1]} & {source_type for source_type, _ in steps[position]}
+        dimensions.append(sum(node_counts.get(type, 0) for type in entered))
+    dimensions.append(node_counts.get(ending_type, 0))
+
+    relation_sizes = []
+    for pairs in steps:
+        edge_types = set()
+        for source_type, target_type in pairs:
+            edge_types.add(graph.paths.get((source_type, target_type)))
+            edge_types.add(graph.paths.get((target_type, source_type)))
+        relation_sizes.append(sum(edge_counts.get(type, 0) for type in edge_types if type is not None))
+    return dimensions, relation_sizes
+
+def __order_cost(order: object, dimensions: list, relation_sizes: list) -> tuple:
+    """
+    Estimates the cost of multiplying sparse matrices in the given order. Multiplying X and Y along a dimension of n nodes takes about nnz(X) nnz(Y) / n
+    multiplications, which also bounds the entries of the product.
+
+    Returns:
+    -----------
+        estimate : tuple
+            The estimated number of multiplications and the estimated number of entries of the product.
+    """
+    if not isinstance(order, tuple):
+        return 0.0, float(relation_sizes[order])
+    left, right = order
+    left_cost, left_entries = __order_cost(left, dimensions, relation_sizes)
+    right_cost, right_entries = __order_cost(right, dimensions, relation_sizes)
+    first, shared, last = __order_span(left)[0], __order_span(right)[0], __order_span(right)[1] + 1
+    multiplications = left_entries * right_entries / max(dimensions[shared], 1)
+    return left_cost + right_cost + multiplications, min(float(dimensions[first]) * dimensions[last], multiplications)
+
+def __order_span(order: object) -> tuple:
+    """
+    Returns the first and last meta path position that an order multiplies.
+    """
+    first = last = order
+    while isinstance(first, tuple):
+        first = first[0]
+    while isinstance(last, tuple):
+        last = last[1]
+    return first, last
+
+def __chain_order(dimensions: list, relation_sizes: list) -> object:
+    """
+    Finds the order with the lowest estimated cost by dynamic programming over all subchains of the meta path, like the matrix chain ordering problem.
+    """
+    length = len(relation_sizes)
+    best = {(position, position): position for position in range(length)}
+    for span in range(2, length + 1):
+        for first in range(length - span + 1):
+            last = first + span - 1
+            candidates = [(best[(first, split)], best[(split + 1, last)]) for split in range(first, last)]
+            best[(first, last)] = min(candidates, key=lambda order: __order_cost(order, dimensions, relation_sizes)[0])
+    return best[(0, length - 1)]
+
+def __plan(graph: HetGraph, metapath: MetaPath, starting_type: str, ending_type: str) -> ProjectionPlan:
+    """
+    Chooses the cheapest of the left to right order, the right to left order and the optimal matrix chain order for a meta path.
+    """
+    dimensions, relation_sizes = __relation_statistics(graph, metapath, starting_type, ending_type)
+    positions = range(len(metapath.path))
+    orders = {EvaluationOrder.LEFT_TO_RIGHT.value: functools.reduce(lambda left, right: (left, right), positions),
+              EvaluationOrder.RIGHT_TO_LEFT.value: functools.reduce(lambda right, left: (left, right), reversed(positions)),
+              EvaluationOrder.MATRIX_CHAIN.value: __chain_order(dimensions, relation_sizes)}
+    costs = {strategy: __order_cost(order, dimensions, relation_sizes)[0] for strategy, order in orders.items()}
+    # the fixed orders win ties, in the order of the dict
+    strategy = min(costs, key=costs.get)
+    return ProjectionPlan(metapath, strategy, orders[strategy], costs, dimensions, relation_sizes)
+
+def plan_meta_projection(graph: HetGraph, metapath: MetaPath) -> ProjectionPlan:
+    """
+    Plans the order in which the MATRIX engine multiplies the typed adjacency matrices of a meta path. The plan compares multiplying from the start of the meta path,
+    from its end and in the optimal matrix chain order, based on the node type and edge type distributions of the graph, and picks the cheapest one.
+    Parts of the order that do not contain the first step are computed once for all start nodes.
+
+    Parameters:
+    -------------
+        graph : hetpy.HetGraph
+            The graph on which the meta path is evaluated.
+        metapath : hetpy.MetaPath
+            The meta path that is planned. It has to be defined on the graph.
+
+    Returns:
+    --------------
+        plan : hetpy.ProjectionPlan
+            The chosen order. Its explain function describes the order and the estimated costs.
+    """
+    if metapath.path not in [metapath.path for metapath in graph.meta_paths]:
+        raise NotDefinedException(f"The metapath {metapath.abbreviation} you are trying to use is not defined on the graph.")
+    starting_type, ending_type = _meta_path_end_types(graph, metapath)
+    return __plan(graph, metapath, starting_type, ending_type)
+
+def __evaluate_order(order: object, path: List[str], matrices: dict, ending_mask) -> sparse.csr_matrix:
+    """
+    Multiplies the typed adjacency matrices of a meta path in the given order. The columns of the last step are restricted to the ending type.
+    """
+    if isinstance(order, tuple):
+        return (__evaluate_order(order[0], path, matrices, ending_mask) @ __evaluate_order(order[1], path, matrices, ending_mask)).tocsr()
+    if order == len(path) - 1:
+        return (matrices[path[order]] @ ending_mask).tocsr()
+    return matrices[path[order]]
+
+def __planned_factors(graph: HetGraph, metapath: MetaPath, starting_type: str, ending_type: str, matrices: dict, ending_vertices: np.ndarray) -> list:
+    """
+    Computes the factors of the commuting matrix of a meta path in the order of its plan.
+    """
+    ending_mask = sparse.diags(ending_vertices.astype(np.int64), dtype=np.int64, format="csr")
+    return [__evaluate_order(order, metapath.path, matrices, ending_mask) for order in __plan(graph, metapath, starting_type, ending_type).factors()]
+
+def __matrix_index(graph: HetGraph, metapath: MetaPath, starting_type: str, ending_type: str, planned: bool = True) -> tuple:
+    """
+    Prepares the typed adjacency matrices of a meta path and the node type codes that the commuting matrix computation reads. If the evaluation is planned,
+    the factors that the rows of the start nodes are multiplied with follow the plan of the meta path. Otherwise they are the matrices of the steps from left to right.
+
+    Returns:
+    -----------
+        matrix_index : tuple
+            The meta path, its typed adjacency matrices, the node type code of every vertex, the code of the ending type and the factors of the commuting matrix.
+        starting_vertices : numpy.ndarray
+            The igraph vertex indices of all vertices of the starting type.
+    """
+    matrices, type_codes, type_labels = _typed_adjacency_matrices(graph, metapath.path, metapath.directed)
+    factors = [matrices[edge_type] for edge_type in metapath.path]
+    if starting_type not in type_labels or ending_type not in type_labels:
+        return (metapath.path, matrices, type_codes, -1, factors), np.empty(0, dtype=np.int64)
+
+    ending_code = type_labels[ending_type]
+    if planned:
+        factors = __planned_factors(graph, metapath, starting_type, ending_type, matrices, type_codes == ending_code)
+    return (metapath.path, matrices, type_codes, ending_code, factors), np.flatnonzero(type_codes == type_labels[starting_type])
+
+def __commuting_entries(matrix_index: tuple, starting_vertices: np.ndarray) -> tuple:
+    """
+    Multiplies the factors of the commuting matrix for the rows of the starting vertices. The entry at (u, v) of the resulting commuting matrix
+    is the number of meta path instances from u to v. Only columns of the ending type are kept and the diagonal is removed.
+
+    Returns:
+    -----------
+        entries : tuple
+            The igraph vertex indices of the rows and columns and the instance counts of all non-zero entries.
+    """
+    _, _, type_codes, ending_code, factors = matrix_index
+    starting_vertices = np.asarray(starting_vertices, dtype=np.int64)
+    commuting_matrix = factors[0][starting_vertices]
+    for factor in factors[1:]:
+        commuting_matrix = commuting_matrix @ factor
+    commuting_matrix = commuting_matrix.tocoo()
+
+    rows = starting_vertices[commuting_matrix.row]
+    kept = (type_codes[commuting_matrix.col] == ending_code) & (rows != commuting_matrix.col) & (commuting_matrix.data != 0)
+    return rows[kept], commuting_matrix.col[kept].astype(np.int64), commuting_matrix.data[kept]
+
+def _is_symmetric(path: List[str], matrices: dict) -> bool:
+    """
+    Checks whether the second half of a meta path retraces its first half backwards on the graph, so that its commuting matrix factors into C C^T
+    for the matrix C of the first half.
+    """
+    return len(path) % 2 == 0 and all((matrices[path[step]] != matrices[path[-1 - step]].T).nnz == 0 for step in range(len(path) // 2))
+
+def _half_path_matrix(path: List[str], matrices: dict, rows: np.ndarray) -> sparse.csr_matrix:
+    """
+    Multiplies the typed adjacency matrices of the first half of a meta path for the given rows.
+    """
+    half_path = matrices[path[0]][rows]
+    for edge_type in path[1:len(path) // 2]:
+        half_path = half_path @ matrices[edge_type]
+    return half_path.tocsr()
+
+def __symmetric_commuting_entries(symmetric_index: tuple, starting_vertices: np.ndarray, block_size: int = 1024) -> tuple:
+    """
+    Computes the entries of the commuting matrix C C^T of a symmetric meta path for the rows of the starting vertices. The commuting matrix is symmetric,
+    so every block of rows is only multiplied with the columns from its first row on and the entries above the diagonal are mirrored.
+
+    Returns:
+    -----------
+        entries : tuple
+            The igraph vertex indices of the rows and columns and the instance counts of all non-zero entries.
+    """
+    half_path, transposed, rows = symmetric_index
+    positions = np.searchsorted(rows, np.asarray(starting_vertices, dtype=np.int64))
+    partial_entries = []
+    for first in range(0, len(positions), block_size):
+        block = positions[first:first + block_size]
+        offset = block[0]
+        products = (half_path[block] @ transposed[:, offset:]).tocoo()
+        sources = block[products.row]
+        targets = products.col + offset
+        upper = (targets > sources) & (products.data != 0)
+        sources, targets, counts = sources[upper], targets[upper], products.data[upper]
+        partial_entries.append((rows[sources], rows[targets], counts))
+        partial_entries.append((rows[targets], rows[sources], counts))
+    if len(partial_entries) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return tuple(np.concatenate(arrays) for arrays in zip(*partial_entries))
+
+# the function and index that the worker processes of a parallel projection evaluate
+__projection_worker_state = None
+
+def __init_projection_worker(function, index) -> None:
+    """
+    Stores the projection function and its index in a worker process. With the fork start method the index is inherited and not pickled.
+    """
+    global __projection_worker_state
+    __projection_worker_state = (function, index)
+
+def __project_partition(starting_vertices) -> object:
+    """
+    Evaluates the projection function of the worker process for a partition of the starting vertices.
+    """
+    function, index = __projection_worker_state
+    return function(index, starting_vertices)
+
+def _run_partitioned(function, index: tuple, starting_vertices, n_jobs: int) -> list:
+    """
+    Evaluates a projection function for all starting vertices. With more than one job the starting vertices are split into contiguous partitions that a
+    process pool evaluates. The index is handed to every worker once on start up. The partial results are returned in the order of the partitions,
+    so merging them gives the same result as a single run.
+    """
+    if n_jobs is None:
+        n_jobs = 1
+    elif n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    elif n_jobs < 1:
+        raise ValueError(f"n_jobs must be None, -1 or at least 1, got {n_jobs}.")
+    if n_jobs == 1 or len(starting_vertices) < 2:
+        return [function(index, starting_vertices)]
+
+    # more partitions than workers balance the load of start vertices with very different degrees
+    partitions = [partition for partition in np.array_split(np.asarray(starting_vertices, dtype=np.int64), 4 * n_jobs) if len(partition) > 0]
+    context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+    with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context, initializer=__init_projection_worker, initargs=(function, index)) as executor:
+        return list(executor.map(__project_partition, [partition.tolist() for partition in partitions]))
+
+def __create_matrix_projection(graph: HetGraph, metapath: MetaPath, starting_type: str, ending_type: str, directed: bool, combine_edges: CombineEdgeTypes, n_jobs: int) -> HetGraph:
+    """
+    Creates a graph projection from the commuting matrix of a meta path. Combines multi-edges the same way as the traversal based projection.
+    """
+    matrix_index, starting_vertices = __matrix_index(graph, metapath, starting_type, ending_type, planned=False)
+    path, matrices, type_codes, ending_code, _ = matrix_index
+    if starting_type == ending_type and len(starting_vertices) > 0 and _is_symmetric(path, matrices):
+        # only the half path matrix is multiplied and only the upper triangle of its product is computed
+        half_path = _half_path_matrix(path, matrices, starting_vertices)
+        partial_entries = _run_partitioned(__symmetric_commuting_entries, (half_path, half_path.T.tocsc(), starting_vertices), starting_vertices, n_jobs)
+    else:
+        if len(starting_vertices) > 0:
+            matrix_index = (path, matrices, type_codes, ending_code, __planned_factors(graph, metapath, starting_type, ending_type, matrices, type_codes == ending_code))
+        partial_entries = _run_partitioned(__commuting_entries, matrix_index, starting_vertices, n_jobs)
+    rows, columns, counts = (np.concatenate(arrays) for arrays in zip(*partial_entries))
+    return __matrix_projection_graph(graph, metapath, starting_type, ending_type, (rows, columns, counts), directed, combine_edges)
+
+def __matrix_projection_graph(graph: HetGraph, metapath: MetaPath, starting_type: str, ending_type: str, entries: tuple, directed: bool, combine_edges: CombineEdgeTypes) -> HetGraph:
+    """
+    Creates the projection graph from the non-zero entries of a commuting matrix.
+    """
+    rows, columns, counts = entries
+    if len(rows) == 0:
+        raise NotDefinedException(f"There were no path instances of the specified meta path {metapath.abbreviation}.")
+
+    # order the projection edges by source and target vertex
+    order = np.lexsort((columns, rows))
+    sources = rows[order].tolist()
+    targets = columns[order].tolist()
+    counts = counts[order].tolist()
+
+    # the projection owns copies of the nodes, just like a HetGraph created with copy=True
+    nodes = graph.nodes
+    projection_positions = np.unique(np.concatenate((rows, columns))).tolist()
+    projection_nodes_map = dict(zip(projection_positions, deepcopy([nodes[position] for position in projection_positions])))
+
+    if combine_edges is CombineEdgeTypes.NONE.value:
+        projection_edges = [Edge(projection_nodes_map[source], projection_nodes_map[target], directed, metapath.abbreviation) for source, target, count in zip(sources, targets, counts) for _ in range(count)]
+    elif combine_edges is CombineEdgeTypes.SUM.value:
+        projection_edges = [Edge(projection_nodes_map[source], projection_nodes_map[target], directed, metapath.abbreviation, {'Weight': count}) for source, target, count in zip(sources, targets, counts)]
+    else:
+        projection_edges = [Edge(projection_nodes_map[source], projection_nodes_map[target], directed, metapath.abbreviation) for source, target in zip(sources, targets)]
+
+    projection_path = ((starting_type, ending_type),metapath.abbreviation)
+    return HetGraph(nodes = list(projection_nodes_map.values()), edges = projection_edges, path_list = HetPaths([projection_path]), copy = False)
 
     
-def create_meta_projection(graph: HetGraph, metapath: MetaPath, directed: bool = False, combine_edges: CombineEdgeTypes = CombineEdgeTypes.NONE ) -> HetGraph:
+def create_meta_projection(graph: HetGraph, metapath: MetaPath, directed: bool = False, combine_edges: CombineEdgeTypes = CombineEdgeTypes.NONE, engine: ProjectionEngine = ProjectionEngine.TRAVERSAL, n_jobs: int = 1) -> HetGraph:
     """
     Creates a graph projection based on a provided metapath.
     Parameters:
@@ -85,47 +647,66 @@ def create_meta_projection(graph: HetGraph, metapath: MetaPath, directed: bool =
             A list of node types that make up the metapath that the projection is based on. Order matters.
         directed : bool
             Specifies whether the projection graph should be a directed graph or not.
+        combine_edges : CombineEdgeTypes
+            The strategy for combining multi-edges between the same nodes.
+        engine : ProjectionEngine
+            The engine that finds the meta path instances. TRAVERSAL enumerates all simple meta path instances hop by hop.
+            MATRIX multiplies one sparse adjacency matrix per edge type along the meta path. Its commuting matrix counts meta path instances as walks,
+            so instances that visit a node twice are counted as well, except for instances that return to their starting node.
+            Both engines yield the same projection for meta paths of length two.
+        n_jobs : int
+            The number of processes that search meta path instances. The start nodes are partitioned between them and the results are merged in order,
+            so the projection does not depend on the number of processes. -1 uses all cores, other values below 1 raise a ValueError.
+            Defaults to 1, which searches in the calling process.
     Returns:
     --------------
         projection : hetpy.HetGraph
+            If the graph has a projection cache, the cached projection is returned while the graph is unchanged. It is shared between calls and should not be changed.
     """
 
     if metapath.path not in [metapath.path for metapath in graph.meta_paths]:
         raise NotDefinedException(f"The metapath {metapath.abbreviation} you are trying to use as a projection is not defined on the graph you are trying to compress.")
 
-    starting_type = ''
-    ending_type = ''
-    for key, object in graph.paths.items():
-        if object == metapath.path[0]:
-            starting_type = key[0]
-        if object == metapath.path[-1]:
-            ending_type = key[1]
-    
-    starting_nodes = graph.get_nodes_of_type(starting_type)
-    ending_nodes = graph.get_nodes_of_type(ending_type)
-
-    undirected_graph_copy = graph.graph.as_undirected()
-    igraph_starting_nodes = [graph._mapNodeToIGraphVertex(node) for node in starting_nodes]
-    igraph_ending_nodes = [graph._mapNodeToIGraphVertex(node) for node in ending_nodes]
-    all_paths = {}
-    for node in igraph_starting_nodes:
-        paths_for_node = undirected_graph_copy.get_all_simple_paths(node, igraph_ending_nodes, cutoff=len(metapath.path))
-        all_paths[str(node.index)] = paths_for_node
-    
-    projection_edges = []
-    for _, paths_of_node in all_paths.items():
-        for path in paths_of_node:
-            path_nodes = [undirected_graph_copy.vs[index] for index in path]
-            if len(path_nodes) == (len(metapath.path)+1) and __check_path_for_metapath(path_nodes, graph.paths, metapath):
-                projection_edges.append((path[0],path[-1]))
-            else:
-                continue
+    cache = graph.projection_cache
+    if cache is None:
+        return __project(graph, metapath, directed, combine_edges, engine, n_jobs)
 
+    cache_key = __cache_key(graph, metapath, directed, combine_edges, engine)
+    projection = cache.get(cache_key)
+    if projection is None:
+        projection = __project(graph, metapath, directed, combine_edges, engine, n_jobs)
+        cache.invalidate(graph.version)
+        cache.put(cache_key, projection)
+    return projection
+
+def __cache_key(graph: HetGraph, metapath: MetaPath, directed: bool, combine_edges: CombineEdgeTypes, engine: ProjectionEngine) -> tuple:
+    """
+    Returns the key of a projection in the projection cache of the graph.
+    """
+    return (tuple(metapath.path), metapath.abbreviation, metapath.directed, directed, combine_edges, ProjectionEngine(engine), graph.version)
+
+def __project(graph: HetGraph, metapath: MetaPath, directed: bool, combine_edges: CombineEdgeTypes, engine: ProjectionEngine, n_jobs: int) -> HetGraph:
+    """
+    Creates a graph projection with the selected engine. See create_meta_projection for the parameters.
+    """
+    starting_type, ending_type = _meta_path_end_types(graph, metapath)
+
+    if ProjectionEngine(engine) is ProjectionEngine.MATRIX:
+        return __create_matrix_projection(graph, metapath, starting_type, ending_type, directed, combine_edges, n_jobs)
+
+    traversal_index, starting_vertices = __traversal_index(graph, metapath, starting_type, ending_type)
+    projection_edges = list(itertools.chain.from_iterable(_run_partitioned(__instance_end_pairs, traversal_index, starting_vertices, n_jobs)))
+    return __traversal_projection_graph(graph, metapath, starting_type, ending_type, projection_edges, directed, combine_edges)
+
+def __traversal_projection_graph(graph: HetGraph, metapath: MetaPath, starting_type: str, ending_type: str, projection_edges: List[tuple], directed: bool, combine_edges: CombineEdgeTypes) -> HetGraph:
+    """
+    Creates the projection graph from the first and last vertex of every meta path instance.
+    """
     if len(projection_edges) == 0:
         raise NotDefinedException(f"There were no path instances of the specified meta path {metapath.abbreviation}.")
     
-    projection_igraph_nodes = undirected_graph_copy.vs[list(set(itertools.chain.from_iterable(projection_edges)))]
-    projection_nodes_map = {str(vertex.index) : graph._mapIGraphVertexToNode(vertex) for vertex in projection_igraph_nodes}
+    nodes = graph.nodes
+    projection_nodes_map = {str(index) : nodes[index] for index in set(itertools.chain.from_iterable(projection_edges))}
     new_projection_edges = [Edge(source=projection_nodes_map[str(t[0])], target=projection_nodes_map[str(t[1])], directed=directed, type=metapath.abbreviation) for t in projection_edges]
 
     if combine_edges is not CombineEdgeTypes.NONE.value:
@@ -134,4 +715,439 @@ def create_meta_projection(graph: HetGraph, metapath: MetaPath, directed: bool =
 
     projection_path = ((starting_type, ending_type),metapath.abbreviation)
     projection_graph = HetGraph(nodes = list(projection_nodes_map.values()), edges = new_projection_edges, path_list = HetPaths([projection_path]))
-    return projection_graph
\ No newline at end of file
+    return projection_graph
+
+def __meta_path_trie(metapaths: List[MetaPath]) -> tuple:
+    """
+    Builds a prefix tree over the edge type sequences of meta paths. Every tree node is a tuple of a dict that maps edge types to the child nodes
+    and the list of positions of the meta paths that end at the node.
+    """
+    root = ({}, [])
+    for position, metapath in enumerate(metapaths):
+        trie_node = root
+        for edge_type in metapath.path:
+            trie_node = trie_node[0].setdefault(edge_type, ({}, []))
+        trie_node[1].append(position)
+    return root
+
+def __trie_end_pairs(trie_index: tuple, starting_vertices: List[int]) -> List[List[tuple]]:
+    """
+    Enumerates the simple instances of all meta paths of a prefix tree at once. A partial instance is expanded once for all meta paths that share its prefix.
+
+    Returns:
+    -----------
+        end_pairs : List[List[tuple]]
+            The first and last vertex of every instance, for every meta path of the prefix tree.
+    """
+    vertex_types, paths, adjacency, trie, starting_types, ending_types = trie_index
+    end_pairs = [[] for _ in ending_types]
+    typed_neighbours = {}
+    def expand(vertex: int, children: dict):
+        if vertex not in typed_neighbours:
+            grouped = {}
+            for neighbour in adjacency[vertex]:
+                grouped.setdefault(paths.get((vertex_types[vertex], vertex_types[neighbour])), []).append(neighbour)
+            typed_neighbours[vertex] = grouped
+        grouped = typed_neighbours[vertex]
+        return ((child, neighbour) for edge_type, child in children.items() for neighbour in grouped.get(edge_type, ()))
+
+    for start in starting_vertices:
+        path = [start]
+        visited = {start}
+        frontier = [expand(start, {edge_type: child for edge_type, child in trie[0].items() if starting_types[edge_type] == vertex_types[start]})]
+        while len(frontier) > 0:
+            step = next(frontier[-1], None)
+            if step is None:
+                frontier.pop()
+                visited.discard(path.pop())
+                continue
+            (children, positions), vertex = step
+            if vertex in visited:
+                continue
+            for position in positions:
+                if vertex_types[vertex] == ending_types[position]:
+                    end_pairs[position].append((start, vertex))
+            if len(children) > 0:
+                path.append(vertex)
+                visited.add(vertex)
+                frontier.append(expand(vertex, children))
+    return end_pairs
+
+def __trie_commuting_entries(trie_index: tuple, starting_vertices: np.ndarray) -> List[tuple]:
+    """
+    Computes the commuting matrices of all meta paths of a prefix tree at once. The partial product of a prefix is computed once and multiplied further
+    for every meta path that shares it.
+
+    Returns:
+    -----------
+        entries : List[tuple]
+            The rows, columns and instance counts of the non-zero entries of the commuting matrix, for every meta path of the prefix tree.
+    """
+    matrices, type_codes, trie, starting_codes, ending_codes = trie_index
+    starting_vertices = np.asarray(starting_vertices, dtype=np.int64)
+    empty = np.empty(0, dtype=np.int64)
+    entries = [(empty, empty, empty) for _ in ending_codes]
+
+    # the partial products of the children are computed when they are visited, so only the products along the current branch are held
+    pending = []
+    for edge_type, child in trie[0].items():
+        rows = starting_vertices[type_codes[starting_vertices] == starting_codes[edge_type]]
+        pending.append((child, rows, matrices[edge_type][rows]))
+    while len(pending) > 0:
+        (children, positions), rows, product = pending.pop()
+        if len(positions) > 0:
+            coo = product.tocoo()
+            sources = rows[coo.row]
+            for position in positions:
+                kept = (type_codes[coo.col] == ending_codes[position]) & (sources != coo.col) & (coo.data != 0)
+                entries[position] = (sources[kept], coo.col[kept].astype(np.int64), coo.data[kept])
+        for edge_type, child in children.items():
+            pending.append((child, rows, product @ matrices[edge_type]))
+    return entries
+
+def create_meta_projections(graph: HetGraph, metapaths: List[MetaPath], directed: bool = False, combine_edges: CombineEdgeTypes = CombineEdgeTypes.NONE, engine: ProjectionEngine = ProjectionEngine.TRAVERSAL, n_jobs: int = 1) -> List[HetGraph]:
+    """
+    Creates the graph projections of several meta paths at once. The meta paths are arranged in a prefix tree over their edge type sequences,
+    so meta paths that share a prefix share the work for it: the TRAVERSAL engine expands every partial instance once and the MATRIX engine multiplies
+    every partial product once.
+
+    Parameters:
+    -------------
+        graph : hetpy.HetGraph
+            The graph for which the projections should be created
+        metapaths : List[hetpy.MetaPath]
+            The meta paths that the projections are based on. All of them have to be defined on the graph.
+        directed : bool
+            Specifies whether the projection graphs should be directed graphs or not.
+        combine_edges : CombineEdgeTypes
+            The strategy for combining multi-edges between the same nodes.
+        engine : ProjectionEngine
+            The engine that finds the meta path instances, see create_meta_projection.
+        n_jobs : int
+            The number of processes that search meta path instances, see create_meta_projection.
+    Returns:
+    --------------
+        projections : List[hetpy.HetGraph]
+            The projection of every meta path in the given order. They are equal to the projections of create_meta_projection and use and fill
+            the projection cache of the graph in the same way.
+    """
+    defined_paths = [metapath.path for metapath in graph.meta_paths]
+    for metapath in metapaths:
+        if metapath.path not in defined_paths:
+            raise NotDefinedException(f"The metapath {metapath.abbreviation} you are trying to use as a projection is not defined on the graph you are trying to compress.")
+
+    cache = graph.projection_cache
+    projections = [None] * len(metapaths)
+    if cache is not None:
+        projections = [cache.get(__cache_key(graph, metapath, directed, combine_edges, engine)) for metapath in metapaths]
+    missing = [position for position, projection in enumerate(projections) if projection is None]
+    if len(missing) == 0:
+        return projections
+
+    for follow_direction in (False, True):
+        group = [position for position in missing if metapaths[position].directed == follow_direction]
+        if len(group) > 0:
+            group_projections = __project_shared_prefixes(graph, [metapaths[position] for position in group], directed, combine_edges, engine, n_jobs, follow_direction)
+            for position, projection in zip(group, group_projections):
+                projections[position] = projection
+    if cache is not None:
+        cache.invalidate(graph.version)
+        for position in missing:
+            cache.put(__cache_key(graph, metapaths[position], directed, combine_edges, engine), projections[position])
+    return projections
+
+def __project_shared_prefixes(graph: HetGraph, metapaths: List[MetaPath], directed: bool, combine_edges: CombineEdgeTypes, engine: ProjectionEngine, n_jobs: int, follow_direction: bool) -> List[HetGraph]:
+    """
+    Creates the projections of meta paths that all use edges in both directions or all follow the direction of the edges, with a prefix tree over their edge types.
+    """
+    end_types = [_meta_path_end_types(graph, metapath) for metapath in metapaths]
+    trie = __meta_path_trie(metapaths)
+    # the starting type only depends on the first edge type, so all meta paths below a child of the root start at the same nodes
+    starting_types = {metapath.path[0]: starting_type for metapath, (starting_type, _) in zip(metapaths, end_types)}
+
+    if ProjectionEngine(engine) is ProjectionEngine.MATRIX:
+        matrices, type_codes, type_labels = _typed_adjacency_matrices(graph, list(itertools.chain.from_iterable(metapath.path for metapath in metapaths)), follow_direction)
+        starting_codes = {edge_type: type_labels.get(starting_type, -1) for edge_type, starting_type in starting_types.items()}
+        ending_codes = [type_labels.get(ending_type, -1) for _, ending_type in end_types]
+        starting_vertices = np.flatnonzero(np.isin(type_codes, list(starting_codes.values())))
+        partial_entries = _run_partitioned(__trie_commuting_entries, (matrices, type_codes, trie, starting_codes, ending_codes), starting_vertices, n_jobs)
+        results = [tuple(np.concatenate(arrays) for arrays in zip(*entries)) for entries in zip(*partial_entries)]
+        build = __matrix_projection_graph
+    else:
+        vertex_types = __vertex_types(graph)
+        starting_vertices = [index for index, type in enumerate(vertex_types) if type in starting_types.values()]
+        trie_index = (vertex_types, dict(graph.paths), __adjacency_lists(graph, follow_direction), trie, starting_types, [ending_type for _, ending_type in end_types])
+        partial_pairs = _run_partitioned(__trie_end_pairs, trie_index, starting_vertices, n_jobs)
+        results = [list(itertools.chain.from_iterable(pairs)) for pairs in zip(*partial_pairs)]
+        build = __traversal_projection_graph
+
+    return [build(graph, metapath, starting_type, ending_type, result, directed, combine_edges) for metapath, (starting_type, ending_type), result in zip(metapaths, end_types, results)]
+
+def __projection_blocks(graph: HetGraph, metapath: MetaPath, engine: ProjectionEngine, block_size: int) -> Iterator[tuple]:
+    """
+    Counts the meta path instances for blocks of start vertices. All instances of a projection edge start at its source vertex, so the counts of a block
+    are final and only the entries of one block are held in memory at a time.
+
+    Yields:
+    -----------
+        block : tuple
+            The igraph vertex indices of the sources and targets and the instance counts of the projection edges of a block.
+    """
+    starting_type, ending_type = _meta_path_end_types(graph, metapath)
+    if ProjectionEngine(engine) is ProjectionEngine.MATRIX:
+        # the planned factors would be computed for the whole graph, so blocks are multiplied from left to right
+        matrix_index, starting_vertices = __matrix_index(graph, metapath, starting_type, ending_type, planned=False)
+    else:
+        traversal_index, starting_vertices = __traversal_index(graph, metapath, starting_type, ending_type)
+
+    for offset in range(0, len(starting_vertices), block_size):
+        block = starting_vertices[offset:offset + block_size]
+        if ProjectionEngine(engine) is ProjectionEngine.MATRIX:
+            rows, columns, counts = __commuting_entries(matrix_index, block)
+            order = np.lexsort((columns, rows))
+            rows, columns, counts = rows[order], columns[order], counts[order].astype(np.int64)
+        else:
+            pair_counts = Counter(__instance_end_pairs(traversal_index, block))
+            rows = np.fromiter((pair[0] for pair in pair_counts), dtype=np.int64, count=len(pair_counts))
+            columns = np.fromiter((pair[1] for pair in pair_counts), dtype=np.int64, count=len(pair_counts))
+            counts = np.fromiter(pair_counts.values(), dtype=np.int64, count=len(pair_counts))
+        if len(rows) > 0:
+            yield rows, columns, counts
+
+def __rechunk(blocks: Iterator[tuple], chunk_size: int) -> Iterator[tuple]:
+    """
+    Splits and merges blocks of equally long arrays into chunks of chunk_size entries. Only the last chunk can be shorter.
+    """
+    buffered = []
+    buffered_size = 0
+    for block in blocks:
+        buffered.append(block)
+        buffered_size += len(block[0])
+        if buffered_size < chunk_size:
+            continue
+        merged = [np.concatenate(arrays) for arrays in zip(*buffered)]
+        offset = 0
+        while buffered_size - offset >= chunk_size:
+            yield tuple(array[offset:offset + chunk_size] for array in merged)
+            offset += chunk_size
+        buffered = [tuple(array[offset:] for array in merged)]
+        buffered_size -= offset
+    if buffered_size > 0:
+        yield tuple(np.concatenate(arrays) for arrays in zip(*buffered))
+
+def __node_id_array(graph: HetGraph) -> np.ndarray:
+    """
+    Returns the node ids of a graph in the order of the igraph vertices. Ids that NumPy cannot store as integers or strings are converted to strings.
+    """
+    node_ids = np.asarray(graph._vertexNodeIds())
+    if node_ids.dtype.kind not in "iuU":
+        node_ids = node_ids.astype(str)
+    return node_ids
+
+def __check_chunk_sizes(chunk_size: int, block_size: int) -> None:
+    """
+    Raises a ValueError if the number of edges per chunk or of start nodes per block is below one.
+    """
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}.")
+    if block_size < 1:
+        raise ValueError(f"block_size must be at least 1, got {block_size}.")
+
+def stream_meta_projection(graph: HetGraph, metapath: MetaPath, engine: ProjectionEngine = ProjectionEngine.TRAVERSAL, chunk_size: int = None, block_size: int = 1024) -> Iterator[tuple]:
+    """
+    Streams the edges of a meta projection without creating the projection graph. Every pair of nodes that is connected by meta path instances is yielded once
+    together with the number of instances between them, which is the Weight of the projection edge created with combine_edges="sum".
+    Edges are yielded in the order of their source nodes.
+
+    Parameters:
+    -------------
+        graph : hetpy.HetGraph
+            The graph for which the projection is streamed.
+        metapath : hetpy.MetaPath
+            The meta path that the projection is based on. It has to be defined on the graph.
+        engine : ProjectionEngine
+            The engine that finds the meta path instances, see create_meta_projection.
+        chunk_size : int
+            If given, the edges are yielded as chunks of NumPy arrays with chunk_size edges each instead of single tuples. Only the last chunk can be shorter.
+        block_size : int
+            The number of start nodes whose meta path instances are counted at once. Smaller blocks need less memory. Defaults to 1024.
+
+    Raises:
+    --------------
+        ValueError: Raised when chunk_size or block_size is below 1.
+
+    Yields:
+    --------------
+        edge : tuple
+            The source id, target id and weight of a projection edge or, with chunk_size, a tuple of arrays with the source ids, target ids and weights of a chunk of edges.
+    """
+    if metapath.path not in [metapath.path for metapath in graph.meta_paths]:
+        raise NotDefinedException(f"The metapath {metapath.abbreviation} you are trying to use as a projection is not defined on the graph you are trying to compress.")
+    __check_chunk_sizes(chunk_size, block_size)
+
+    node_ids = __node_id_array(graph)
+    blocks = ((node_ids[rows], node_ids[columns], counts) for rows, columns, counts in __projection_blocks(graph, metapath, engine, block_size))
+    if chunk_size is not None:
+        yield from __rechunk(blocks, chunk_size)
+        return
+    for sources, targets, counts in blocks:
+        yield from zip(sources.tolist(), targets.tolist(), counts.tolist())
+
+def write_meta_projection(graph: HetGraph, metapath: MetaPath, filepath: str, engine: ProjectionEngine = ProjectionEngine.TRAVERSAL, chunk_size: int = 100000, block_size: int = 1024) -> int:
+    """
+    Writes the edges of a meta projection to a file while they are streamed, without creating the projection graph. The file has the columns source, target and weight.
+    The format is chosen by the file extension: .csv writes a CSV file with a header, .npz a NumPy archive with one array per column and .parquet a Parquet file.
+    Writing Parquet files requires pyarrow.
+
+    Parameters:
+    -------------
+        graph : hetpy.HetGraph
+            The graph for which the projection is written.
+        metapath : hetpy.MetaPath
+            The meta path that the projection is based on. It has to be defined on the graph.
+        filepath : str
+            The path of the file that is written.
+        engine : ProjectionEngine
+            The engine that finds the meta path instances, see create_meta_projection.
+        chunk_size : int
+            The number of edges that are written at once. Defaults to 100000.
+        block_size : int
+            The number of start nodes whose meta path instances are counted at once, see stream_meta_projection.
+
+    Returns:
+    --------------
+        edge_count : int
+            The number of written projection edges.
+    """
+    __check_chunk_sizes(chunk_size, block_size)
+    extension = os.path.splitext(filepath)[1].lower()
+    if extension not in (".csv", ".npz", ".parquet"):
+        raise ValueError(f"The file extension {extension} is not supported. Use .csv, .npz or .parquet.")
+    if extension == ".parquet":
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Writing meta projections to Parquet files requires pyarrow.")
+
+    chunks = stream_meta_projection(graph, metapath, engine, chunk_size, block_size)
+    columns = ("source", "target", "weight")
+    edge_count = 0
+
+    if extension == ".csv":
+        with open(filepath, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(columns)
+            for chunk in chunks:
+                writer.writerows(zip(*(array.tolist() for array in chunk)))
+                edge_count += len(chunk[0])
+        return edge_count
+
+    if extension == ".parquet":
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pyarrow.Table.from_arrays([pyarrow.array(array) for array in chunk], names=list(columns))
+                # the schema follows the ids of the first chunk, all ids are taken from the same array
+                writer = writer or pyarrow.parquet.ParquetWriter(filepath, table.schema)
+                writer.write_table(table)
+                edge_count += len(chunk[0])
+            if writer is None:
+                empty = pyarrow.Table.from_arrays([pyarrow.array([], type=pyarrow.string()), pyarrow.array([], type=pyarrow.string()), pyarrow.array([], type=pyarrow.int64())], names=list(columns))
+                pyarrow.parquet.write_table(empty, filepath)
+        finally:
+            if writer is not None:
+                writer.close()
+        return edge_count
+
+    # the length of an array is part of its .npy header, so the columns are spooled to temporary files and copied into the archive at the end
+    with tempfile.TemporaryDirectory() as directory:
+        spools = [open(os.path.join(directory, column), "wb") for column in columns]
+        dtypes = [None, None, np.dtype(np.int64)]
+        try:
+            for chunk in chunks:
+                for position, (spool, array) in enumerate(zip(spools, chunk)):
+                    # all ids are taken from the same array, so every chunk has the same dtype
+                    dtypes[position] = dtypes[position] or array.dtype
+                    spool.write(np.ascontiguousarray(array, dtype=dtypes[position]).tobytes())
+                edge_count += len(chunk[0])
+        finally:
+            for spool in spools:
+                spool.close()
+        with zipfile.ZipFile(filepath, "w", allowZip64=True) as archive:
+            for column, dtype in zip(columns, dtypes):
+                dtype = dtype or np.dtype(np.int64)
+                with archive.open(column + ".npy", "w", force_zip64=True) as entry:
+                    np.lib.format.write_array_header_1_0(entry, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (edge_count,)})
+                    with open(os.path.join(directory, column), "rb") as spool:
+                        shutil.copyfileobj(spool, entry)
+    return edge_count
+
+# the estimated memory that a non-zero entry of a sparse product occupies, including the index arrays and the temporaries of the multiplication
+__ENTRY_BYTES = 48
+
+def __prefix_walk_bounds(matrix_index: tuple, starting_vertices: np.ndarray) -> np.ndarray:
+    """
+    Bounds the number of non-zero entries in the row of every starting vertex for all partial products along the meta path. A row of a partial product
+    cannot have more non-zero entries than there are walks along the prefix of the meta path from its vertex.
+    """
+    path, matrices, _, _, _ = matrix_index
+    bounds = np.ones(len(starting_vertices))
+    for length in range(1, len(path) + 1):
+        walks = np.ones(matrices[path[0]].shape[1])
+        for edge_type in reversed(path[:length]):
+            walks = matrices[edge_type] @ walks
+        bounds = np.maximum(bounds, walks[starting_vertices])
+    return bounds
+
+def create_blocked_meta_projection(graph: HetGraph, metapath: MetaPath, directory: str = None, memory_budget: int = 256 * 1024 ** 2, directed: bool = False) -> BlockedProjection:
+    """
+    Creates a meta projection that is larger than the memory. The start nodes are partitioned into row blocks and the commuting matrix of every block
+    is computed like in the MATRIX engine and written to memory-mapped files. The blocks are sized so that their products fit into the memory budget,
+    based on the number of walks from every start node, which bounds the size of its row. A single start node whose row exceeds the budget forms its own block.
+    The weights of the projection edges count the meta path instances like combine_edges="sum".
+
+    Parameters:
+    -------------
+        graph : hetpy.HetGraph
+            The graph for which the projection should be created
+        metapath : hetpy.MetaPath
+            The meta path that the projection is based on. It has to be defined on the graph.
+        directory : str
+            The directory that the blocks are written to. Defaults to None, which writes them to a temporary directory that is removed when the projection is closed.
+        memory_budget : int
+            The memory in bytes that the computation of a block may use. Defaults to 256 MiB.
+        directed : bool
+            Specifies whether the projection edges are directed or not.
+    Returns:
+    --------------
+        projection : hetpy.BlockedProjection
+            The projection that loads its blocks on access.
+    """
+    if metapath.path not in [metapath.path for metapath in graph.meta_paths]:
+        raise NotDefinedException(f"The metapath {metapath.abbreviation} you are trying to use as a projection is not defined on the graph you are trying to compress.")
+
+    starting_type, ending_type = _meta_path_end_types(graph, metapath)
+    # the planned factors would be computed for the whole graph outside of the budget, so blocks are multiplied from left to right like the walk bounds assume
+    matrix_index, starting_vertices = __matrix_index(graph, metapath, starting_type, ending_type, planned=False)
+    temporary = directory is None
+    if temporary:
+        directory = tempfile.mkdtemp(prefix="hetpy-projection-")
+    else:
+        os.makedirs(directory, exist_ok=True)
+
+    entry_budget = max(memory_budget // __ENTRY_BYTES, 1)
+    cumulative_bounds = np.concatenate(([0], np.cumsum(__prefix_walk_bounds(matrix_index, starting_vertices))))
+    block_starts = []
+    first = 0
+    while first < len(starting_vertices):
+        # the largest block whose bounded size fits into the budget, but at least one start node
+        last = max(int(np.searchsorted(cumulative_bounds, cumulative_bounds[first] + entry_budget, side="right")) - 1, first + 1)
+        rows, columns, counts = __commuting_entries(matrix_index, starting_vertices[first:last])
+        order = np.lexsort((columns, rows))
+        index = len(block_starts)
+        for column, array in (("sources", rows[order]), ("targets", columns[order]), ("weights", counts[order].astype(np.int64))):
+            np.save(os.path.join(directory, f"block_{index}_{column}.npy"), array)
+        block_starts.append(int(starting_vertices[first]))
+        first = last
+    return BlockedProjection(metapath, directed, directory, __node_id_array(graph), block_starts, temporary)
@@ -0,0 +1,105 @@
+import numpy as np
+
+from hetpy.models import MetaPath, HetGraph
+from hetpy.graphUtils.metaProjections import _meta_path_end_types, _typed_adjacency_matrices, _run_partitioned
+
+from hetpy.exceptions.commonExceptions import NotDefinedException
+
+def __walk_batch(walk_index: tuple, batch: int) -> np.ndarray:
+    """
+    Generates one batch of random walks. All walks of the batch take their steps together, so every step is a few vectorized operations on the typed
+    CSR adjacency. Every batch draws from its own random generator, so the walks do not depend on how batches are distributed between processes.
+    """
+    steps, starting_vertices, walks_per_node, walk_length, seed, batch_size, _ = walk_index
+    walk_count = len(starting_vertices) * walks_per_node
+    walk_ids = np.arange(batch * batch_size, min((batch + 1) * batch_size, walk_count))
+    generator = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(batch,)))
+
+    current = starting_vertices[walk_ids % len(starting_vertices)]
+    walks = np.full((len(walk_ids), walk_length), -1, dtype=np.int32)
+    walks[:, 0] = current
+    active = np.arange(len(walk_ids))
+    for step in range(1, walk_length):
+        indptr, indices = steps[(step - 1) % len(steps)]
+        starts = indptr[current[active]]
+        degrees = indptr[current[active] + 1] - starts
+        # walks end at nodes without a neighbour of the next edge type
+        moving = degrees > 0
+        active, starts, degrees = active[moving], starts[moving], degrees[moving]
+        if len(active) == 0:
+            break
+        current[active] = indices[starts + (generator.random(len(active)) * degrees).astype(np.int64)]
+        walks[active, step] = current[active]
+    return walks
+
+def __walk_batches(walk_index: tuple, batches) -> list:
+    """
+    Generates batches of random walks. If the walks are written to a file, every batch is written to its rows of the file and nothing is returned.
+    """
+    filepath = walk_index[-1]
+    batch_size = walk_index[-2]
+    output = np.load(filepath, mmap_mode="r+") if filepath is not None else None
+    results = []
+    for batch in batches:
+        walks = __walk_batch(walk_index, batch)
+        if output is None:
+            results.append(walks)
+        else:
+            output[batch * batch_size:batch * batch_size + len(walks)] = walks
+    if output is not None:
+        output.flush()
+    return results
+
+def metapath_random_walks(graph: HetGraph, metapath: MetaPath, walks_per_node: int = 10, walk_length: int = 80, seed: int = None, n_jobs: int = 1, filepath: str = None, batch_size: int = 65536) -> np.ndarray:
+    """
+    Generates meta path guided random walks, like the walks that metapath2vec is trained on. The walks start at every node of the starting type of the meta path
+    and follow its edge types cyclically: the n-th step uses an edge of the (n mod len(path))-th edge type of the meta path. Every step picks one of the
+    neighbours that the edge type allows uniformly, multi-edges are collapsed and edges can be used in both directions unless the meta path is directed.
+    For the walks to continue past the end of the meta path, it has to end at its starting type, like author-paper-author.
+
+    Parameters:
+    -------------
+        graph : hetpy.HetGraph
+            The graph on which the walks are generated.
+        metapath : hetpy.MetaPath
+            The meta path that guides the walks. It has to be defined on the graph.
+        walks_per_node : int
+            The number of walks that start at every node of the starting type. Defaults to 10.
+        walk_length : int
+            The number of nodes of every walk, including its start node. Defaults to 80.
+        seed : int
+            The seed of the random generator. The walks only depend on the seed and not on the number of processes. Defaults to None, which uses a random seed.
+        n_jobs : int
+            The number of processes that generate walks, see create_meta_projection. Defaults to 1.
+        filepath : str
+            If given, the walks are written to this .npy file while they are generated and a read-only memory map of the file is returned.
+        batch_size : int
+            The number of walks that are generated together. Defaults to 65536.
+
+    Returns:
+    --------------
+        walks : numpy.ndarray
+            An int32 array with one row per walk that holds the positions of the visited nodes in graph.nodes. Walks that reach a node without a neighbour
+            of the next edge type end early and are padded with -1. The walks of the first round over all start nodes come first, followed by the next rounds.
+    """
+    if metapath.path not in [metapath.path for metapath in graph.meta_paths]:
+        raise NotDefinedException(f"The metapath {metapath.abbreviation} you are trying to use is not defined on the graph.")
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+
+    starting_type, _ = _meta_path_end_types(graph, metapath)
+    matrices, type_codes, type_labels = _typed_adjacency_matrices(graph, metapath.path, metapath.directed)
+    starting_vertices = np.flatnonzero(type_codes == type_labels.get(starting_type, -1))
+    steps = [(matrices[edge_type].indptr.astype(np.int64), matrices[edge_type].indices) for edge_type in metapath.path]
+    walk_count = len(starting_vertices) * walks_per_node
+    batches = list(range(-(-walk_count // batch_size)))
+
+    if filepath is not None:
+        np.lib.format.open_memmap(filepath, mode="w+", dtype=np.int32, shape=(walk_count, walk_length)).flush()
+    walk_index = (steps, starting_vertices, walks_per_node, walk_length, seed, batch_size, filepath)
+    partial_walks = _run_partitioned(__walk_batches, walk_index, batches, n_jobs)
+
+    if filepath is not None:
+        return np.load(filepath, mmap_mode="r")
+    walks = [batch for batches in partial_walks for batch in batches]
+    return np.concatenate(walks) if len(walks) > 0 else np.empty((0, walk_length), dtype=np.int32)
@@ -5,4 +5,7 @@ from .node import Node
 from .edge import Edge
 from .hetGraph import HetGraph
 from .hetPaths import HetPaths, EdgeTypeMapping, NodeTypeTuple
-from .metaPath import MetaPath
\ No newline at end of file
+from .metaPath import MetaPath
+from .projectionCache import ProjectionCache
+from .blockedProjection import BlockedProjection
+from .projectionPlan import ProjectionPlan
\ No newline at end of file
@@ -0,0 +1,145 @@
+from bisect import bisect_right
+import os
+import shutil
+import weakref
+
+import numpy as np
+
+from hetpy.exceptions.commonExceptions import NotDefinedException
+
+
+class BlockedProjection:
+    """
+    A meta projection whose edges are stored in memory-mapped blocks on disk. Every block holds the projection edges of a contiguous range of start nodes,
+    ordered by source and target, and is only loaded when it is accessed. The weights count the meta path instances between two nodes,
+    like the Weight attribute of a projection created with combine_edges="sum".
+    """
+
+    metapath: 'MetaPath'
+    """The meta path that the projection is based on."""
+
+    directed: bool
+    """Whether the edges of the projection are directed."""
+
+    directory: str
+    """The directory that contains the block files."""
+
+    edge_count: int
+    """The number of projection edges."""
+
+    def __init__(self, metapath: 'MetaPath', directed: bool, directory: str, node_ids: np.ndarray, block_starts: list, temporary: bool = False) -> None:
+        """
+        Maps parameters on object creation. Blocked projections are created by create_blocked_meta_projection.
+
+        Parameters
+        ----------
+            metapath : hetpy.MetaPath
+                The meta path that the projection is based on.
+            directed : bool
+                Whether the edges of the projection are directed.
+            directory : str
+                The directory that contains the files block_<index>_sources.npy, block_<index>_targets.npy and block_<index>_weights.npy of every block.
+            node_ids : numpy.ndarray
+                The id of every igraph vertex of the projected graph. The block files store vertex indices.
+            block_starts : list
+                The vertex index of the first start node of every block in ascending order.
+            temporary : bool
+                Whether the directory is removed when the projection is closed or garbage collected.
+        """
+        self.metapath = metapath
+        self.directed = directed
+        self.directory = directory
+        self.__nodeIds = node_ids
+        self.__nodePositions = None
+        self.__blockStarts = block_starts
+        # removes a temporary directory even if the projection is never closed
+        self.__finalizer = weakref.finalize(self, shutil.rmtree, directory, True) if temporary else None
+        self.edge_count = sum(len(self.__load(index, "sources")) for index in range(len(block_starts)))
+
+    def __len__(self) -> int:
+        return self.edge_count
+
+    def __enter__(self) -> 'BlockedProjection':
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+    def __iter__(self):
+        """
+        Yields the source id, target id and weight of every projection edge, one block at a time.
+        """
+        for sources, targets, weights in self.chunks():
+            yield from zip(sources.tolist(), targets.tolist(), weights.tolist())
+
+    @property
+    def block_count(self) -> int:
+        """The number of blocks."""
+        return len(self.__blockStarts)
+
+    def block(self, index: int) -> tuple:
+        """
+        Loads a block of projection edges.
+
+        Parameters
+        ----------
+            index : int
+                The position of the block.
+
+        Returns
+        ----------
+            block : tuple
+                The source ids, target ids and weights of the edges of the block as NumPy arrays.
+        """
+        return self.__nodeIds[self.__load(index, "sources")], self.__nodeIds[self.__load(index, "targets")], np.asarray(self.__load(index, "weights"))
+
+    def chunks(self):
+        """
+        Yields every block of projection edges, see block.
+        """
+        for index in range(self.block_count):
+            yield self.block(index)
+
+    def neighbours(self, node: 'Node') -> dict:
+        """
+        Returns the projection edges that start at a node. Only the block of the node is read.
+
+        Parameters
+        ----------
+            node : hetpy.Node
+                A node of the projected graph.
+
+        Returns
+        ----------
+            neighbours : dict
+                Maps the ids of the target nodes to the weights of the edges. Empty if no projection edge starts at the node.
+
+        Raises
+        ----------
+            NotDefinedException: Raised when the node is not a node of the projected graph.
+        """
+        if self.__nodePositions is None:
+            self.__nodePositions = {node_id: position for position, node_id in enumerate(self.__nodeIds.tolist())}
+        position = self.__nodePositions.get(node.id)
+        if position is None:
+            raise NotDefinedException(f"The node {node.id} is not a node of the projected graph.")
+        index = bisect_right(self.__blockStarts, position) - 1
+        if index < 0:
+            return {}
+        sources = self.__load(index, "sources")
+        first, last = np.searchsorted(sources, position, side="left"), np.searchsorted(sources, position, side="right")
+        targets = self.__nodeIds[self.__load(index, "targets")[first:last]]
+        return dict(zip(targets.tolist(), self.__load(index, "weights")[first:last].tolist()))
+
+    def close(self) -> None:
+        """
+        Removes the block files if they were written to a temporary directory.
+        """
+        if self.__finalizer is not None:
+            self.__finalizer()
+
+    def __load(self, index: int, column: str) -> np.ndarray:
+        """
+        Maps a column of a block file into memory.
+        """
+        return np.load(os.path.join(self.directory, f"block_{index}_{column}.npy"), mmap_mode="r")
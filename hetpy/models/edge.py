@@ -1,4 +1,5 @@
 from .node import Node
+from ..utils.utils import internType
 
 from typing import Tuple
 
@@ -7,9 +8,12 @@ class Edge:
     Calss that represents an edge in a heterogeneous information network.
     """
 
+    __slots__ = ("source", "target", "directed", "type", "attributes")
 
-    nodes: Tuple[Node, Node]
-    """An ordered tuple of nodes. First element is the source node and second element the target node."""
+    source: Node
+    """The source node of the edge."""
+    target: Node
+    """The target node of the edge."""
     directed: bool
     """Flag whether the edge should be considered as directed or undirected."""
     type: str
@@ -35,16 +39,18 @@ class Edge:
             attributes : dict
                 A dictionary of edge attributes with the attribute identifiers as keys.
         """
-        self.nodes = (source, target)
+        self.source = source
+        self.target = target
         self.directed = directed
-        self.type = type
+        self.type = internType(type)
 
         self.attributes = attributes
 
     @property
-    def source(self):
-        return self.nodes[0]
-    
-    @property
-    def target(self):
-        return self.nodes[1]
\ No newline at end of file
+    def nodes(self) -> Tuple[Node, Node]:
+        """An ordered tuple of nodes. First element is the source node and second element the target node."""
+        return (self.source, self.target)
+
+    @nodes.setter
+    def nodes(self, nodes: Tuple[Node, Node]) -> None:
+        self.source, self.target = nodes
\ No newline at end of file
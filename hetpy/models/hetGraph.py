@@ -1,17 +1,23 @@
 from typing import List
-from copy import deepcopy
+from copy import deepcopy, copy as shallowcopy
+from contextlib import contextmanager
+from array import array
 
 
 from .hetPaths import EdgeTypeMapping, HetPaths
 from .node import Node
 from .edge import Edge
 from .metaPath import MetaPath
+from .projectionCache import ProjectionCache
 
 # exceptions
 from hetpy.exceptions.typeExceptions import TypeException
-from hetpy.exceptions.commonExceptions import AlreadyDefinedException, NotDefinedException
+from hetpy.exceptions.commonExceptions import AlreadyDefinedException, NotDefinedException, GraphDefinitionException
+from hetpy.utils.utils import generateNodeIds
 
 import igraph as ig
+import numpy as np
+from scipy import sparse
 import json
 import difflib
 
@@ -22,30 +28,194 @@ class HetGraph:
     An heterogeneous graph with multiple node and edge types.
     """
 
-    nodes: List[Node]
-    """The set of nodes that make up the network."""
-
-    edges: List[Edge]
-    """The set of edges that connect the nodes in the network."""
-
     node_types: List[str]
     """A set of all node types that exist in the graph."""
 
     edge_types: List[str]
     """A set of all edge types that exist in the graph."""
 
-    graph: ig.Graph
-    """The graph instance itself."""
-
     paths: HetPaths
     """A list of paths that exist in the graph. Maps a tuple of node types to an edge type."""
 
     meta_paths: List[MetaPath]
     """A list of meta paths that exist in the graph."""
 
+    compaction_threshold: float
+    """The share of deleted nodes or edges at which deleted elements are compacted automatically. Defaults to 0.5."""
+
+    version: int
+    """A counter that every change of the nodes, edges, path definitions or meta paths through the graph functions increases."""
+
+    projection_cache: ProjectionCache
+    """An optional cache for the meta projections of the graph. Projections are not cached if it is None, which is the default."""
+
 
     __nodeIdStore: dict
-    __graphNodeStore: dict
+    __edgeStore: dict
+    __nodeTypeStore: dict
+    __edgeTypeStore: dict
+    __nodeTypeCounts: dict
+    __edgeTypeCounts: dict
+    __deletedNodes: set
+    __deletedEdges: set
+    __nodeIds: list
+    __sharesObjects: bool
+    __pendingOperations: list
+    __listeners: list
+    __sparseCache: tuple
+
+    @property
+    def nodes(self) -> List[Node]:
+        """The set of nodes that make up the network."""
+        self.__ensureMaterialized()
+        self.compact()
+        return self._nodes
+
+    @property
+    def edges(self) -> List[Edge]:
+        """The set of edges that connect the nodes in the network."""
+        self.__ensureMaterialized()
+        self.compact()
+        return self._edges
+
+    @property
+    def graph(self) -> ig.Graph:
+        """The graph instance itself."""
+        self.compact()
+        return self._graph
+
+    def __ensureMaterialized(self) -> None:
+        """
+        Makes sure that the Node and Edge objects of the graph exist.
+        """
+        if self._nodes is None:
+            self.__materialize()
+
+    def __materialize(self) -> None:
+        """
+        Creates the Node and Edge objects of a graph that was built from columnar arrays. Node ids that were not provided on construction are generated here.
+        """
+        node_ids = self.__nodeIds if self.__nodeIds is not None else generateNodeIds(self._graph.vcount())
+        node_attribute_names = [name for name in self._graph.vs.attribute_names() if name != "Type"]
+        node_columns = [self._graph.vs[name] for name in node_attribute_names]
+        nodes = []
+        for index, (node_id, node_type, *values) in enumerate(zip(node_ids, self._graph.vs["Type"], *node_columns)):
+            node = Node(node_type, dict(zip(node_attribute_names, values)), id=node_id)
+            self.__nodeIdStore[node.id] = index
+            nodes.append(node)
+
+        directed = self._graph.is_directed()
+        edge_attribute_names = [name for name in self._graph.es.attribute_names() if name != "Type"]
+        edge_columns = [self._graph.es[name] for name in edge_attribute_names]
+        edges = []
+        for (source, target), edge_type, *values in zip(self._graph.get_edgelist(), self._graph.es["Type"], *edge_columns):
+            edges.append(Edge(nodes[source], nodes[target], directed, edge_type, dict(zip(edge_attribute_names, values))))
+
+        self.__nodeIds = None
+        self._nodes = nodes
+        self._edges = edges
+        self.__buildEdgeStore()
+
+    def __buildEdgeStore(self) -> None:
+        """
+        Builds the index that maps the source id, target id and type of an edge to the positions of all matching edges
+        as well as the partition of edge positions by edge type. Positions in the edge list equal the indices of the igraph edges.
+        """
+        self.__edgeStore = {}
+        self.__edgeTypeStore = {}
+        for index, edge in enumerate(self._edges):
+            self.__edgeStore.setdefault((edge.source.id, edge.target.id, edge.type), []).append(index)
+            self.__edgeTypeStore.setdefault(edge.type, array('q')).append(index)
+        self.__edgeTypeCounts = {type: len(positions) for type, positions in self.__edgeTypeStore.items()}
+        self.edge_types = set(self.__edgeTypeCounts)
+
+    def __buildNodeTypeStore(self) -> None:
+        """
+        Builds the partition of node positions by node type.
+        """
+        self.__nodeTypeStore = {}
+        for index, node in enumerate(self._nodes):
+            self.__nodeTypeStore.setdefault(node.type, array('q')).append(index)
+        self.__nodeTypeCounts = {type: len(positions) for type, positions in self.__nodeTypeStore.items()}
+        self.node_types = set(self.__nodeTypeCounts)
+
+    def __findEdgePosition(self, edge: Edge) -> int:
+        """
+        Returns the position of the given edge object in the edge list or None if the edge is not part of the graph.
+        """
+        self.__ensureMaterialized()
+        for position in self.__edgeStore.get((edge.source.id, edge.target.id, edge.type), []):
+            if self._edges[position] is edge:
+                return position
+        return None
+
+    @staticmethod
+    def __countType(counts: dict, types: set, type: str, change: int) -> None:
+        """
+        Changes the number of elements of a type and keeps the set of existing types up to date.
+        """
+        counts[type] = counts.get(type, 0) + change
+        if counts[type] > 0:
+            types.add(type)
+        else:
+            del counts[type]
+            types.discard(type)
+
+    def compact(self) -> None:
+        """
+        Removes deleted nodes and edges from the node list, the edge list and the igraph instance.
+        Deleting only marks elements as deleted. The marked elements are removed in bulk and all position based indexes are remapped in a single pass.
+        Runs automatically before the nodes, edges or igraph instance of the graph are accessed and when the share of deleted elements exceeds the compaction threshold.
+        """
+        if len(self.__deletedNodes) == 0 and len(self.__deletedEdges) == 0:
+            return
+        node_positions = self.__compactPositions(self.__deletedNodes, len(self._nodes))
+        edge_positions = self.__compactPositions(self.__deletedEdges, len(self._edges))
+
+        self._graph.delete_edges(sorted(self.__deletedEdges))
+        self._graph.delete_vertices(sorted(self.__deletedNodes))
+        # assign in place to keep adopted lists of the caller up to date
+        self._nodes[:] = [node for node, position in zip(self._nodes, node_positions) if position >= 0]
+        self._edges[:] = [edge for edge, position in zip(self._edges, edge_positions) if position >= 0]
+
+        self.__nodeIdStore = dict(zip(self.__nodeIdStore.keys(), node_positions[np.fromiter(self.__nodeIdStore.values(), dtype=np.int64, count=len(self.__nodeIdStore))].tolist()))
+        bucket_positions = edge_positions[np.fromiter((position for bucket in self.__edgeStore.values() for position in bucket), dtype=np.int64)].tolist()
+        bucket_ends = np.cumsum([len(bucket) for bucket in self.__edgeStore.values()], dtype=np.int64).tolist()
+        self.__edgeStore = {key: bucket_positions[end - len(bucket):end] for (key, bucket), end in zip(self.__edgeStore.items(), bucket_ends)}
+        self.__nodeTypeStore = self.__remapPartitions(self.__nodeTypeStore, node_positions)
+        self.__edgeTypeStore = self.__remapPartitions(self.__edgeTypeStore, edge_positions)
+
+        self.__deletedNodes = set()
+        self.__deletedEdges = set()
+
+    @staticmethod
+    def __compactPositions(deleted: set, length: int) -> np.ndarray:
+        """
+        Maps every old position to its position after compaction. Deleted positions map to -1.
+        """
+        alive = np.ones(length, dtype=bool)
+        alive[list(deleted)] = False
+        return np.where(alive, np.cumsum(alive) - 1, -1)
+
+    @staticmethod
+    def __remapPartitions(partitions: dict, positions: np.ndarray) -> dict:
+        """
+        Removes deleted positions from type partitions and maps the remaining ones to their positions after compaction.
+        """
+        remapped = {}
+        for type, partition in partitions.items():
+            new_positions = positions[np.frombuffer(partition, dtype=np.int64)]
+            new_positions = new_positions[new_positions >= 0]
+            if len(new_positions) > 0:
+                remapped[type] = array('q', new_positions.tobytes())
+        return remapped
+
+    def __compactIfNecessary(self) -> None:
+        """
+        Compacts the graph when the share of deleted nodes or edges exceeds the compaction threshold.
+        """
+        if len(self.__deletedNodes) > self.compaction_threshold * len(self._nodes) or len(self.__deletedEdges) > self.compaction_threshold * len(self._edges):
+            self.compact()
     
     
     def __json_serializer(self, obj):
@@ -56,27 +226,61 @@ class HetGraph:
             return obj.isoformat()
         raise TypeError ("Type %s not serializable" % type(obj))
 
-    def __inferEdgeTypes(self) -> None:
+    @staticmethod
+    def __encodeEdgeTypes(edges: List[Edge]) -> tuple:
         """
-        Infers the types of untyped edges from the graphs path definitions.
+        Encodes the source node types, target node types and types of edges into integer codes. Source and target types share their codes.
         """
-        for edge in self.edges:
-                if edge.type == '':
-                    edge.type = self.paths[(edge.nodes[0].type, edge.nodes[1].type)]
-    
-    def __assertEdgeTypes(self) -> None:
+        node_label_codes = {}
+        edge_label_codes = {}
+        node_codes = np.fromiter((node_label_codes.setdefault(node.type, len(node_label_codes)) for edge in edges for node in (edge.source, edge.target)), dtype=np.int64, count=2 * len(edges))
+        edge_codes = np.fromiter((edge_label_codes.setdefault(edge.type, len(edge_label_codes)) for edge in edges), dtype=np.int64, count=len(edges))
+        return node_codes[0::2], node_codes[1::2], list(node_label_codes), edge_codes, list(edge_label_codes)
+
+    def __resolveEdgeTypes(self) -> None:
         """
-        Asserts if all defined edge types match with the defined path definitions.
+        Infers the types of untyped edges from the graphs path definitions and asserts that all other edge types match them.
+        All edges are resolved with array operations on integer type codes.
+
+        Raises:
+        -----------
+            TypeException: Raised when some edge types do not match the path definitions. The exception lists all mismatches.
         """
-        flag = True
-        for edge in self.edges:
-            edge_type = edge.type
-            defined_type = self.paths[edge.nodes[0].type, edge.nodes[1].type]
-            if edge_type != defined_type:
-                flag = False
-                raise TypeException(f"Some defined edge types do not match the defined paths: {edge_type} | {defined_type}! Abborting graph creation.")
-                break
-        return flag
+        source_codes, target_codes, node_labels, edge_codes, edge_labels = self.__encodeEdgeTypes(self._edges)
+        resolved_codes, edge_labels, mismatches = self.__resolvePathTypes(source_codes, target_codes, node_labels, edge_codes, edge_labels, self.paths)
+        if len(mismatches) > 0:
+            self.__raiseTypeMismatches(mismatches)
+        # only inferred edge types can differ after a successful resolution
+        for index in np.flatnonzero(resolved_codes != edge_codes).tolist():
+            edge = self._edges[index]
+            if self.__sharesObjects:
+                # copy on write: never change an edge object that is owned by the caller
+                edge = shallowcopy(edge)
+                self._edges[index] = edge
+            edge.type = edge_labels[resolved_codes[index]]
+
+    @staticmethod
+    def __raiseTypeMismatches(mismatches: dict) -> None:
+        """
+        Raises a TypeException that reports all edge type mismatches.
+        """
+        details = ", ".join(f"{edge_type} | {defined_type} ({source_type}, {target_type}): {count}" for (source_type, target_type, edge_type, defined_type), count in mismatches.items())
+        raise TypeException(f"Some defined edge types do not match the defined paths: {details}! Abborting graph creation.", mismatches)
+
+    def validate_edge_types(self) -> dict:
+        """
+        Checks all edges of the graph against the path definitions in a single vectorized pass.
+
+        Returns:
+        -----------
+            A dictionary that maps every offending (source type, target type, edge type, defined type) combination to the number of edges with it.
+            The defined type is None if there is no path definition for the node types. The dictionary is empty if all edges match or if the graph has no path definitions.
+        """
+        if len(self.paths.keys()) == 0:
+            return {}
+        edges = self.edges
+        source_codes, target_codes, node_labels, edge_codes, edge_labels = self.__encodeEdgeTypes(edges)
+        return self.__resolvePathTypes(source_codes, target_codes, node_labels, edge_codes, edge_labels, self.paths, infer=False)[2]
 
     def __assertNodeExistence(self, node: Node) -> False:
         """
@@ -87,30 +291,41 @@ class HetGraph:
             node : Node
                 The node for which the function shall check if it is defined on the graph.
         """
-        if node.id not in [node.id for node in self.nodes]:
+        if self._nodes is None:
+            self.__materialize()
+        if node.id not in self.__nodeIdStore:
             return False
         else:
             return True
 
-    
-    def __setTypes(self) -> None:
+
+    @staticmethod
+    def __partitionByType(codes: np.ndarray, labels: np.ndarray) -> dict:
         """
-        A setter function that updates node types and edge types after a node or an edge has been added.
+        Partitions the positions of integer type codes by the type names they refer to.
         """
-        self.node_types = set([node.type for node in self.nodes])
-        self.edge_types = set([edge.type for edge in self.edges])
+        order = np.argsort(codes, kind="stable")
+        present_codes, starts = np.unique(codes[order], return_index=True)
+        ends = np.append(starts[1:], len(codes))
+        return {labels[code]: array('q', order[start:end].astype(np.int64).tobytes()) for code, start, end in zip(present_codes, starts, ends)}
 
     def _performTypeAssertions(self) -> None:
         """
-        A wrapper function that performs all type assertions during graph creation.
+        A wrapper function that performs all type inference and assertions during graph creation.
         """
-        return self.__assertEdgeTypes()
+        self.__resolveEdgeTypes()
 
 
-    def __init__(self, nodes: List[Node], edges: List[Edge], path_list: HetPaths = {}, meta_paths: List[MetaPath] = []) -> None:
+    def __init__(self, nodes: List[Node], edges: List[Edge], path_list: HetPaths = {}, meta_paths: List[MetaPath] = [], copy: bool = True) -> None:
         """
         Maps parameters and attributes during object creation. Also creates a igraph.Graph instance from defined nodes and edges.
 
+        By default the graph works on deep copies of the provided nodes, edges, paths and meta paths. With copy=False the graph adopts the provided
+        node and edge lists and the objects in them instead. Adopted objects are never changed by the graph: an edge whose type has to be inferred is
+        replaced by a shallow copy and add_node does not touch the attributes of the added node. Changes that the caller makes to adopted objects
+        after creation bypass the graph and must be avoided, use the graph functions instead. Edges of the caller can directly be passed to delete_edge.
+        Path definitions and meta paths are always copied.
+
         Parameters
         ----------
             nodes : List[Node]
@@ -121,69 +336,257 @@ class HetGraph:
                 A dictionary of simple path definitions.
             meta_paths : List[MetaPath]
                 A list of semantic meta path definitions on the graph.
+            copy : bool
+                Whether the graph works on deep copies of the provided objects or adopts them. Defaults to True.
         """
         # initialize instance variables
         self.__nodeIdStore = {}
-        self.__graphNodeStore = {}
-
-        self.nodes = deepcopy(nodes)
-        self.edges = deepcopy(edges)
-
-        self.paths = deepcopy(path_list)
-        self.meta_paths = deepcopy(meta_paths)
-        
-        # infer edge types if some are not defined
-        undefined_edge_types = [edge.type == '' for edge in self.edges]
-        if any(undefined_edge_types) and len(path_list.keys()) > 0:
-            print("Some edge types are undefined. Infering types from paths...")
-            self.__inferEdgeTypes()
+        self.__edgeStore = {}
+        self.__nodeIds = None
+        self.__sharesObjects = not copy
+        self.__deletedNodes = set()
+        self.__deletedEdges = set()
+        self.__pendingOperations = None
+        self.compaction_threshold = 0.5
+        self.version = 0
+        self.projection_cache = None
+        self.__listeners = []
+        self.__sparseCache = None
+
+        if copy:
+            # share the memo so that the copied edges reference the copied nodes instead of second copies
+            memo = {}
+            self._nodes = deepcopy(nodes, memo)
+            self._edges = deepcopy(edges, memo)
+            self.paths = deepcopy(path_list)
+            self.meta_paths = deepcopy(meta_paths)
+        else:
+            self._nodes = nodes
+            self._edges = edges
+            self.paths = HetPaths(path_list.items())
+            self.meta_paths = list(meta_paths)
         
-
         if len(path_list.keys()) > 0:
-            # perform assertions
-            if not self._performTypeAssertions():
-                return None
+            # infer undefined edge types and perform assertions
+            self._performTypeAssertions()
         
-        self.__setTypes()
+        self.__buildNodeTypeStore()
         
         
         # create igraph instance iteratively
-        self.graph = ig.Graph(directed=any([edge.directed for edge in self.edges]))
-        self.graph.add_vertices(len(nodes))
-        for index, node in enumerate(nodes):
+        self._graph = ig.Graph(directed=any([edge.directed for edge in self._edges]))
+        self._graph.add_vertices(len(self._nodes))
+        for index, node in enumerate(self._nodes):
             self.__nodeIdStore[node.id] = index
-            self.__graphNodeStore[index] = node.id
-            self.graph.vs[index]["Type"] = node.type
+            self._graph.vs[index]["Type"] = node.type
             for key, value in node.attributes.items():
-                self.graph.vs[index][key] = value
+                self._graph.vs[index][key] = value
         
-        igraph_edges = [(self.__nodeIdStore[edge.nodes[0].id],self.__nodeIdStore[edge.nodes[1].id]) for edge in self.edges]
-        igraph_edge_types = [edge.type for edge in self.edges]
-        self.graph.add_edges(igraph_edges)
+        igraph_edges = [(self.__nodeIdStore[edge.nodes[0].id],self.__nodeIdStore[edge.nodes[1].id]) for edge in self._edges]
+        igraph_edge_types = [edge.type for edge in self._edges]
+        self._graph.add_edges(igraph_edges)
         
         # add edge attributes to igraph edges
-        self.graph.es["Type"] = igraph_edge_types
-        for index, edge in enumerate(self.graph.es):
-            for key, value in edges[index].attributes.items():
+        self._graph.es["Type"] = igraph_edge_types
+        for index, edge in enumerate(self._graph.es):
+            for key, value in self._edges[index].attributes.items():
                 edge[key] = value
+        self.__buildEdgeStore()
+
+
+    @classmethod
+    def from_arrays(cls, node_types, edge_sources, edge_targets, edge_types = None, node_attributes: dict = {}, edge_attributes: dict = {}, node_type_labels = None, edge_type_labels = None, node_ids = None, directed: bool = False, path_list: HetPaths = {}, meta_paths: List[MetaPath] = []) -> 'HetGraph':
+        """
+        Creates a graph from columnar arrays without creating Node and Edge objects. The igraph instance is built with a single bulk call.
+        Node and edge objects are only created once the nodes or edges of the graph are accessed.
+
+        Parameters
+        ----------
+            node_types : array-like
+                The type of every node. Either the type names themselves or integer codes into node_type_labels.
+            edge_sources : array-like
+                The index of the source node of every edge.
+            edge_targets : array-like
+                The index of the target node of every edge.
+            edge_types : array-like
+                The type of every edge. Either the type names themselves or integer codes into edge_type_labels. If omitted, the types are inferred from path_list.
+            node_attributes : dict
+                A dictionary that maps attribute identifiers to arrays holding the attribute value of every node.
+            edge_attributes : dict
+                A dictionary that maps attribute identifiers to arrays holding the attribute value of every edge.
+            node_type_labels : array-like
+                The type names that the integer codes in node_types refer to. Optional.
+            edge_type_labels : array-like
+                The type names that the integer codes in edge_types refer to. Optional.
+            node_ids : array-like
+                The ids of the nodes. Generated when the nodes are first accessed if omitted.
+            directed : bool
+                Flag whether the edges should be considered as directed.
+            path_list : HetPaths
+                A dictionary of simple path definitions.
+            meta_paths : List[MetaPath]
+                A list of semantic meta path definitions on the graph.
+
+        Returns
+        ----------
+            graph : HetGraph
+                The created heterogeneous graph.
+
+        Raises
+        ----------
+            GraphDefinitionException
+                Raised when the lengths of the provided arrays do not match.
+            TypeException
+                Raised when some edge types do not match the defined paths.
+        """
+        node_codes, node_labels = cls.__encodeTypes(node_types, node_type_labels)
+        sources = np.asarray(edge_sources, dtype=np.int64)
+        targets = np.asarray(edge_targets, dtype=np.int64)
+        if len(sources) != len(targets):
+            raise GraphDefinitionException(f"Got {len(sources)} edge sources but {len(targets)} edge targets.")
+        if edge_types is None:
+            edge_codes, edge_labels = np.full(len(sources), -1, dtype=np.int64), []
+        else:
+            edge_codes, edge_labels = cls.__encodeTypes(edge_types, edge_type_labels)
+        if len(edge_codes) != len(sources):
+            raise GraphDefinitionException(f"Got {len(edge_codes)} edge types for {len(sources)} edges.")
+        if node_ids is not None and len(node_ids) != len(node_codes):
+            raise GraphDefinitionException(f"Got {len(node_ids)} node ids for {len(node_codes)} nodes.")
+
+        if len(path_list.keys()) > 0:
+            edge_codes, edge_labels, mismatches = cls.__resolvePathTypes(node_codes[sources], node_codes[targets], node_labels, edge_codes, edge_labels, path_list)
+            if len(mismatches) > 0:
+                cls.__raiseTypeMismatches(mismatches)
+        # the code -1 marks an untyped edge and resolves to the empty type name
+        edge_labels = np.append(np.asarray(edge_labels, dtype=object), '')
+
+        vertex_attributes = {name: cls.__toList(values, len(node_codes), "node") for name, values in node_attributes.items()}
+        vertex_attributes["Type"] = node_labels[node_codes].tolist()
+        igraph_edge_attributes = {name: cls.__toList(values, len(sources), "edge") for name, values in edge_attributes.items()}
+        igraph_edge_attributes["Type"] = edge_labels[edge_codes].tolist()
+
+        het_graph = cls.__new__(cls)
+        het_graph.__nodeIdStore = {}
+        het_graph.__edgeStore = {}
+        het_graph.__nodeIds = None if node_ids is None else cls.__toList(node_ids, len(node_codes), "node")
+        het_graph.__sharesObjects = False
+        het_graph.__deletedNodes = set()
+        het_graph.__deletedEdges = set()
+        het_graph.__pendingOperations = None
+        het_graph.version = 0
+        het_graph.projection_cache = None
+        het_graph.__listeners = []
+        het_graph.__sparseCache = None
+        het_graph.compaction_threshold = 0.5
+        het_graph._nodes = None
+        het_graph._edges = None
+        het_graph.paths = deepcopy(path_list)
+        het_graph.meta_paths = deepcopy(meta_paths)
+        het_graph.__nodeTypeStore = cls.__partitionByType(node_codes, node_labels)
+        het_graph.__edgeTypeStore = cls.__partitionByType(edge_codes, edge_labels)
+        het_graph.__nodeTypeCounts = {type: len(positions) for type, positions in het_graph.__nodeTypeStore.items()}
+        het_graph.__edgeTypeCounts = {type: len(positions) for type, positions in het_graph.__edgeTypeStore.items()}
+        het_graph.node_types = set(het_graph.__nodeTypeCounts)
+        het_graph.edge_types = set(het_graph.__edgeTypeCounts)
+        het_graph._graph = ig.Graph(
+            n=len(node_codes),
+            edges=np.column_stack((sources, targets)),
+            directed=directed,
+            vertex_attrs=vertex_attributes,
+            edge_attrs=igraph_edge_attributes
+        )
+        return het_graph
 
+    @staticmethod
+    def __encodeTypes(types, labels = None):
+        """
+        Encodes an array of types into integer codes and an array of type names.
+        """
+        if labels is not None:
+            return np.asarray(types, dtype=np.int64), np.asarray(labels, dtype=object)
+        labels, codes = np.unique(np.asarray(types, dtype=object).astype(str), return_inverse=True)
+        return codes.astype(np.int64), labels.astype(object)
+
+    @staticmethod
+    def __resolvePathTypes(source_codes, target_codes, node_labels, edge_codes, edge_labels, paths: HetPaths, infer: bool = True):
+        """
+        Infers undefined edge types from the path definitions and collects all edge types that do not match them. Works on integer type codes.
+        Returns the resolved edge codes, the extended edge labels and a dictionary that counts the edges per mismatching type combination.
+        """
+        edge_labels = list(edge_labels)
+        label_codes = {label: code for code, label in enumerate(edge_labels)}
+        node_label_codes = {label: code for code, label in enumerate(node_labels)}
+        path_table = np.full((len(node_labels), len(node_labels)), -1, dtype=np.int64)
+        for (source_type, target_type), edge_type in paths.items():
+            if source_type in node_label_codes and target_type in node_label_codes:
+                if edge_type not in label_codes:
+                    label_codes[edge_type] = len(edge_labels)
+                    edge_labels.append(edge_type)
+                path_table[node_label_codes[source_type], node_label_codes[target_type]] = label_codes[edge_type]
+
+        defined_codes = path_table[source_codes, target_codes]
+        # the code -1 marks an undefined edge type and resolves to the empty type name
+        undefined = np.asarray(edge_labels + [''], dtype=object)[edge_codes] == ''
+        if infer and undefined.any():
+            print("Some edge types are undefined. Infering types from paths...")
+            edge_codes = np.where(undefined, defined_codes, edge_codes)
+
+        mismatches = {}
+        # edges between node types without a path definition are always reported
+        positions = np.flatnonzero((edge_codes != defined_codes) | (defined_codes < 0))
+        if len(positions) > 0:
+            combinations, counts = np.unique(np.column_stack((source_codes[positions], target_codes[positions], edge_codes[positions], defined_codes[positions])), axis=0, return_counts=True)
+            type_names = edge_labels + ['']
+            for (source_code, target_code, edge_code, defined_code), count in zip(combinations.tolist(), counts.tolist()):
+                defined_type = type_names[defined_code] if defined_code >= 0 else None
+                mismatches[(node_labels[source_code], node_labels[target_code], type_names[edge_code], defined_type)] = count
+        return edge_codes, edge_labels, mismatches
+
+    @staticmethod
+    def __toList(values, length: int, element: str) -> list:
+        """
+        Converts an attribute array into a list of python objects and checks its length.
+        """
+        values = values.tolist() if hasattr(values, "tolist") else list(values)
+        if len(values) != length:
+            raise GraphDefinitionException(f"Got {len(values)} {element} values for {length} {element}s.")
+        return values
 
     def _mapNodeToIGraphVertex(self, node: Node):
         """
         Maps a node object to the coresponding igraph vertex.
         """
-        return self.graph.vs[self.__nodeIdStore[node.id]]
+        self.__ensureMaterialized()
+        graph = self.graph
+        return graph.vs[self.__nodeIdStore[node.id]]
 
     def _mapIGraphVertexToNode(self, vertex: ig.Vertex):
-        return self.nodes[[node.id for node in self.nodes].index(self.__graphNodeStore[vertex.index])]
+        """
+        Maps an igraph vertex to the corresponding node object. Node positions equal the indices of the igraph vertices.
+        """
+        return self.nodes[vertex.index]
 
     def _mapEdgeToIGraphEdge(self, edge: Edge):
         """
         Maps an edge to the corresponding igraph edge.
         """
-        for e in self.graph.es:
-            if self.__graphNodeStore[e.source] == edge.nodes[0].id and self.__graphNodeStore[e.target] == edge.nodes[1].id and e["Type"] == edge.type:
-                return e
+        self.__ensureMaterialized()
+        graph = self.graph
+        positions = self.__edgeStore.get((edge.source.id, edge.target.id, edge.type), [])
+        if len(positions) > 0:
+            return graph.es[positions[0]]
+
+    def _vertexNodeIds(self) -> list:
+        """
+        Returns the id of the node of every igraph vertex. Graphs built from columnar arrays keep their ids without creating the Node objects.
+        Ids that were not provided on construction are generated once and reused for the Node objects.
+        """
+        if self._nodes is None:
+            if self.__nodeIds is None:
+                self.__nodeIds = generateNodeIds(self._graph.vcount())
+            return self.__nodeIds
+        self.compact()
+        return [node.id for node in self._nodes]
 
     def get_meta_paths(self) -> dict:
         """
@@ -200,6 +603,38 @@ class HetGraph:
             graph_dict[metapath.abbreviation] = metapath.path
         return graph_dict
 
+    # change listeners
+
+    def add_listener(self, listener) -> None:
+        """
+        Registers an object that is notified about changes of the graph. Listeners implement the methods
+        on_edges_added(edges) and on_edges_deleted(edges), which receive the changed edges after the graph was changed, and on_paths_changed().
+
+        Parameters:
+        ------------
+            listener : object
+                The object that is notified.
+        """
+        self.__listeners.append(listener)
+
+    def remove_listener(self, listener) -> None:
+        """
+        Stops notifying a listener about changes of the graph.
+
+        Parameters:
+        ------------
+            listener : object
+                The listener that was registered with add_listener.
+        """
+        self.__listeners.remove(listener)
+
+    def __notifyListeners(self, event: str, *args) -> None:
+        """
+        Calls the method of all registered listeners that handles the event.
+        """
+        for listener in list(self.__listeners):
+            getattr(listener, event)(*args)
+
     # crud functions
 
     def add_path(self, path: EdgeTypeMapping) -> None:
@@ -218,6 +653,8 @@ class HetGraph:
         if path[0] in self.paths.keys():
             raise AlreadyDefinedException(f"The graph already contains a path definition for the node types {path[0]}")
         self.paths[path[0]] = path[1]
+        self.version += 1
+        self.__notifyListeners("on_paths_changed")
 
     def remove_path(self, path: EdgeTypeMapping) -> None:
         """
@@ -236,6 +673,8 @@ class HetGraph:
             path_definition = self.paths[path[0]]
             if path_definition == path[1]:
                 del self.paths[path[0]]
+                self.version += 1
+                self.__notifyListeners("on_paths_changed")
             else:
                 raise AlreadyDefinedException(f"The graph contains a different path definition for the nodes {path[0]}, namely: {path_definition}")
         except KeyError as e:
@@ -253,6 +692,7 @@ class HetGraph:
         """
         if metapath.abbreviation not in self.get_meta_paths().keys():
             self.meta_paths.append(metapath)
+            self.version += 1
         else:
             raise AlreadyDefinedException(f"A metapath with the abbreviaton {metapath.abbreviation}")
 
@@ -268,6 +708,7 @@ class HetGraph:
         if metapath_abbreviation in self.get_meta_paths().keys():
             remove_index = [metapath.abbreviation for metapath in self.meta_paths].index(metapath_abbreviation)
             del self.meta_paths[remove_index]
+            self.version += 1
         else:
             raise NotDefinedException(f"Metapath {metapath_abbreviation}")
 
@@ -282,12 +723,11 @@ class HetGraph:
             target : hetpy.Node
                 The target node of the particular edge.
         """
-        source_target_tuples = [(edge.source.id, edge.target.id) for edge in self.edges]
-        try:
-            index = source_target_tuples.index((source.id, target.id))
-            return self.edges[index]
-        except ValueError:
+        self.__ensureMaterialized()
+        positions = [position for edge_type in self.edge_types for position in self.__edgeStore.get((source.id, target.id, edge_type), [])]
+        if len(positions) == 0:
             return None
+        return self._edges[min(positions)]
 
     def add_edge(self, edge: Edge) -> None:
         """
@@ -298,16 +738,69 @@ class HetGraph:
             edge : Edge
                 The edge that is supposed to be added.
         """
-        for node in edge.nodes:
-            if not self.__assertNodeExistence(node):
-                raise NotDefinedException(f"One of the nodes you are trying to connect does not exist in the graph.")
-        self.edges.append(edge)
+        self.add_edges([edge])
+
+    def add_edges(self, edges: List[Edge]) -> None:
+        """
+        Adds the specified edges to the graph. All edges are validated before the graph is changed and are added to the igraph instance with a single call.
+
+        Parameters:
+        -------------
+            edges : List[Edge]
+                The edges that are supposed to be added.
+
+        Raises:
+        -------------
+            NotDefinedException: Raised when an edge connects a node that does not exist in the graph or when the type of an untyped edge can not be inferred.
+        """
+        edges = list(edges)
+        if len(edges) == 0:
+            return
+        if self.__pendingOperations is not None:
+            self.__pendingOperations.append(("add_edges", list(edges)))
+            return
+        for edge in edges:
+            for node in edge.nodes:
+                if not self.__assertNodeExistence(node):
+                    raise NotDefinedException(f"One of the nodes you are trying to connect does not exist in the graph.")
+            self.__assertEdgeTypeInferable(edge)
+        self.__insertEdges(edges)
+
+    def __assertEdgeTypeInferable(self, edge: Edge) -> None:
+        """
+        Raises a NotDefinedException when the type of an untyped edge can not be inferred from the path definitions.
+        """
         if edge.type == '' and len(self.paths.keys()) > 0:
+            node_types = (edge.source.type, edge.target.type)
+            if node_types not in self.paths:
+                raise NotDefinedException(f"There is no path definition for the nodes {node_types}")
+
+    def __insertEdges(self, edges: List[Edge]) -> None:
+        """
+        Appends validated edges to the edge list, the edge indexes and the igraph instance. Missing edge types are inferred from the path definitions.
+        """
+        self.__ensureMaterialized()
+        edges = list(edges)
+        untyped_positions = [index for index, edge in enumerate(edges) if edge.type == '']
+        if len(untyped_positions) > 0 and len(self.paths.keys()) > 0:
             print('Edge does not have a specified type. Infering from path definitions.')
-            self.__inferEdgeTypes()
-        self.__setTypes()
-        igraph_node_pair = (self._mapNodeToIGraphVertex(edge.nodes[0]),self._mapNodeToIGraphVertex(edge.nodes[1]))
-        self.graph.add_edge(*igraph_node_pair)
+            for index in untyped_positions:
+                if self.__sharesObjects:
+                    # copy on write: never change an edge object that is owned by the caller
+                    edges[index] = shallowcopy(edges[index])
+                edges[index].type = self.paths[(edges[index].source.type, edges[index].target.type)]
+
+        # positions include deleted edges that are not compacted yet, just like the igraph instance
+        first_position = len(self._edges)
+        self._edges.extend(edges)
+        for position, edge in enumerate(edges, start=first_position):
+            self.__edgeStore.setdefault((edge.source.id, edge.target.id, edge.type), []).append(position)
+            self.__edgeTypeStore.setdefault(edge.type, array('q')).append(position)
+            self.__countType(self.__edgeTypeCounts, self.edge_types, edge.type, 1)
+        igraph_node_pairs = [(self.__nodeIdStore[edge.source.id], self.__nodeIdStore[edge.target.id]) for edge in edges]
+        self._graph.add_edges(igraph_node_pairs, attributes=self.__attributeColumns(edges))
+        self.version += 1
+        self.__notifyListeners("on_edges_added", edges)
 
     def delete_edge(self, edge: Edge) -> None:
         """
@@ -318,12 +811,44 @@ class HetGraph:
             edge : Edge
                 The edge that is supposed to be removed.
         """
-        try:
-            self.edges.remove(edge)
-            self.graph.delete_edges(self._mapEdgeToIGraphEdge(edge))
-            self.__setTypes()
-        except ValueError:
-            raise NotDefinedException(f"The edge you are trying to remove does not exist on the graph.")
+        self.delete_edges([edge])
+
+    def delete_edges(self, edges: List[Edge]) -> None:
+        """
+        Removes the specified edges from the graph. Nothing is removed if one of the edges does not exist on the graph.
+        The edges are only marked as deleted and are removed from the igraph instance in bulk on the next compaction.
+
+        Parameters:
+        ----------
+            edges : List[Edge]
+                The edges that are supposed to be removed.
+        """
+        if self.__pendingOperations is not None:
+            self.__pendingOperations.append(("delete_edges", list(edges)))
+            return
+        positions = set()
+        for edge in edges:
+            position = self.__findEdgePosition(edge)
+            if position is None:
+                raise NotDefinedException(f"The edge you are trying to remove does not exist on the graph.")
+            positions.add(position)
+        self.__markEdgesDeleted(positions)
+        self.__compactIfNecessary()
+
+    def __markEdgesDeleted(self, positions: set) -> None:
+        """
+        Marks the edges at the given positions as deleted and removes them from the edge index and the type counts.
+        """
+        for position in positions:
+            edge = self._edges[position]
+            key = (edge.source.id, edge.target.id, edge.type)
+            self.__edgeStore[key].remove(position)
+            if len(self.__edgeStore[key]) == 0:
+                del self.__edgeStore[key]
+            self.__countType(self.__edgeTypeCounts, self.edge_types, edge.type, -1)
+        self.__deletedEdges.update(positions)
+        self.version += 1
+        self.__notifyListeners("on_edges_deleted", [self._edges[position] for position in sorted(positions)])
 
     def add_node(self, node: Node) -> None:
         """
@@ -334,12 +859,48 @@ class HetGraph:
             node : Node
                 The node which is supposed to be added.
         """
-        self.nodes.append(node)
-        self.__setTypes()
-        node.attributes["Type"] = node.type
-        new_igraph_vertex = self.graph.add_vertex(**node.attributes)
-        self.__nodeIdStore[node.id] = new_igraph_vertex.index
-        self.__graphNodeStore[new_igraph_vertex.index] = node.id
+        self.add_nodes([node])
+
+    def add_nodes(self, nodes: List[Node]) -> None:
+        """
+        Adds the specified nodes to the graph with a single igraph call.
+
+        Parameters:
+        -----------
+            nodes : List[Node]
+                The nodes which are supposed to be added.
+
+        Raises:
+        -----------
+            AlreadyDefinedException: Raised when a node id is already used in the graph or appears twice in the nodes.
+        """
+        nodes = list(nodes)
+        if len(nodes) == 0:
+            return
+        if self.__pendingOperations is not None:
+            self.__pendingOperations.append(("add_nodes", list(nodes)))
+            return
+        new_ids = set()
+        for node in nodes:
+            if self.__assertNodeExistence(node) or node.id in new_ids:
+                raise AlreadyDefinedException(f"The graph already contains a node with the id {node.id}")
+            new_ids.add(node.id)
+        self.__insertNodes(nodes)
+
+    def __insertNodes(self, nodes: List[Node]) -> None:
+        """
+        Appends validated nodes to the node list, the node indexes and the igraph instance.
+        """
+        self.__ensureMaterialized()
+        # positions include deleted nodes that are not compacted yet, just like the igraph instance
+        first_position = len(self._nodes)
+        self._nodes.extend(nodes)
+        for position, node in enumerate(nodes, start=first_position):
+            self.__nodeIdStore[node.id] = position
+            self.__nodeTypeStore.setdefault(node.type, array('q')).append(position)
+            self.__countType(self.__nodeTypeCounts, self.node_types, node.type, 1)
+        self._graph.add_vertices(len(nodes), attributes=self.__attributeColumns(nodes))
+        self.version += 1
 
     def delete_node(self, node: Node) -> None:
         """
@@ -350,19 +911,146 @@ class HetGraph:
             node : Node
                 The node that is supposed to be removed.
         """
-        if self.__assertNodeExistence(node):
-            # remove all edges that feature the node first.
-            edges_to_remove = [edge for edge in self.edges if edge.nodes[0].id == node.id or edge.nodes[1].id == node.id]
-            for edge in edges_to_remove:
-                self.delete_edge(edge)
-            self.nodes.remove(node)
-            igraph_vertex = self._mapNodeToIGraphVertex(node)
-            self.graph.delete_vertices(igraph_vertex.index)
+        self.delete_nodes([node])
+
+    def delete_nodes(self, nodes: List[Node]) -> None:
+        """
+        Deletes the specified nodes and all edges that feature them from the graph. Nothing is removed if one of the nodes is not defined on the graph.
+        The nodes and edges are only marked as deleted and are removed from the igraph instance in bulk on the next compaction.
+
+        Parameters:
+        -----------
+            nodes : List[Node]
+                The nodes that are supposed to be removed.
+        """
+        if self.__pendingOperations is not None:
+            self.__pendingOperations.append(("delete_nodes", list(nodes)))
+            return
+        for node in nodes:
+            if not self.__assertNodeExistence(node):
+                raise NotDefinedException(f"The node with id {node.id} your are trying to remove is not defined on the graph.")
+        self.__markNodesDeleted(set(self.__nodeIdStore[node.id] for node in nodes))
+        self.__compactIfNecessary()
+
+    def __markNodesDeleted(self, positions: set) -> None:
+        """
+        Marks the nodes at the given positions and all edges that feature them as deleted.
+        """
+        # remove all edges that feature the nodes first.
+        incident_edges = set(index for position in positions for index in self._graph.incident(position, mode="all")) - self.__deletedEdges
+        if len(incident_edges) > 0:
+            self.__markEdgesDeleted(incident_edges)
+        for position in positions:
+            node = self._nodes[position]
             del self.__nodeIdStore[node.id]
-            del self.__graphNodeStore[igraph_vertex.index]
-            self.__setTypes()
-        else:
-            raise NotDefinedException(f"The node with id {node.id} your are trying to remove is not defined on the graph.")
+            self.__countType(self.__nodeTypeCounts, self.node_types, node.type, -1)
+        self.__deletedNodes.update(positions)
+        self.version += 1
+
+    @contextmanager
+    def batch(self):
+        """
+        Defers all mutations of the graph until the end of the with block:
+
+            with graph.batch():
+                graph.add_node(node)
+                graph.add_edge(edge)
+
+        Inside the block add_node(s), add_edge(s), delete_node(s) and delete_edge(s) only record the operation.
+        When the block ends, all recorded operations are validated against the state the graph would have after each of them.
+        If one of them is invalid the exception is raised and no operation is applied.
+        Otherwise consecutive operations of the same kind are applied together with a single igraph call each and the graph is compacted at most once.
+        Nothing is applied when the block raises an exception. Nested batches are part of the outermost batch.
+        """
+        if self.__pendingOperations is not None:
+            yield self
+            return
+        self.__pendingOperations = []
+        try:
+            yield self
+            operations = self.__pendingOperations
+        finally:
+            self.__pendingOperations = None
+        self.__validateOperations(operations)
+        self.__applyOperations(operations)
+
+    def __validateOperations(self, operations: List[tuple]) -> None:
+        """
+        Validates recorded batch operations in order without changing the graph. Added and removed node ids and edges are tracked as changes on top of the current state.
+        """
+        self.__ensureMaterialized()
+        added_ids = set()
+        removed_ids = set()
+        added_edges = {}
+        removed_positions = set()
+        node_exists = lambda node_id: node_id in added_ids or (node_id in self.__nodeIdStore and node_id not in removed_ids)
+
+        for kind, elements in operations:
+            if kind == "add_nodes":
+                for node in elements:
+                    if node_exists(node.id):
+                        raise AlreadyDefinedException(f"The graph already contains a node with the id {node.id}")
+                    added_ids.add(node.id)
+            elif kind == "add_edges":
+                for edge in elements:
+                    if not all(node_exists(node.id) for node in edge.nodes):
+                        raise NotDefinedException(f"One of the nodes you are trying to connect does not exist in the graph.")
+                    self.__assertEdgeTypeInferable(edge)
+                    if not (self.__sharesObjects and edge.type == '' and len(self.paths.keys()) > 0):
+                        # untyped edges of the caller are replaced by typed copies and can not be removed by the caller, just like outside of a batch
+                        added_edges[id(edge)] = edge
+            elif kind == "delete_edges":
+                for edge in elements:
+                    if added_edges.pop(id(edge), None) is None:
+                        position = self.__findEdgePosition(edge)
+                        if position is None or position in removed_positions:
+                            raise NotDefinedException(f"The edge you are trying to remove does not exist on the graph.")
+                        removed_positions.add(position)
+            else:
+                node_ids = set()
+                for node in elements:
+                    if not node_exists(node.id):
+                        raise NotDefinedException(f"The node with id {node.id} your are trying to remove is not defined on the graph.")
+                    node_ids.add(node.id)
+                for node_id in node_ids:
+                    if node_id in added_ids:
+                        added_ids.discard(node_id)
+                    else:
+                        removed_ids.add(node_id)
+                        removed_positions.update(self._graph.incident(self.__nodeIdStore[node_id], mode="all"))
+                added_edges = {key: edge for key, edge in added_edges.items() if edge.source.id not in node_ids and edge.target.id not in node_ids}
+
+    def __applyOperations(self, operations: List[tuple]) -> None:
+        """
+        Applies validated batch operations. Consecutive operations of the same kind are coalesced.
+        """
+        groups = []
+        for kind, elements in operations:
+            if len(groups) > 0 and groups[-1][0] == kind:
+                groups[-1][1].extend(elements)
+            else:
+                groups.append((kind, list(elements)))
+
+        for kind, elements in groups:
+            if kind == "add_nodes":
+                self.__insertNodes(elements)
+            elif kind == "add_edges":
+                self.__insertEdges(elements)
+            elif kind == "delete_edges":
+                self.__markEdgesDeleted(set(self.__findEdgePosition(edge) for edge in elements))
+            else:
+                self.__markNodesDeleted(set(self.__nodeIdStore[node.id] for node in elements))
+        self.__compactIfNecessary()
+
+    @staticmethod
+    def __attributeColumns(elements) -> dict:
+        """
+        Converts the types and attributes of nodes or edges into igraph attribute columns. Missing attributes are filled with None.
+        """
+        names = dict.fromkeys(name for element in elements for name in element.attributes)
+        columns = {name: [element.attributes.get(name) for element in elements] for name in names if name != "Type"}
+        columns["Type"] = [element.type for element in elements]
+        return columns
 
     # graph metric functions
 
@@ -375,13 +1063,10 @@ class HetGraph:
             pdf : boolean
                 Specifies whether to return the distribution as absolute values or as a probability density function.
         """
-        distribution = {}
-        for type in self.node_types:
-            distribution[type] = 0
-        for node in self.nodes:
-            distribution[node.type] += 1
+        distribution = dict(self.__nodeTypeCounts)
         if pdf is True:
-            distribution = {k: v / len(self.nodes) for k, v in distribution.items()}
+            total = sum(distribution.values())
+            distribution = {k: v / total for k, v in distribution.items()}
         
         return distribution
 
@@ -394,13 +1079,10 @@ class HetGraph:
             pdf : boolean
                 Specifies whether to return the distribution as absolute values or as a probability density function.
         """
-        distribution = {}
-        for type in self.edge_types:
-            distribution[type] = 0
-        for edge in self.edges:
-            distribution[edge.type] += 1
+        distribution = dict(self.__edgeTypeCounts)
         if pdf is True:
-            distribution = {k: v / len(self.edges) for k, v in distribution.items()}
+            total = sum(distribution.values())
+            distribution = {k: v / total for k, v in distribution.items()}
         return distribution
 
 
@@ -420,7 +1102,8 @@ class HetGraph:
                 The selected nodes of the specified type.
         """
         if type in self.node_types:
-            selected_nodes = [node for node in self.nodes if node.type == type]
+            nodes = self.nodes
+            selected_nodes = [nodes[index] for index in self.__nodeTypeStore[type]]
             return selected_nodes
         else:
             raise NotDefinedException(f"Nodetype {type} does not exist in the graph")
@@ -440,12 +1123,127 @@ class HetGraph:
                 The selected edges of the specified type.
         """
         if type in self.edge_types:
-            selected_edges = [edge for edge in self.edges if edge.type == type]
+            edges = self.edges
+            selected_edges = [edges[index] for index in self.__edgeTypeStore[type]]
         else:
             raise NotDefinedException(f"Edgetype {type} does not exist in the graph")
         return selected_edges
 
 
+    def pathsim_topk(self, node: Node, metapath: MetaPath, k: int = 10) -> List[tuple]:
+        """
+        Returns the k nodes that are most similar to a node by their PathSim score on a symmetric meta path.
+        See hetpy.graphUtils.metaPathSimilarity.pathsim_topk.
+
+        Parameters:
+        ------------------
+            node : Node
+                The node for which similar nodes are searched. The similar nodes have the same type.
+            metapath : MetaPath
+                A symmetric meta path that is defined on the graph.
+            k : int
+                The number of returned nodes.
+
+        Returns:
+        ------------------
+            similar_nodes : List[tuple]
+                Up to k (node id, score) tuples ordered by decreasing score.
+        """
+        from hetpy.graphUtils.metaPathSimilarity import pathsim_topk
+        return pathsim_topk(self, node, metapath, k)
+
+    def pathsim_topk_all(self, metapath: MetaPath, k: int = 10, block_size: int = 1024, node_type: str = None) -> dict:
+        """
+        Returns the k most similar nodes by their PathSim score on a symmetric meta path for all nodes of a type.
+        See hetpy.graphUtils.metaPathSimilarity.pathsim_topk_all.
+
+        Parameters:
+        ------------------
+            metapath : MetaPath
+                A symmetric meta path that is defined on the graph.
+            k : int
+                The number of similar nodes per node.
+            block_size : int
+                The number of rows of the commuting matrix that are computed at once.
+            node_type : str
+                The type of the compared nodes. Defaults to the starting type of the meta path.
+
+        Returns:
+        ------------------
+            similar_nodes : dict
+                Maps the id of every node of the type to up to k (node id, score) tuples ordered by decreasing score.
+        """
+        from hetpy.graphUtils.metaPathSimilarity import pathsim_topk_all
+        return pathsim_topk_all(self, metapath, k, block_size, node_type)
+
+
+    def to_sparse(self, edge_type: str = None, node_types: tuple = None, format: str = "csr") -> dict:
+        """
+        Returns the adjacency of every relation of the graph as a sparse matrix. A relation consists of the edges of one edge type between a source and a target node type,
+        in the direction in which the edges are stored. Rows and columns index the nodes of the source and target type in the order of the nodes of the graph,
+        entries count the edges between two nodes. The matrices are cached until the graph changes and are shared between calls, so they should not be changed.
+
+        Parameters:
+        ------------------
+            edge_type : str
+                Only returns the relations of this edge type. Defaults to None, which returns the relations of all edge types.
+            node_types : tuple
+                Only returns the relations between this (source type, target type) pair. Defaults to None, which returns the relations between all node types.
+            format : str
+                The scipy sparse format of the matrices, for example "csr" or "csc". Defaults to "csr".
+
+        Returns:
+        ------------------
+            relations : dict
+                Maps (source type, edge type, target type) tuples to (matrix, row ids, column ids) tuples. The id arrays map the row and column indices to node ids.
+        """
+        if self.__sparseCache is None or self.__sparseCache[0] != self.version:
+            self.__sparseCache = (self.version, {"csr": self.__buildSparseRelations()})
+        formats = self.__sparseCache[1]
+        if format not in formats:
+            formats[format] = {key: (matrix.asformat(format), row_ids, column_ids) for key, (matrix, row_ids, column_ids) in formats["csr"].items()}
+
+        relations = {}
+        for (source_type, relation_type, target_type), relation in formats[format].items():
+            if edge_type is not None and relation_type != edge_type:
+                continue
+            if node_types is not None and (source_type, target_type) != tuple(node_types):
+                continue
+            relations[(source_type, relation_type, target_type)] = relation
+        return relations
+
+    def __buildSparseRelations(self) -> dict:
+        """
+        Builds the CSR matrices of all relations from the igraph edge list. The positions of the nodes of every type give their row and column indices.
+        """
+        graph = self.graph
+        node_ids = np.asarray(self._vertexNodeIds())
+        type_labels = {}
+        type_codes = np.fromiter((type_labels.setdefault(type, len(type_labels)) for type in graph.vs["Type"]), dtype=np.int64, count=graph.vcount())
+        type_labels = list(type_labels)
+        type_indices = np.empty(graph.vcount(), dtype=np.int64)
+        type_positions = []
+        for code in range(len(type_labels)):
+            positions = np.flatnonzero(type_codes == code)
+            type_indices[positions] = np.arange(len(positions))
+            type_positions.append(positions)
+
+        edge_list = np.asarray(graph.get_edgelist(), dtype=np.int64).reshape(-1, 2)
+        edge_labels = {}
+        edge_codes = np.fromiter((edge_labels.setdefault(type, len(edge_labels)) for type in graph.es["Type"]), dtype=np.int64, count=graph.ecount())
+        edge_labels = list(edge_labels)
+        relation_keys = np.column_stack((type_codes[edge_list[:, 0]], edge_codes, type_codes[edge_list[:, 1]]))
+        keys, relation_codes = np.unique(relation_keys, axis=0, return_inverse=True)
+
+        relations = {}
+        for code, (source_code, edge_code, target_code) in enumerate(keys.tolist()):
+            selected = relation_codes.ravel() == code
+            shape = (len(type_positions[source_code]), len(type_positions[target_code]))
+            # duplicate entries of multi-edges are summed into edge counts
+            matrix = sparse.csr_matrix((np.ones(np.count_nonzero(selected), dtype=np.int64), (type_indices[edge_list[selected, 0]], type_indices[edge_list[selected, 1]])), shape=shape)
+            relations[(type_labels[source_code], edge_labels[edge_code], type_labels[target_code])] = (matrix, node_ids[type_positions[source_code]], node_ids[type_positions[target_code]])
+        return relations
+
     # util function for graph file storage
     def export_to_json(self, filepath: str, layout_function='auto'):
         """
@@ -488,7 +1286,8 @@ class HetGraph:
             meta_path_dict = {
                 'path': meta_path.path,
                 'description': meta_path.description,
-                'abbreviation': meta_path.abbreviation
+                'abbreviation': meta_path.abbreviation,
+                'directed': meta_path.directed
             }
             meta_path_definitions.append(meta_path_dict)
 
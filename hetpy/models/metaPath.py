@@ -11,11 +11,13 @@ class MetaPath:
     """A short, optional description."""
     abbreviation: str
     """The abbreviation of the meta path. Functions as a identifier."""
+    directed: bool
+    """Whether instances of the meta path follow edges only from their source to their target."""
 
     length: int
     """The length of the meta path."""
 
-    def __init__(self, path: List[str], description: str = "", abbreviation: str = ""):
+    def __init__(self, path: List[str], description: str = "", abbreviation: str = "", directed: bool = False):
         """
         Maps parameters and attributes on object creation.
 
@@ -27,9 +29,12 @@ class MetaPath:
                 A short, optional description.
             abbreviation : str
                 The abbreviation of the meta path. Functions as a identifier.
+            directed : bool
+                Whether instances of the meta path follow edges only from their source to their target. Defaults to False, which uses edges in both directions. Edges of undirected graphs are always used in both directions.
         """
         self.path = path
         self.description = description
         self.abbreviation = abbreviation
+        self.directed = directed
 
         self.length = len(path)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from ..utils.utils import generateNodeId
+from ..utils.utils import generateNodeId, internType
 
 
 
@@ -7,8 +7,10 @@ class Node:
     Class that represents a single vertex in a heterogeneous information network. 
     """
 
+    __slots__ = ("id", "type", "attributes")
+
     id: str
-    """Unique id of the vertex. Gets autogenerated by util function."""
+    """Unique id of the vertex. Gets autogenerated by util function unless provided."""
 
     type: str
     """Type of the vertex. Required."""
@@ -16,7 +18,7 @@ class Node:
     attributes: dict
     """Dictionary of attributes with the attribute identifiers as keys."""
 
-    def __init__(self, type: str, attributes: dict = {}) -> None:
+    def __init__(self, type: str, attributes: dict = {}, id = None) -> None:
         """
         Maps parameters and attributes on object construction. 
 
@@ -26,8 +28,10 @@ class Node:
                 Type of the vertex
             attributes : dict
                 Dictionary of vertex attributes. Attribute identifier are used as keys and the attributes acutal value as dict values.
+            id : str | int
+                Unique id of the vertex. Generated with the configured node id strategy if omitted.
         """
-        self.id = generateNodeId()
-        self.type = type
+        self.id = generateNodeId() if id is None else id
+        self.type = internType(type)
 
         self.attributes = attributes
\ No newline at end of file
@@ -0,0 +1,137 @@
+from collections import OrderedDict
+import sys
+
+
+class ProjectionCache:
+    """
+    A least recently used cache for meta projections of a HetGraph. Entries are keyed by the meta path, the projection arguments and the version of the graph,
+    so every change of the graph invalidates the projections that were created before it.
+    """
+
+    max_entries: int
+    """The maximum number of cached projections. None disables the limit."""
+
+    max_bytes: int
+    """The maximum estimated size of all cached projections in bytes. None disables the limit."""
+
+    hits: int
+    """The number of lookups that returned a cached projection."""
+
+    misses: int
+    """The number of lookups that did not find a cached projection."""
+
+    evictions: int
+    """The number of projections that were removed to respect the limits."""
+
+    nbytes: int
+    """The estimated size of all cached projections in bytes."""
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = None) -> None:
+        """
+        Maps parameters on object creation.
+
+        Parameters
+        ----------
+            max_entries : int
+                The maximum number of cached projections. Defaults to 128, None disables the limit.
+            max_bytes : int
+                The maximum estimated size of all cached projections in bytes. Defaults to None, which disables the limit.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self.__entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def get(self, key: tuple) -> 'HetGraph':
+        """
+        Returns the cached projection for a key and marks it as recently used. Returns None if there is no projection for the key
+        or if the cached projection was changed after it was cached.
+
+        Parameters
+        ----------
+            key : tuple
+                The cache key. Its last element is the version of the projected graph.
+        """
+        entry = self.__entries.get(key)
+        if entry is not None and entry[0].version != entry[1]:
+            # the projection was changed by the caller and no longer matches its graph
+            self.__remove(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.__entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: tuple, projection: 'HetGraph') -> None:
+        """
+        Caches a projection and evicts the least recently used projections until the limits are respected.
+        Projections that are larger than max_bytes are not cached.
+
+        Parameters
+        ----------
+            key : tuple
+                The cache key. Its last element is the version of the projected graph.
+            projection : hetpy.HetGraph
+                The projection that is cached.
+        """
+        if key in self.__entries:
+            self.__remove(key)
+        size = self.__estimateBytes(projection)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self.__entries[key] = (projection, projection.version, size)
+        self.nbytes += size
+        while (self.max_entries is not None and len(self.__entries) > self.max_entries) or (self.max_bytes is not None and self.nbytes > self.max_bytes):
+            self.__remove(next(iter(self.__entries)))
+            self.evictions += 1
+
+    def invalidate(self, version: int) -> None:
+        """
+        Removes all projections that were created for another version of the graph.
+
+        Parameters
+        ----------
+            version : int
+                The current version of the graph.
+        """
+        for key in [key for key in self.__entries if key[-1] != version]:
+            self.__remove(key)
+
+    def clear(self) -> None:
+        """
+        Removes all cached projections. The statistics are kept.
+        """
+        self.__entries.clear()
+        self.nbytes = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the hit and miss statistics of the cache together with its current size.
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": len(self.__entries), "nbytes": self.nbytes}
+
+    def __remove(self, key: tuple) -> None:
+        """
+        Removes a cached projection and releases its estimated size.
+        """
+        self.nbytes -= self.__entries.pop(key)[2]
+
+    @staticmethod
+    def __estimateBytes(projection: 'HetGraph') -> int:
+        """
+        Estimates the memory that the nodes and edges of a projection occupy.
+        """
+        nodes = projection.nodes
+        edges = projection.edges
+        size = sys.getsizeof(nodes) + sys.getsizeof(edges)
+        size += sum(sys.getsizeof(node) + sys.getsizeof(node.attributes) for node in nodes)
+        size += sum(sys.getsizeof(edge) + sys.getsizeof(edge.attributes) for edge in edges)
+        return size
@@ -0,0 +1,76 @@
+from .metaPath import MetaPath
+
+
+class ProjectionPlan:
+    """
+    The order in which the MATRIX engine multiplies the typed adjacency matrices of a meta path. The order is a binary tree over the positions of the
+    meta path: leaves are positions and inner nodes are (left, right) tuples that are multiplied. The cost of an order is estimated from the node counts
+    of the types that the meta path passes and the edge counts of its relations.
+    """
+
+    metapath: MetaPath
+    """The meta path that is evaluated."""
+
+    strategy: str
+    """The name of the chosen order: "left_to_right", "right_to_left" or "matrix_chain"."""
+
+    order: object
+    """The chosen order as a binary tree of meta path positions."""
+
+    costs: dict
+    """Maps the names of all considered orders to their estimated number of multiplications."""
+
+    dimensions: list
+    """The estimated number of nodes before, between and after the steps of the meta path. The first entry is the number of start nodes."""
+
+    relation_sizes: list
+    """The estimated number of non-zero entries of the adjacency matrix of every step of the meta path."""
+
+    def __init__(self, metapath: MetaPath, strategy: str, order: object, costs: dict, dimensions: list, relation_sizes: list) -> None:
+        """
+        Maps parameters on object creation. Plans are created by plan_meta_projection.
+        """
+        self.metapath = metapath
+        self.strategy = strategy
+        self.order = order
+        self.costs = costs
+        self.dimensions = dimensions
+        self.relation_sizes = relation_sizes
+
+    @property
+    def estimated_cost(self) -> float:
+        """The estimated number of multiplications of the chosen order."""
+        return self.costs[self.strategy]
+
+    def factors(self) -> list:
+        """
+        Splits the order into the factors that the rows of the start nodes are multiplied with one after another. The first factor is the first position of the
+        meta path, every later factor is a subtree that does not depend on the start nodes and can be computed once.
+        """
+        factors = []
+        order = self.order
+        while isinstance(order, tuple):
+            factors.insert(0, order[1])
+            order = order[0]
+        return [order] + factors
+
+    def explain(self) -> str:
+        """
+        Describes the chosen order, the estimated costs of all considered orders and the statistics that the estimates are based on.
+        """
+        lines = [f"Meta path {self.metapath.abbreviation}: {' -> '.join(self.metapath.path)}",
+                 f"Chosen order: {self.strategy} {self.__format(self.order)}",
+                 "Estimated multiplications:"]
+        lines += [f"    {strategy}: {cost:,.0f}" for strategy, cost in self.costs.items()]
+        lines.append("Steps:")
+        for position, edge_type in enumerate(self.metapath.path):
+            lines.append(f"    {edge_type}: {self.dimensions[position]:,} x {self.dimensions[position + 1]:,} nodes, {self.relation_sizes[position]:,} entries")
+        return "\n".join(lines)
+
+    def __format(self, order: object) -> str:
+        """
+        Formats an order with parentheses around every product.
+        """
+        if isinstance(order, tuple):
+            return f"({self.__format(order[0])} {self.__format(order[1])})"
+        return self.metapath.path[order]
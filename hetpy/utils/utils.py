@@ -1,7 +1,65 @@
 import uuid
+import sys
+
+from hetpy.enums.nodeIdEnums import NodeIdStrategy
+
+__node_id_strategy = NodeIdStrategy.UUID
+__next_sequential_node_id = 0
+
+def setNodeIdStrategy(strategy, start: int = None) -> None:
+    """
+    Sets the strategy that is used to generate the ids of new nodes. Ids that are passed on node creation are never replaced.
+
+    Parameters
+    ----------
+        strategy : NodeIdStrategy | callable
+            NodeIdStrategy.UUID for random uuid strings (default), NodeIdStrategy.SEQUENTIAL for increasing integers
+            or a function without parameters that returns a new id on every call.
+        start : int
+            The first id that is generated by the sequential strategy. Optional.
+    """
+    global __node_id_strategy, __next_sequential_node_id
+    if not isinstance(strategy, NodeIdStrategy) and not callable(strategy):
+        raise ValueError(f"{strategy} is neither a NodeIdStrategy nor a function.")
+    __node_id_strategy = strategy
+    if start is not None:
+        __next_sequential_node_id = start
+
+def reserveNodeIds(ids) -> None:
+    """
+    Makes sure that the sequential strategy does not generate any of the given integer ids in the future. Used when nodes with existing ids are loaded.
+    """
+    global __next_sequential_node_id
+    integer_ids = [id for id in ids if isinstance(id, int)]
+    if len(integer_ids) > 0:
+        __next_sequential_node_id = max(__next_sequential_node_id, max(integer_ids) + 1)
 
 def generateNodeId():
     """
-    Generates a random uuid using uuid package.
+    Generates a node id with the configured strategy. Defaults to a random uuid using uuid package.
+    """
+    global __next_sequential_node_id
+    if __node_id_strategy is NodeIdStrategy.UUID:
+        return str(uuid.uuid4())
+    if __node_id_strategy is NodeIdStrategy.SEQUENTIAL:
+        __next_sequential_node_id += 1
+        return __next_sequential_node_id - 1
+    return __node_id_strategy()
+
+def generateNodeIds(count: int) -> list:
+    """
+    Generates the given number of node ids with the configured strategy.
+    """
+    global __next_sequential_node_id
+    if __node_id_strategy is NodeIdStrategy.SEQUENTIAL:
+        __next_sequential_node_id += count
+        return list(range(__next_sequential_node_id - count, __next_sequential_node_id))
+    return [generateNodeId() for _ in range(count)]
+
+def internType(type):
+    """
+    Interns a type name so that all nodes and edges of the same type share a single string object.
     """
-    return str(uuid.uuid4())
\ No newline at end of file
+    if type.__class__ is str:
+        return sys.intern(type)
+    return type
\ No newline at end of file
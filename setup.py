@@ -9,5 +9,5 @@ setup(
     author_email='fabian.kneissl@gmx.de',
     license='GNU General Public License',
     packages=['hetpy', 'hetpy.models','hetpy.graphUtils','hetpy.utils','hetpy.exceptions','hetpy.enums'],
-    install_requires=['python-igraph']
+    install_requires=['python-igraph', 'numpy', 'scipy']
 )
\ No newline at end of file
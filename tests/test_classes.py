@@ -1,6 +1,6 @@
 import unittest
 
-from hetpy import Node, Edge, HetGraph, HetPaths, MetaPath
+from hetpy import Node, Edge, HetGraph, HetPaths, MetaPath, NodeIdStrategy, setNodeIdStrategy
 
 class TestClasses(unittest.TestCase):
 
@@ -17,6 +17,32 @@ class TestClasses(unittest.TestCase):
         self.assertEqual(node.type, "MockType")
         self.assertEqual(node.attributes, mockNodeAttributes)
     
+    def test_nodeWithId(self):
+        node = Node("MockType", id=42)
+        self.assertEqual(node.id, 42)
+        self.assertEqual(len(Node("MockType").id), 36)
+
+    def test_sequentialNodeIds(self):
+        try:
+            setNodeIdStrategy(NodeIdStrategy.SEQUENTIAL, start=100)
+            nodes = [Node("MockType1"), Node("MockType2")]
+            self.assertEqual([node.id for node in nodes], [100, 101])
+
+            graph = HetGraph.from_arrays(["MockType1", "MockType2"], [0], [1])
+            self.assertEqual([node.id for node in graph.nodes], [102, 103])
+        finally:
+            setNodeIdStrategy(NodeIdStrategy.UUID)
+
+    def test_customNodeIdStrategy(self):
+        try:
+            setNodeIdStrategy(lambda: "mockId")
+            self.assertEqual(Node("MockType").id, "mockId")
+        finally:
+            setNodeIdStrategy(NodeIdStrategy.UUID)
+
+        with self.assertRaises(ValueError):
+            setNodeIdStrategy("sequential")
+
     def test_edge(self):
         mockSourceNode = Node("MockType1")
         mockTargetNode = Node("MockType2")
@@ -47,6 +73,27 @@ class TestClasses(unittest.TestCase):
         edge = Edge(mockSourceNode, mockTargetNode, False)
         self.assertEqual(edge.type, "")
 
+    def test_compactNodeAndEdge(self):
+        mockSourceNode = Node("MockType" + "1")
+        mockTargetNode = Node("MockType2")
+        edge = Edge(mockSourceNode, mockTargetNode, False, "MockEdge" + "Type")
+
+        self.assertFalse(hasattr(mockSourceNode, "__dict__"))
+        self.assertFalse(hasattr(edge, "__dict__"))
+        # types are interned and shared between all elements of the same type
+        self.assertIs(mockSourceNode.type, Node("MockType1").type)
+        self.assertIs(edge.type, Edge(mockSourceNode, mockTargetNode, False, "MockEdgeType").type)
+
+    def test_edgeNodes(self):
+        mockSourceNode = Node("MockType1")
+        mockTargetNode = Node("MockType2")
+        edge = Edge(mockSourceNode, mockTargetNode, False, "MockEdgeType")
+        self.assertEqual(edge.nodes, (mockSourceNode, mockTargetNode))
+
+        edge.nodes = (mockTargetNode, mockSourceNode)
+        self.assertIs(edge.source, mockTargetNode)
+        self.assertIs(edge.target, mockSourceNode)
+
     def test_hetGraph(self):
         nodes = [Node("MockType1"),Node("MockType1"),Node("MockType2"),Node("MockType3")]
         edges = [Edge(nodes[0],nodes[2],False,"MockEdgeType1"), Edge(nodes[1], nodes[3],False,"MockEdgeType2")]
@@ -2,7 +2,7 @@ import unittest
 import json
 import datetime
 
-from hetpy import Node, Edge, HetGraph, HetPaths, MetaPath
+from hetpy import Node, Edge, HetGraph, HetPaths, MetaPath, NodeIdStrategy, setNodeIdStrategy, from_json
 
 
 
@@ -65,6 +65,26 @@ class TestClasses(unittest.TestCase):
 
             self.assertEqual(len(d["meta_path_definitions"]), 1)
     
+    def test_JSONDumpWithSequentialIds(self):
+        try:
+            setNodeIdStrategy(NodeIdStrategy.SEQUENTIAL, start=0)
+            graph = createHetGraphWithPathDefinitions()
+            graph.export_to_json('./tests/test_data/mockGraphExportWithSequentialIds.json')
+
+            with open('./tests/test_data/mockGraphExportWithSequentialIds.json') as f:
+                d = json.load(f)
+                self.assertEqual([node["id"] for node in d["nodes"]], [0, 1, 2, 3])
+                self.assertEqual(d["edges"][0]["source"], 0)
+
+            setNodeIdStrategy(NodeIdStrategy.SEQUENTIAL, start=0)
+            loaded_graph = from_json('./tests/test_data/mockGraphExportWithSequentialIds.json')
+            self.assertEqual([node.id for node in loaded_graph.nodes], [0, 1, 2, 3])
+            self.assertIs(loaded_graph.edges[0].source, loaded_graph.nodes[0])
+            # newly created nodes must not reuse loaded ids
+            self.assertEqual(Node("MockType1").id, 4)
+        finally:
+            setNodeIdStrategy(NodeIdStrategy.UUID)
+
     def test_JSONDumpWithDates(self):
         graph = createHetGraphWithPathDefinitions()
         graph.add_path((("MockType2","MockType3"),"EdgeTypeWithTimestamp"))
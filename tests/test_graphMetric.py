@@ -95,5 +95,29 @@ class TestMetrics(unittest.TestCase):
         pdf = het_graph.get_edge_type_dist(pdf=True)
         self.assertEqual(expected_pdf, pdf)
 
+    def test_typeDistAfterMutations(self):
+        het_graph = createHetGraph()
+        new_node = Node("MockType6")
+        het_graph.add_node(new_node)
+        het_graph.add_edge(Edge(het_graph.get_nodes_of_type("MockType1")[0], new_node, False, "EdgeType5"))
+        het_graph.delete_node(het_graph.get_nodes_of_type("MockType3")[0])
+
+        self.assertEqual(het_graph.get_node_type_dist(), {"MockType1": 5, "MockType2": 3, "MockType3": 3, "MockType4": 5, "MockType5": 4, "MockType6": 1})
+        self.assertEqual(het_graph.get_edge_type_dist(), {"EdgeType1": 5, "EdgeType2": 3, "EdgeType3": 3, "EdgeType4": 4, "EdgeType5": 1})
+        self.assertEqual([node.type for node in het_graph.get_nodes_of_type("MockType3")], ["MockType3"] * 3)
+        self.assertEqual(het_graph.get_nodes_of_type("MockType6")[0], new_node)
+        self.assertEqual([edge.type for edge in het_graph.get_edges_of_type("EdgeType3")], ["EdgeType3"] * 3)
+
+        het_graph.delete_edge(het_graph.get_edges_of_type("EdgeType5")[0])
+        self.assertEqual(het_graph.edge_types, {"EdgeType1", "EdgeType2", "EdgeType3", "EdgeType4"})
+
+    def test_typeDistOfGraphFromArrays(self):
+        het_graph = HetGraph.from_arrays(["MockType1", "MockType2", "MockType1", "MockType3"], [0, 2, 1], [1, 1, 3], edge_types=["EdgeType1", "EdgeType1", "EdgeType2"])
+
+        self.assertEqual(het_graph.get_node_type_dist(), {"MockType1": 2, "MockType2": 1, "MockType3": 1})
+        self.assertEqual(het_graph.get_edge_type_dist(pdf=True), {"EdgeType1": 2 / 3, "EdgeType2": 1 / 3})
+        self.assertEqual([node.type for node in het_graph.get_nodes_of_type("MockType1")], ["MockType1", "MockType1"])
+        self.assertEqual(het_graph.get_edges_of_type("EdgeType2")[0].target.type, "MockType3")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,11 +1,19 @@
 import unittest
 
-from hetpy import fromCSV, from_iGraph, create_meta_projection, from_json
+from hetpy import fromCSV, from_iGraph, create_meta_projection, create_meta_projections, find_meta_path_instances, count_meta_path_instances, plan_meta_projection, from_json, ProjectionEngine, ProjectionCache, MaintainedProjection, stream_meta_projection, write_meta_projection, create_blocked_meta_projection, metapath_random_walks
 from hetpy.models.hetPaths import HetPaths
 from hetpy.models.metaPath import MetaPath
 from hetpy.models import Node, Edge, HetGraph
+from hetpy.exceptions.commonExceptions import GraphDefinitionException, NotDefinedException
+from hetpy.exceptions.typeExceptions import TypeException
 
 import datetime
+import gc
+import os
+import tempfile
+import tracemalloc
+
+import numpy as np
 
 
 import igraph as ig
@@ -192,6 +200,31 @@ class TestUtils(unittest.TestCase):
         self.assertTrue(projection.find_edge(nodes[4], nodes[6]) is not None) # check if edge is defined in projection
         self.assertTrue(projection.find_edge(nodes[4], nodes[6]).directed is False) # check if edge is defined in projection
 
+    def test_directedMetaPathProjection(self):
+        nodes = [Node("Author"), Node("Author"), Node("Author"), Node("Paper"), Node("Author"), Node("Paper")]
+        edges = [Edge(nodes[0], nodes[3], True, "writes"), Edge(nodes[1], nodes[3], True, "writes"), Edge(nodes[3], nodes[2], True, "cites"),
+                Edge(nodes[4], nodes[5], True, "writes")]
+        paths = HetPaths([(("Author", "Paper"), "writes"), (("Paper", "Author"), "cites")])
+        undirected_metapath = MetaPath(["writes", "cites"], abbreviation="APA")
+        directed_metapath = MetaPath(["writes", "cites"], abbreviation="APA_directed", directed=True)
+        het_graph = HetGraph(nodes, edges, paths, [undirected_metapath, directed_metapath])
+
+        def projected_pairs(projection):
+            return sorted((edge.source.id, edge.target.id) for edge in projection.edges)
+
+        expected_pairs = sorted([(nodes[0].id, nodes[2].id), (nodes[1].id, nodes[2].id)])
+        for engine in ProjectionEngine:
+            self.assertEqual(projected_pairs(create_meta_projection(het_graph, directed_metapath, directed=True, engine=engine)), expected_pairs)
+            self.assertEqual(len(create_meta_projection(het_graph, undirected_metapath, directed=True, engine=engine).edges), 6)
+        maintained_projection = MaintainedProjection(het_graph, directed_metapath, directed=True)
+        self.assertEqual(projected_pairs(maintained_projection.projection), expected_pairs)
+
+        het_graph.add_edge(Edge(nodes[5], nodes[2], True, "cites"))
+        expected_pairs = sorted(expected_pairs + [(nodes[4].id, nodes[2].id)])
+        self.assertEqual(projected_pairs(create_meta_projection(het_graph, directed_metapath, directed=True)), expected_pairs)
+        self.assertEqual(projected_pairs(maintained_projection.projection), expected_pairs)
+        maintained_projection.close()
+
     def test_multigraphMetaProjection(self):
         nodes = [Node("MockType1"),Node("MockType1"),Node("MockType2"),Node("MockType3"),Node("MockType1"),Node("MockType2"),Node("MockType3")]
         edges = [Edge(nodes[0],nodes[2],True,"EdgeType1"), Edge(nodes[1], nodes[3],True,"EdgeType2"),
@@ -289,6 +322,377 @@ class TestUtils(unittest.TestCase):
         self.assertTrue(len(projection.edges), 12)
         self.assertTrue('Weight' in projection.edges[0].attributes.keys())
 
+    def test_matrixMetaProjection(self):
+        nodes = [Node("MockType1"),Node("MockType1"),Node("MockType2"),Node("MockType3"),Node("MockType1"),Node("MockType2"),Node("MockType3")]
+        edges = [Edge(nodes[0],nodes[2],True,"EdgeType1"), Edge(nodes[1], nodes[3],True,"EdgeType2"),
+                Edge(nodes[2], nodes[3], True, "EdgeType3"),Edge(nodes[5], nodes[3], True, "EdgeType3"),
+                Edge(nodes[4], nodes[5], True, "EdgeType1"),Edge(nodes[5], nodes[6], True, "EdgeType3"),
+                Edge(nodes[4], nodes[6], True, "EdgeType2"), Edge(nodes[4], nodes[2], True, "EdgeType1")]
+
+        edge_type_mappings = [(("MockType1","MockType2"), "EdgeType1"),(("MockType1","MockType3"), "EdgeType2"),(("MockType2","MockType3"), "EdgeType3")]
+        mockMetaPath = MetaPath(["EdgeType1", "EdgeType3"], "A mock meta path", "mck")
+        paths = HetPaths(edge_type_mappings)
+
+        het_graph = HetGraph(nodes, edges, paths, [mockMetaPath])
+
+        projection = create_meta_projection(het_graph, mockMetaPath, True, combine_edges='sum', engine=ProjectionEngine.MATRIX)
+
+        self.assertEqual(len(projection.nodes), 4)
+        self.assertEqual(len(projection.edges), 3)
+        self.assertEqual(projection.paths, {("MockType1", "MockType3"): "mck"})
+        self.assertTrue(projection.find_edge(nodes[0], nodes[3]).directed is True)
+        self.assertEqual(projection.find_edge(nodes[4], nodes[3]).attributes["Weight"], 2)
+        self.assertEqual(projection.find_edge(nodes[0], nodes[3]).attributes["Weight"], 1)
+        self.assertEqual(projection.find_edge(nodes[4], nodes[6]).attributes["Weight"], 1)
+        self.assertTrue(projection.find_edge(nodes[1], nodes[3]) is None)
+
+    def test_symmetricMatrixMetaProjection(self):
+        authors = [Node("Author") for _ in range(4)]
+        papers = [Node("Paper") for _ in range(3)]
+        venue = Node("Venue")
+        edges = [Edge(authors[0], papers[0], False, "writes"), Edge(authors[1], papers[0], False, "writes"), Edge(authors[1], papers[1], False, "writes"),
+                 Edge(authors[2], papers[2], False, "writes"), Edge(authors[3], papers[2], False, "writes"), Edge(papers[0], venue, False, "published_in"),
+                 Edge(papers[2], venue, False, "published_in")]
+        paths = HetPaths([(("Author", "Paper"), "writes"), (("Paper", "Author"), "written_by"), (("Paper", "Venue"), "published_in"), (("Venue", "Paper"), "publishes")])
+        graph = HetGraph(authors + papers + [venue], edges, path_list=paths)
+        venue_metapath = MetaPath(["writes", "published_in", "publishes", "written_by"], abbreviation="APVPA")
+        graph.add_meta_path(venue_metapath)
+
+        expected = {(authors[0].id, authors[1].id): 1, (authors[0].id, authors[2].id): 1, (authors[0].id, authors[3].id): 1, (authors[1].id, authors[2].id): 1,
+                    (authors[1].id, authors[3].id): 1, (authors[2].id, authors[3].id): 1}
+        expected.update({(target, source): count for (source, target), count in list(expected.items())})
+        for n_jobs in [1, 2]:
+            projection = create_meta_projection(graph, venue_metapath, directed=True, combine_edges="sum", engine=ProjectionEngine.MATRIX, n_jobs=n_jobs)
+            self.assertEqual({(edge.source.id, edge.target.id): edge.attributes["Weight"] for edge in projection.edges}, expected)
+
+    def test_planMetaProjection(self):
+        authors = [Node("Author") for _ in range(20)]
+        papers = [Node("Paper") for _ in range(20)]
+        venues = [Node("Venue") for _ in range(2)]
+        edges = [Edge(author, paper, False, "writes") for author, paper in zip(authors, papers)]
+        edges += [Edge(paper, venues[position % 2], False, "published_in") for position, paper in enumerate(papers)]
+        edges += [Edge(authors[0], papers[position], False, "writes") for position in range(1, 20)]
+        paths = HetPaths([(("Author", "Paper"), "writes"), (("Paper", "Author"), "written_by"), (("Paper", "Venue"), "published_in"), (("Venue", "Paper"), "publishes")])
+        graph = HetGraph(authors + papers + venues, edges, path_list=paths)
+        metapath = MetaPath(["published_in", "publishes", "written_by"], abbreviation="PVPA")
+        graph.add_meta_path(metapath)
+
+        plan = plan_meta_projection(graph, metapath)
+        self.assertEqual(set(plan.costs), {"left_to_right", "right_to_left", "matrix_chain"})
+        self.assertEqual(plan.estimated_cost, min(plan.costs.values()))
+        self.assertEqual(plan.dimensions, [20, 2, 20, 20])
+        self.assertEqual(plan.relation_sizes, [20, 20, 39])
+        self.assertTrue(f"Chosen order: {plan.strategy}" in plan.explain())
+
+        # the instance counts do not depend on the order of the multiplications
+        matrix_projection = create_meta_projection(graph, metapath, directed=True, combine_edges="sum", engine=ProjectionEngine.MATRIX)
+        self.assertEqual({(edge.source.id, edge.target.id): edge.attributes["Weight"] for edge in matrix_projection.edges}, count_meta_path_instances(graph, metapath, by="pair"))
+        self.assertEqual(sum(edge.attributes["Weight"] for edge in matrix_projection.edges), count_meta_path_instances(graph, metapath))
+
+    def test_matrixMetaProjectionMatchesTraversal(self):
+        graph = from_json('./tests/test_data/mock_conv_graph.json')
+        user_metapath = graph.meta_paths[0]
+
+        for combine_edges in [None, "sum"]:
+            traversal_projection = create_meta_projection(graph, user_metapath, directed=True, combine_edges=combine_edges)
+            matrix_projection = create_meta_projection(graph, user_metapath, directed=True, combine_edges=combine_edges, engine="matrix")
+            traversal_edges = sorted((edge.source.id, edge.target.id, edge.attributes.get("Weight")) for edge in traversal_projection.edges)
+            matrix_edges = sorted((edge.source.id, edge.target.id, edge.attributes.get("Weight")) for edge in matrix_projection.edges)
+            self.assertEqual(traversal_edges, matrix_edges)
+
+    def test_parallelMetaProjection(self):
+        graph = from_json('./tests/test_data/mock_conv_graph.json')
+        user_metapath = graph.meta_paths[0]
+
+        for engine in [ProjectionEngine.TRAVERSAL, ProjectionEngine.MATRIX]:
+            projection = create_meta_projection(graph, user_metapath, directed=True, combine_edges="sum", engine=engine)
+            parallel_projection = create_meta_projection(graph, user_metapath, directed=True, combine_edges="sum", engine=engine, n_jobs=2)
+            edges = [(edge.source.id, edge.target.id, edge.attributes["Weight"]) for edge in projection.edges]
+            parallel_edges = [(edge.source.id, edge.target.id, edge.attributes["Weight"]) for edge in parallel_projection.edges]
+            self.assertEqual(edges, parallel_edges)
+
+        for n_jobs in [0, -2]:
+            self.assertRaises(ValueError, create_meta_projection, graph, user_metapath, n_jobs=n_jobs)
+            self.assertRaises(ValueError, metapath_random_walks, graph, user_metapath, n_jobs=n_jobs)
+
+    def test_batchMetaProjection(self):
+        nodes = [Node("Author"), Node("Author"), Node("Author"), Node("Paper"), Node("Paper"), Node("Venue")]
+        edges = [Edge(nodes[0], nodes[3], False, "writes"), Edge(nodes[1], nodes[3], False, "writes"), Edge(nodes[1], nodes[4], False, "writes"),
+                 Edge(nodes[2], nodes[4], False, "writes"), Edge(nodes[3], nodes[5], False, "published_in"), Edge(nodes[4], nodes[5], False, "published_in")]
+        paths = HetPaths([(("Author", "Paper"), "writes"), (("Paper", "Author"), "written_by"), (("Paper", "Venue"), "published_in"), (("Venue", "Paper"), "publishes")])
+        graph = HetGraph(nodes, edges, path_list=paths)
+        metapaths = [MetaPath(["writes", "written_by"], abbreviation="APA"), MetaPath(["writes", "published_in", "publishes", "written_by"], abbreviation="APVPA"), MetaPath(["writes", "published_in"], abbreviation="APV")]
+        for metapath in metapaths:
+            graph.add_meta_path(metapath)
+
+        for engine in [ProjectionEngine.TRAVERSAL, ProjectionEngine.MATRIX]:
+            projections = create_meta_projections(graph, metapaths, directed=True, combine_edges="sum", engine=engine)
+            self.assertEqual(len(projections), len(metapaths))
+            for metapath, projection in zip(metapaths, projections):
+                expected = create_meta_projection(graph, metapath, directed=True, combine_edges="sum", engine=engine)
+                self.assertEqual(sorted((edge.source.id, edge.target.id, edge.attributes["Weight"]) for edge in projection.edges),
+                                 sorted((edge.source.id, edge.target.id, edge.attributes["Weight"]) for edge in expected.edges))
+
+        graph.projection_cache = ProjectionCache()
+        cached = create_meta_projection(graph, metapaths[0])
+        projections = create_meta_projections(graph, metapaths)
+        self.assertIs(projections[0], cached)
+        self.assertEqual(len(graph.projection_cache), len(metapaths))
+
+    def test_streamMetaProjection(self):
+        graph = from_json('./tests/test_data/mock_conv_graph.json')
+        user_metapath = graph.meta_paths[0]
+
+        projection = create_meta_projection(graph, user_metapath, directed=True, combine_edges="sum")
+        expected = sorted((edge.source.id, edge.target.id, edge.attributes["Weight"]) for edge in projection.edges)
+        for engine in [ProjectionEngine.TRAVERSAL, ProjectionEngine.MATRIX]:
+            self.assertEqual(sorted(stream_meta_projection(graph, user_metapath, engine=engine, block_size=3)), expected)
+
+            chunks = list(stream_meta_projection(graph, user_metapath, engine=engine, chunk_size=4, block_size=3))
+            self.assertTrue(all(len(chunk[0]) == 4 for chunk in chunks[:-1]))
+            streamed = sorted(zip(*(np.concatenate(arrays).tolist() for arrays in zip(*chunks))))
+            self.assertEqual(streamed, expected)
+
+        self.assertRaises(ValueError, list, stream_meta_projection(graph, user_metapath, chunk_size=0))
+        self.assertRaises(ValueError, list, stream_meta_projection(graph, user_metapath, block_size=0))
+
+    def test_writeMetaProjection(self):
+        graph = from_json('./tests/test_data/mock_conv_graph.json')
+        user_metapath = graph.meta_paths[0]
+        expected = sorted(stream_meta_projection(graph, user_metapath))
+
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, "projection.csv")
+            self.assertEqual(write_meta_projection(graph, user_metapath, csv_path, chunk_size=4), len(expected))
+            with open(csv_path) as file:
+                rows = [line.strip().split(",") for line in file]
+            self.assertEqual(rows[0], ["source", "target", "weight"])
+            self.assertEqual(sorted((source, target, int(weight)) for source, target, weight in rows[1:]), expected)
+
+            npz_path = os.path.join(directory, "projection.npz")
+            self.assertEqual(write_meta_projection(graph, user_metapath, npz_path, chunk_size=4), len(expected))
+            with np.load(npz_path) as archive:
+                self.assertEqual(sorted(zip(archive["source"].tolist(), archive["target"].tolist(), archive["weight"].tolist())), expected)
+
+            self.assertRaises(ValueError, write_meta_projection, graph, user_metapath, os.path.join(directory, "projection.txt"))
+            self.assertRaises(ValueError, write_meta_projection, graph, user_metapath, os.path.join(directory, "empty.csv"), chunk_size=0)
+            self.assertRaises(ValueError, write_meta_projection, graph, user_metapath, os.path.join(directory, "empty.csv"), block_size=-1)
+            self.assertFalse(os.path.exists(os.path.join(directory, "empty.csv")))
+
+    def test_blockedMetaProjection(self):
+        graph = from_json('./tests/test_data/mock_conv_graph.json')
+        user_metapath = graph.meta_paths[0]
+        expected = sorted(stream_meta_projection(graph, user_metapath, engine=ProjectionEngine.MATRIX))
+
+        with tempfile.TemporaryDirectory() as directory:
+            for memory_budget in [1, 10 ** 9]:
+                projection = create_blocked_meta_projection(graph, user_metapath, directory=directory, memory_budget=memory_budget)
+                self.assertEqual(len(projection), len(expected))
+                self.assertEqual(sorted(projection), expected)
+                self.assertEqual(projection.block_count > 1, memory_budget == 1)
+
+                nodes = {node.id: node for node in graph.nodes}
+                source_id = expected[0][0]
+                self.assertEqual(projection.neighbours(nodes[source_id]), {target: weight for source, target, weight in expected if source == source_id})
+
+        with create_blocked_meta_projection(graph, user_metapath, memory_budget=1) as projection:
+            directory = projection.directory
+            self.assertTrue(os.path.isdir(directory))
+            sources = {source for source, _, _ in expected}
+            isolated_node = next(node for node in graph.nodes if node.id not in sources)
+            self.assertEqual(projection.neighbours(isolated_node), {})
+            self.assertRaises(NotDefinedException, projection.neighbours, Node("User"))
+        self.assertFalse(os.path.exists(directory))
+
+        projection = create_blocked_meta_projection(graph, user_metapath, memory_budget=1)
+        directory = projection.directory
+        del projection
+        gc.collect()
+        self.assertFalse(os.path.exists(directory))
+
+    def test_blockedMetaProjectionMemoryBudget(self):
+        # every X node reaches all X nodes over a complete bipartite Y-Z core, so the planner multiplies the large core first
+        x_count, y_count, z_count = 200, 100, 100
+        node_types = ["X"] * x_count + ["Y"] * y_count + ["Z"] * z_count
+        core = np.array([(x_count + y, x_count + y_count + z) for y in range(y_count) for z in range(z_count)])
+        sources = np.concatenate((np.arange(x_count), core[:, 0]))
+        targets = np.concatenate((x_count + np.arange(x_count) % y_count, core[:, 1]))
+        paths = HetPaths([(("X", "Y"), "xy"), (("Y", "X"), "yx"), (("Y", "Z"), "yz"), (("Z", "Y"), "zy")])
+        metapath = MetaPath(["xy", "yz", "zy", "yx"], abbreviation="XYZYX")
+        graph = HetGraph.from_arrays(node_types, sources, targets, edge_types=["xy"] * x_count + ["yz"] * len(core), node_ids=np.arange(len(node_types)), path_list=paths, meta_paths=[metapath])
+        self.assertNotEqual(plan_meta_projection(graph, metapath).strategy, "left_to_right")
+
+        # builds the cached adjacency, which is shared with all projections and not part of the budget
+        count_meta_path_instances(graph, metapath)
+        memory_budget = 128 * 1024
+        tracemalloc.start()
+        try:
+            with create_blocked_meta_projection(graph, metapath, memory_budget=memory_budget) as projection:
+                self.assertEqual(len(projection), x_count * (x_count - 1))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 2 * memory_budget)
+
+    def test_cachedMetaProjection(self):
+        graph = from_json('./tests/test_data/mock_conv_graph.json')
+        user_metapath = graph.meta_paths[0]
+        graph.projection_cache = ProjectionCache(max_entries=1)
+
+        projection = create_meta_projection(graph, user_metapath, directed=True, combine_edges="sum")
+        self.assertIs(create_meta_projection(graph, user_metapath, directed=True, combine_edges="sum"), projection)
+        self.assertEqual(graph.projection_cache.stats()["hits"], 1)
+
+        # different arguments are cached separately and evict the least recently used projection
+        create_meta_projection(graph, user_metapath, directed=False, combine_edges="sum")
+        self.assertEqual(graph.projection_cache.evictions, 1)
+        self.assertIsNot(create_meta_projection(graph, user_metapath, directed=True, combine_edges="sum"), projection)
+
+        # changing the graph invalidates its projections
+        projection = create_meta_projection(graph, user_metapath, directed=True, combine_edges="sum")
+        graph.delete_edge(graph.edges[0])
+        self.assertIsNot(create_meta_projection(graph, user_metapath, directed=True, combine_edges="sum"), projection)
+        self.assertEqual(graph.projection_cache.stats()["misses"], 4)
+        self.assertEqual(len(graph.projection_cache), 1)
+
+    def test_projectionCacheByteLimit(self):
+        graph = from_json('./tests/test_data/mock_conv_graph.json')
+        user_metapath = graph.meta_paths[0]
+        graph.projection_cache = ProjectionCache(max_bytes=1)
+
+        create_meta_projection(graph, user_metapath, directed=True, combine_edges="sum")
+        self.assertEqual(len(graph.projection_cache), 0)
+        self.assertEqual(graph.projection_cache.nbytes, 0)
+
+    def test_maintainedMetaProjection(self):
+        graph = from_json('./tests/test_data/mock_conv_graph.json')
+        user_metapath = graph.meta_paths[0]
+        maintained_projection = MaintainedProjection(graph, user_metapath, directed=True)
+
+        def projected_edges(projection):
+            return sorted((edge.source.id, edge.target.id, edge.attributes["Weight"]) for edge in projection.edges)
+
+        self.assertEqual(projected_edges(maintained_projection.projection), projected_edges(create_meta_projection(graph, user_metapath, directed=True, combine_edges="sum")))
+
+        tweets = graph.get_nodes_of_type("Tweet")
+        graph.add_edge(Edge(tweets[0], tweets[-1], True))
+        graph.delete_edge(graph.edges[3])
+        graph.delete_node(graph.get_nodes_of_type("User")[0])
+        expected_projection = create_meta_projection(graph, user_metapath, directed=True, combine_edges="sum", engine=ProjectionEngine.MATRIX)
+        self.assertEqual(projected_edges(maintained_projection.projection), projected_edges(expected_projection))
+        self.assertEqual(len(maintained_projection.projection.nodes), len(expected_projection.nodes))
+
+        maintained_projection.close()
+        graph.delete_edge(graph.edges[0])
+        self.assertEqual(projected_edges(maintained_projection.projection), projected_edges(expected_projection))
+
+    def test_findMetaPathInstances(self):
+        nodes = [Node("MockType1"),Node("MockType1"),Node("MockType2"),Node("MockType3"),Node("MockType1"),Node("MockType2"),Node("MockType3")]
+        edges = [Edge(nodes[0],nodes[2],True,"EdgeType1"), Edge(nodes[1], nodes[3],True,"EdgeType2"),
+                Edge(nodes[2], nodes[3], True, "EdgeType3"),Edge(nodes[5], nodes[3], True, "EdgeType3"),
+                Edge(nodes[4], nodes[5], True, "EdgeType1"),Edge(nodes[5], nodes[6], True, "EdgeType3"),
+                Edge(nodes[4], nodes[6], True, "EdgeType2"), Edge(nodes[4], nodes[2], True, "EdgeType1")]
+
+        edge_type_mappings = [(("MockType1","MockType2"), "EdgeType1"),(("MockType2","MockType1"), "EdgeType4"),(("MockType1","MockType3"), "EdgeType2"),(("MockType2","MockType3"), "EdgeType3")]
+        mockMetaPath = MetaPath(["EdgeType1", "EdgeType3"], "A mock meta path", "mck")
+        returningMetaPath = MetaPath(["EdgeType1", "EdgeType4"], "A meta path that can return to its start", "ret")
+        paths = HetPaths(edge_type_mappings)
+
+        het_graph = HetGraph(nodes, edges, paths, [mockMetaPath, returningMetaPath])
+
+        instances = find_meta_path_instances(het_graph, mockMetaPath)
+        instance_ids = sorted([node.id for node in instance] for instance in instances)
+        expected_ids = sorted([[nodes[0].id, nodes[2].id, nodes[3].id], [nodes[4].id, nodes[2].id, nodes[3].id], [nodes[4].id, nodes[5].id, nodes[3].id], [nodes[4].id, nodes[5].id, nodes[6].id]])
+        self.assertEqual(instance_ids, expected_ids)
+
+        self.assertEqual(len(find_meta_path_instances(het_graph, returningMetaPath)), 2)
+        self.assertEqual(len(find_meta_path_instances(het_graph, returningMetaPath, simple=False)), 5)
+
+    def test_countMetaPathInstances(self):
+        graph = from_json('./tests/test_data/mock_conv_graph.json')
+        user_metapath = graph.meta_paths[0]
+        projection = create_meta_projection(graph, user_metapath, directed=True, combine_edges="sum", engine=ProjectionEngine.MATRIX)
+        pair_counts = {(edge.source.id, edge.target.id): edge.attributes["Weight"] for edge in projection.edges}
+        source_counts = {}
+        for (source, _), count in pair_counts.items():
+            source_counts[source] = source_counts.get(source, 0) + count
+
+        self.assertEqual(count_meta_path_instances(graph, user_metapath, by="pair"), pair_counts)
+        self.assertEqual(count_meta_path_instances(graph, user_metapath, by="source"), source_counts)
+        self.assertEqual(count_meta_path_instances(graph, user_metapath), sum(pair_counts.values()))
+        self.assertEqual(count_meta_path_instances(graph, user_metapath, by="source", block_size=1), source_counts)
+
+        paths = HetPaths([(("Author", "Paper"), "writes"), (("Paper", "Author"), "written_by")])
+        array_graph = HetGraph.from_arrays(["Author", "Author", "Paper", "Author"], [0, 1, 3], [2, 2, 2], edge_types=["writes"] * 3, path_list=paths,
+                                           meta_paths=[MetaPath(["writes", "written_by"], abbreviation="APA")])
+        self.assertEqual(count_meta_path_instances(array_graph, array_graph.meta_paths[0], block_size=2), 6)
+        self.assertIsNone(array_graph._nodes)
+
+    def test_pathSimTopK(self):
+        authors = [Node("Author") for _ in range(4)]
+        papers = [Node("Paper") for _ in range(3)]
+        edges = [Edge(authors[0], papers[0], False, "writes"), Edge(authors[1], papers[0], False, "writes"), Edge(authors[0], papers[1], False, "writes"),
+                 Edge(authors[1], papers[1], False, "writes"), Edge(authors[2], papers[1], False, "writes"), Edge(authors[3], papers[2], False, "writes")]
+        paths = HetPaths([(("Author", "Paper"), "writes"), (("Paper", "Author"), "written_by")])
+        graph = HetGraph(authors + papers, edges, path_list=paths)
+        coauthor_metapath = MetaPath(["writes", "written_by"], abbreviation="APA")
+        graph.add_meta_path(coauthor_metapath)
+
+        similar_authors = graph.pathsim_topk(authors[0], coauthor_metapath, k=2)
+        self.assertEqual([node_id for node_id, _ in similar_authors], [authors[1].id, authors[2].id])
+        self.assertAlmostEqual(similar_authors[0][1], 1.0)
+        self.assertAlmostEqual(similar_authors[1][1], 2 / 3)
+        self.assertEqual(graph.pathsim_topk(authors[3], coauthor_metapath), [])
+
+        all_similar_authors = graph.pathsim_topk_all(coauthor_metapath, k=1, block_size=2)
+        self.assertEqual(set(all_similar_authors), {author.id for author in authors})
+        self.assertEqual(all_similar_authors[authors[1].id], [(authors[0].id, 1.0)])
+        self.assertEqual(all_similar_authors[authors[2].id], [(authors[0].id, 2 / 3)])
+
+        asymmetric_metapath = MetaPath(["writes"], abbreviation="AP")
+        graph.add_meta_path(asymmetric_metapath)
+        self.assertRaises(GraphDefinitionException, graph.pathsim_topk, authors[0], asymmetric_metapath)
+        self.assertRaises(TypeException, graph.pathsim_topk, papers[0], coauthor_metapath)
+        self.assertRaises(NotDefinedException, graph.pathsim_topk, Node("Author"), coauthor_metapath)
+
+        array_graph = HetGraph.from_arrays(["Author", "Author", "Paper"], [0, 1], [2, 2], edge_types=["writes", "writes"], node_ids=["a", "b", "p"],
+                                           path_list=paths, meta_paths=[coauthor_metapath])
+        self.assertEqual(array_graph.pathsim_topk(Node("Author", id="a"), coauthor_metapath), [("b", 1.0)])
+        self.assertIsNone(array_graph._nodes)
+
+        directed_edges = [Edge(edge.source, edge.target, True, edge.type) for edge in edges]
+        directed_graph = HetGraph(authors + papers, directed_edges, path_list=paths, meta_paths=[coauthor_metapath])
+        directed_metapath = MetaPath(["writes", "written_by"], abbreviation="APA_directed", directed=True)
+        directed_graph.add_meta_path(directed_metapath)
+        self.assertEqual(len(directed_graph.pathsim_topk(authors[0], coauthor_metapath)), 2)
+        # only the stored direction of the edges is followed, so the directed meta path has no mirrored second half
+        self.assertRaises(GraphDefinitionException, directed_graph.pathsim_topk, authors[0], directed_metapath)
+
+    def test_metaPathRandomWalks(self):
+        authors = [Node("Author") for _ in range(3)]
+        papers = [Node("Paper") for _ in range(2)]
+        edges = [Edge(authors[0], papers[0], False, "writes"), Edge(authors[1], papers[0], False, "writes"), Edge(authors[1], papers[1], False, "writes"), Edge(authors[2], papers[1], False, "writes")]
+        paths = HetPaths([(("Author", "Paper"), "writes"), (("Paper", "Author"), "written_by")])
+        graph = HetGraph(authors + papers, edges, path_list=paths)
+        coauthor_metapath = MetaPath(["writes", "written_by"], abbreviation="APA")
+        graph.add_meta_path(coauthor_metapath)
+
+        walks = metapath_random_walks(graph, coauthor_metapath, walks_per_node=4, walk_length=7, seed=42, batch_size=5)
+        self.assertEqual(walks.shape, (12, 7))
+        self.assertEqual(walks.dtype, np.int32)
+        nodes = graph.nodes
+        neighbours = {(edge.source.id, edge.target.id) for edge in graph.edges} | {(edge.target.id, edge.source.id) for edge in graph.edges}
+        self.assertEqual([nodes[walk[0]].id for walk in walks[:3]], [author.id for author in authors])
+        for walk in walks:
+            self.assertEqual([nodes[position].type for position in walk], ["Author", "Paper"] * 3 + ["Author"])
+            self.assertTrue(all((nodes[source].id, nodes[target].id) in neighbours for source, target in zip(walk[:-1], walk[1:])))
+
+        self.assertTrue(np.array_equal(walks, metapath_random_walks(graph, coauthor_metapath, walks_per_node=4, walk_length=7, seed=42, batch_size=5, n_jobs=2)))
+        with tempfile.TemporaryDirectory() as directory:
+            stored_walks = metapath_random_walks(graph, coauthor_metapath, walks_per_node=4, walk_length=7, seed=42, batch_size=5, filepath=os.path.join(directory, "walks.npy"))
+            self.assertTrue(np.array_equal(walks, stored_walks))
+            del stored_walks
+
     def test_fromJSON(self):
         graph = from_json('./tests/test_data/mockGraphExportWithMetaPaths.json')
         
@@ -1,5 +1,6 @@
 import unittest
 import matplotlib.pyplot as plt
+import numpy as np
 
 from hetpy import Node, Edge, HetGraph, HetPaths
 
@@ -74,6 +75,24 @@ class TestClasses(unittest.TestCase):
 
         self.assertTrue("Some defined edge types do not match the defined paths" in str(context.exception))
 
+    def test_edgeTypeMismatchReport(self):
+        nodes = [Node("MockType1"),Node("MockType1"),Node("MockType2"),Node("MockType3")]
+        edges = [Edge(nodes[0],nodes[2],False,"InvalidEdgeType"), Edge(nodes[1], nodes[2],False,"InvalidEdgeType"), Edge(nodes[1], nodes[3],False), Edge(nodes[2], nodes[3],False)]
+
+        edge_type_mappings = [(("MockType1","MockType2"), "EdgeType1"),(("MockType1","MockType3"), "EdgeType2")]
+        paths = HetPaths(edge_type_mappings)
+
+        with self.assertRaises(Exception) as context:
+            HetGraph(nodes, edges, paths)
+
+        # all offending edges are reported at once
+        self.assertEqual(context.exception.mismatches, {("MockType1", "MockType2", "InvalidEdgeType", "EdgeType1"): 2, ("MockType2", "MockType3", "", None): 1})
+
+        graph = HetGraph(nodes, edges[:3])
+        self.assertEqual(graph.validate_edge_types(), {})
+        graph.paths = paths
+        self.assertEqual(graph.validate_edge_types(), {("MockType1", "MockType2", "InvalidEdgeType", "EdgeType1"): 2, ("MockType1", "MockType3", "", "EdgeType2"): 1})
+
     def test_shouldNotOverwriteEdgeTypes(self):
         nodes = [Node("MockType1"),Node("MockType1"),Node("MockType2"),Node("MockType3")]
         edges = [Edge(nodes[0],nodes[2],False,"EdgeType1"), Edge(nodes[1], nodes[3],False)]
@@ -340,6 +359,53 @@ class TestClasses(unittest.TestCase):
         igraph_node = hetGraph._mapNodeToIGraphVertex(new_node)
         self.assertEqual(igraph_node["NewAttr"], "NewVal")
 
+    def test_addNodesAndEdgesToGraph(self):
+        hetGraph = createHetGraphWithPathDefinitions()
+        new_nodes = [Node("MockType1", {"Name": "Node5"}), Node("MockType2", {"Color": "Red"})]
+        hetGraph.add_nodes(new_nodes)
+        new_edges = [Edge(new_nodes[0], new_nodes[1], False), Edge(new_nodes[0], hetGraph.nodes[3], False, "EdgeType2", {"Weight": 2})]
+        hetGraph.add_edges(new_edges)
+
+        self.assertEqual(len(hetGraph.nodes), 6)
+        self.assertEqual(len(hetGraph.graph.vs), 6)
+        self.assertEqual(hetGraph.graph.vs["Name"], [None, None, None, None, "Node5", None])
+        self.assertEqual(hetGraph.graph.vs["Type"][4:], ["MockType1", "MockType2"])
+        self.assertEqual(len(hetGraph.edges), 4)
+        self.assertEqual(hetGraph.graph.es["Type"], ["EdgeType1", "EdgeType2", "EdgeType1", "EdgeType2"])
+        self.assertEqual(hetGraph.graph.es[3]["Weight"], 2)
+        self.assertEqual(hetGraph.find_edge(new_nodes[0], new_nodes[1]).type, "EdgeType1")
+
+    def test_addEdgesWithUndefinedPath(self):
+        hetGraph = createHetGraphWithPathDefinitions()
+
+        with self.assertRaises(Exception) as context:
+            hetGraph.add_edges([Edge(hetGraph.nodes[0], hetGraph.nodes[1], False, "EdgeType1"), Edge(hetGraph.nodes[2], hetGraph.nodes[3], False)])
+
+        self.assertTrue("There is no path definition for the nodes ('MockType2', 'MockType3')" in str(context.exception))
+        self.assertEqual(len(hetGraph.edges), 2)
+        self.assertEqual(len(hetGraph.graph.es), 2)
+
+    def test_deleteNodesAndEdgesFromGraph(self):
+        nodes = [Node("MockType1"),Node("MockType1"),Node("MockType2"),Node("MockType3"),Node("MockType2")]
+        edges = [Edge(nodes[0],nodes[2],False,"MockEdgeType1"), Edge(nodes[1], nodes[3],False,"MockEdgeType2"), Edge(nodes[1], nodes[4],False,"MockEdgeType1"), Edge(nodes[3], nodes[4],False,"MockEdgeType3")]
+        hetGraph = HetGraph(nodes, edges)
+
+        with self.assertRaises(Exception):
+            hetGraph.delete_nodes([hetGraph.nodes[0], Node("MockType1")])
+        self.assertEqual(len(hetGraph.nodes), 5)
+
+        hetGraph.delete_edges([hetGraph.edges[0], hetGraph.edges[3]])
+        self.assertEqual(len(hetGraph.graph.es), 2)
+        self.assertEqual(hetGraph.edge_types, {"MockEdgeType1", "MockEdgeType2"})
+
+        hetGraph.delete_nodes([hetGraph.nodes[0], hetGraph.nodes[1]])
+        self.assertEqual(len(hetGraph.nodes), 3)
+        self.assertEqual(len(hetGraph.graph.vs), 3)
+        self.assertEqual(len(hetGraph.edges), 0)
+        self.assertEqual(len(hetGraph.graph.es), 0)
+        self.assertEqual(hetGraph.node_types, {"MockType2", "MockType3"})
+        self.assertEqual(hetGraph._mapNodeToIGraphVertex(nodes[4]).index, 2)
+
     def test_findEdge(self):
         het_graph = createSimpleMockHetGraph()
         
@@ -394,6 +460,274 @@ class TestClasses(unittest.TestCase):
         self.assertEqual(len(hetGraph.nodes), 4)
         self.assertEqual(len(hetGraph.edges), 1)
     
+    def test_copiedObjectsShareNodes(self):
+        nodes = [Node("MockType1"),Node("MockType1"),Node("MockType2"),Node("MockType3")]
+        edges = [Edge(nodes[0],nodes[2],False,"MockEdgeType1"), Edge(nodes[1], nodes[3],False,"MockEdgeType2")]
+        hetGraphObject = HetGraph(nodes, edges)
+
+        self.assertIsNot(hetGraphObject.nodes[0], nodes[0])
+        self.assertIs(hetGraphObject.edges[0].source, hetGraphObject.nodes[0])
+        self.assertIs(hetGraphObject.edges[1].target, hetGraphObject.nodes[3])
+
+    def test_zeroCopyGraphCreation(self):
+        nodes = [Node("MockType1"),Node("MockType1"),Node("MockType2"),Node("MockType3")]
+        edges = [Edge(nodes[0],nodes[2],False,"EdgeType1"), Edge(nodes[1], nodes[3],False)]
+        edge_type_mappings = [(("MockType1","MockType2"), "EdgeType1"),(("MockType1","MockType3"), "EdgeType2")]
+        paths = HetPaths(edge_type_mappings)
+
+        untyped_edge = edges[1]
+
+        graph = HetGraph(nodes, edges, paths, copy=False)
+
+        self.assertIs(graph.nodes, nodes)
+        self.assertIs(graph.edges[0], edges[0])
+        # inferred edge types must not change the edge objects of the caller
+        self.assertEqual(graph.edges[1].type, "EdgeType2")
+        self.assertEqual(untyped_edge.type, "")
+        self.assertIsNot(graph.edges[1], untyped_edge)
+        self.assertEqual(graph.graph.es["Type"], ["EdgeType1", "EdgeType2"])
+
+        graph.add_path((("MockType2","MockType3"), "EdgeType3"))
+        self.assertEqual(len(paths.keys()), 2)
+
+    def test_zeroCopyGraphMutations(self):
+        nodes = [Node("MockType1"),Node("MockType1"),Node("MockType2"),Node("MockType3")]
+        edges = [Edge(nodes[0],nodes[2],False,"MockEdgeType1"), Edge(nodes[1], nodes[3],False,"MockEdgeType2")]
+        graph = HetGraph(nodes, edges, copy=False)
+
+        new_node_attributes = {"NewAttr": "NewVal"}
+        new_node = Node("NewNodeType", new_node_attributes)
+        graph.add_node(new_node)
+        self.assertEqual(new_node_attributes, {"NewAttr": "NewVal"})
+        self.assertEqual(graph._mapNodeToIGraphVertex(new_node)["Type"], "NewNodeType")
+
+        graph.delete_edge(edges[0])
+        self.assertEqual(len(graph.edges), 1)
+        self.assertEqual(len(graph.graph.es), 1)
+        self.assertEqual(graph.edge_types, {"MockEdgeType2"})
+
+        graph.delete_node(nodes[1])
+        self.assertEqual(len(graph.nodes), 4)
+        self.assertEqual(len(graph.graph.vs), 4)
+        self.assertEqual(len(graph.graph.es), 0)
+
+    def test_graphFromArrays(self):
+        node_types = np.array([0, 0, 1, 2])
+        node_attributes = {"Name": np.array(["Node1", "Node2", "Node3", "Node4"])}
+        edge_attributes = {"Weight": np.array([20, 10])}
+        hetGraphObject = HetGraph.from_arrays(node_types, [0, 1], [2, 3], edge_types=[0, 1], node_attributes=node_attributes, edge_attributes=edge_attributes,
+                                              node_type_labels=["MockType1", "MockType2", "MockType3"], edge_type_labels=["MockEdgeType1", "MockEdgeType2"])
+
+        self.assertEqual(len(hetGraphObject.graph.vs), 4)
+        self.assertEqual(len(hetGraphObject.graph.es), 2)
+        self.assertEqual(hetGraphObject.graph.is_directed(), False)
+        self.assertEqual(hetGraphObject.graph.degree(), [1,1,1,1])
+        self.assertEqual(hetGraphObject.node_types, {"MockType1", "MockType2", "MockType3"})
+        self.assertEqual(hetGraphObject.edge_types, {"MockEdgeType1", "MockEdgeType2"})
+        self.assertEqual(hetGraphObject.graph.vs["Name"], ["Node1", "Node2", "Node3", "Node4"])
+        self.assertEqual(hetGraphObject.graph.es["Weight"], [20, 10])
+
+        # node and edge objects are created on first access
+        self.assertEqual(hetGraphObject.nodes[2].type, "MockType2")
+        self.assertEqual(hetGraphObject.nodes[3].attributes["Name"], "Node4")
+        self.assertEqual(hetGraphObject.edges[1].type, "MockEdgeType2")
+        self.assertEqual(hetGraphObject.edges[1].attributes["Weight"], 10)
+        self.assertEqual(hetGraphObject.find_edge(hetGraphObject.nodes[0], hetGraphObject.nodes[2]), hetGraphObject.edges[0])
+
+    def test_graphFromArraysWithPathDefinitions(self):
+        edge_type_mappings = [(("MockType1","MockType2"), "EdgeType1"),(("MockType1","MockType3"), "EdgeType2")]
+        paths = HetPaths(edge_type_mappings)
+        graph = HetGraph.from_arrays(["MockType1","MockType1","MockType2","MockType3"], [0, 1], [2, 3], node_ids=["a", "b", "c", "d"], directed=True, path_list=paths)
+
+        self.assertEqual(graph.graph.es["Type"], ["EdgeType1", "EdgeType2"])
+        self.assertEqual(graph.graph.is_directed(), True)
+        self.assertEqual([node.id for node in graph.nodes], ["a", "b", "c", "d"])
+        self.assertEqual(graph.edges[0].source.id, "a")
+        self.assertEqual(graph.edges[0].directed, True)
+
+        with self.assertRaises(Exception) as context:
+            HetGraph.from_arrays(["MockType1","MockType1","MockType2","MockType3"], [0, 1], [2, 3], edge_types=["EdgeType1", "InvalidEdgeType"], path_list=paths)
+
+        self.assertTrue("Some defined edge types do not match the defined paths" in str(context.exception))
+
+    def test_graphFromArraysWithMismatchingLengths(self):
+        with self.assertRaises(Exception) as context:
+            HetGraph.from_arrays(["MockType1","MockType2"], [0, 1], [1])
+
+        self.assertTrue("Got 2 edge sources but 1 edge targets" in str(context.exception))
+
+    def test_emptyMutationsOnGraphFromArrays(self):
+        graph = HetGraph.from_arrays(["MockType1", "MockType2"], [0], [1])
+        graph.add_nodes([])
+        graph.add_edges([])
+        self.assertEqual(graph.version, 0)
+
+        new_node = Node("MockType1")
+        graph.add_nodes([new_node])
+        graph.add_edges([Edge(new_node, graph.nodes[1], False, "EdgeType1")])
+        self.assertEqual(len(graph.nodes), 3)
+        self.assertEqual(len(graph.edges), 2)
+        self.assertEqual(graph.graph.ecount(), 2)
+
+    def test_indexConsistencyAfterDeletion(self):
+        nodes = [Node("MockType1"),Node("MockType1"),Node("MockType2"),Node("MockType3"),Node("MockType2")]
+        edges = [Edge(nodes[0],nodes[2],False,"MockEdgeType1"), Edge(nodes[1], nodes[3],False,"MockEdgeType2"), Edge(nodes[1], nodes[4],False,"MockEdgeType1")]
+        hetGraph = HetGraph(nodes, edges)
+
+        hetGraph.delete_node(hetGraph.nodes[0])
+        hetGraph.delete_edge(hetGraph.edges[0])
+
+        for node in hetGraph.nodes:
+            vertex = hetGraph._mapNodeToIGraphVertex(node)
+            self.assertEqual(vertex["Type"], node.type)
+            self.assertIs(hetGraph._mapIGraphVertexToNode(vertex), node)
+
+        remaining_edge = hetGraph.find_edge(nodes[1], nodes[4])
+        self.assertEqual(remaining_edge, hetGraph.edges[0])
+        self.assertEqual(hetGraph._mapEdgeToIGraphEdge(remaining_edge).index, 0)
+        self.assertIsNone(hetGraph.find_edge(nodes[1], nodes[3]))
+
+    def test_deletionCompaction(self):
+        nodes = [Node("MockType1"),Node("MockType1"),Node("MockType2"),Node("MockType3"),Node("MockType2")]
+        edges = [Edge(nodes[0],nodes[2],False,"MockEdgeType1"), Edge(nodes[1], nodes[3],False,"MockEdgeType2"), Edge(nodes[1], nodes[4],False,"MockEdgeType1")]
+        hetGraph = HetGraph(nodes, edges, copy=False)
+        mock_type3_node, untouched_edge = nodes[3], edges[1]
+
+        # deletions below the threshold are only marked
+        hetGraph.delete_node(nodes[0])
+        self.assertEqual(hetGraph._graph.vcount(), 5)
+        self.assertEqual(hetGraph._graph.ecount(), 3)
+        self.assertEqual(hetGraph.get_node_type_dist(), {"MockType1": 1, "MockType2": 2, "MockType3": 1})
+        self.assertEqual(hetGraph.get_edge_type_dist(pdf=True), {"MockEdgeType1": 0.5, "MockEdgeType2": 0.5})
+        self.assertIsNone(hetGraph.find_edge(nodes[0], nodes[2]))
+
+        # accessing the graph compacts it and remaps all positions
+        self.assertEqual(hetGraph.graph.vcount(), 4)
+        self.assertEqual(hetGraph.graph.ecount(), 2)
+        self.assertEqual(nodes, hetGraph.nodes)
+        self.assertEqual([node.type for node in hetGraph.get_nodes_of_type("MockType2")], ["MockType2", "MockType2"])
+        self.assertEqual(len(nodes), 4)
+        self.assertEqual(hetGraph._mapNodeToIGraphVertex(mock_type3_node).index, 2)
+        self.assertEqual(hetGraph._mapEdgeToIGraphEdge(untouched_edge).index, 0)
+
+        # deleting more than the threshold compacts immediately
+        hetGraph.delete_edges([edges[0], edges[1]])
+        self.assertEqual(hetGraph._graph.ecount(), 0)
+        self.assertEqual(hetGraph.get_edge_type_dist(), {})
+
+    def test_batchMutations(self):
+        hetGraph = createHetGraphWithPathDefinitions()
+        new_nodes = [Node("MockType1", {"Name": "Node5"}), Node("MockType2"), Node("MockType3")]
+        removed_edge = Edge(new_nodes[0], new_nodes[2], False)
+
+        with hetGraph.batch():
+            for node in new_nodes:
+                hetGraph.add_node(node)
+            hetGraph.add_edge(Edge(new_nodes[0], new_nodes[1], False))
+            hetGraph.add_edge(removed_edge)
+            hetGraph.delete_edge(removed_edge)
+            hetGraph.delete_node(new_nodes[2])
+            # nothing is applied before the end of the batch
+            self.assertEqual(hetGraph._graph.vcount(), 4)
+
+        self.assertEqual(len(hetGraph.nodes), 6)
+        self.assertEqual(hetGraph.graph.vs["Type"][4:], ["MockType1", "MockType2"])
+        self.assertEqual(hetGraph.graph.es["Type"], ["EdgeType1", "EdgeType2", "EdgeType1"])
+        self.assertEqual(hetGraph.find_edge(new_nodes[0], new_nodes[1]).type, "EdgeType1")
+        self.assertIsNone(hetGraph.find_edge(new_nodes[0], new_nodes[2]))
+
+    def test_graphVersion(self):
+        hetGraph = createHetGraphWithPathDefinitions()
+        self.assertEqual(hetGraph.version, 0)
+
+        new_node = Node("MockType2")
+        mutations = [lambda: hetGraph.add_node(new_node), lambda: hetGraph.add_edge(Edge(hetGraph.nodes[0], new_node, False)),
+                     lambda: hetGraph.delete_node(new_node), lambda: hetGraph.add_path((("MockType2", "MockType3"), "EdgeType3"))]
+        for mutation in mutations:
+            version = hetGraph.version
+            mutation()
+            self.assertGreater(hetGraph.version, version)
+
+        version = hetGraph.version
+        with self.assertRaises(Exception):
+            hetGraph.delete_node(new_node)
+        hetGraph.compact()
+        self.assertEqual(hetGraph.version, version)
+
+        class EdgeListener:
+            def __init__(self):
+                self.deleted = []
+            def on_edges_added(self, edges):
+                pass
+            def on_edges_deleted(self, edges):
+                self.deleted.append(edges)
+            def on_paths_changed(self):
+                pass
+        listener = EdgeListener()
+        hetGraph.add_listener(listener)
+        isolated_node = Node("MockType2")
+        hetGraph.add_node(isolated_node)
+        version = hetGraph.version
+        hetGraph.delete_node(isolated_node)
+        self.assertEqual(hetGraph.version, version + 1)
+        self.assertEqual(listener.deleted, [])
+
+    def test_sparseRelations(self):
+        hetGraph = createHetGraphWithPathDefinitions()
+        nodes = hetGraph.nodes
+        hetGraph.add_edge(Edge(nodes[0], nodes[2], False, "EdgeType1"))
+
+        relations = hetGraph.to_sparse()
+        self.assertEqual(set(relations), {("MockType1", "EdgeType1", "MockType2"), ("MockType1", "EdgeType2", "MockType3")})
+        matrix, row_ids, column_ids = relations[("MockType1", "EdgeType1", "MockType2")]
+        self.assertEqual(matrix.format, "csr")
+        self.assertEqual(matrix.toarray().tolist(), [[2], [0]])
+        self.assertEqual(row_ids.tolist(), [nodes[0].id, nodes[1].id])
+        self.assertEqual(column_ids.tolist(), [nodes[2].id])
+
+        self.assertEqual(list(hetGraph.to_sparse(edge_type="EdgeType2")), [("MockType1", "EdgeType2", "MockType3")])
+        self.assertEqual(hetGraph.to_sparse(node_types=("MockType2", "MockType1")), {})
+        self.assertEqual(hetGraph.to_sparse(format="csc")[("MockType1", "EdgeType2", "MockType3")][0].format, "csc")
+        self.assertIs(hetGraph.to_sparse()[("MockType1", "EdgeType1", "MockType2")][0], matrix)
+
+        hetGraph.delete_edge(hetGraph.edges[0])
+        matrix, _, _ = hetGraph.to_sparse()[("MockType1", "EdgeType1", "MockType2")]
+        self.assertEqual(matrix.toarray().tolist(), [[1], [0]])
+
+    def test_sparseRelationsOnGraphFromArrays(self):
+        graph = HetGraph.from_arrays(["MockType1", "MockType2", "MockType1"], [0, 2], [1, 1], edge_types=["EdgeType1", "EdgeType1"], directed=True)
+        matrix, row_ids, column_ids = graph.to_sparse()[("MockType1", "EdgeType1", "MockType2")]
+        self.assertIsNone(graph._nodes)
+        self.assertEqual(matrix.toarray().tolist(), [[1], [1]])
+        self.assertEqual(row_ids.tolist(), [graph.nodes[0].id, graph.nodes[2].id])
+        self.assertEqual(column_ids.tolist(), [graph.nodes[1].id])
+
+    def test_batchMutationsRollback(self):
+        hetGraph = createHetGraphWithPathDefinitions()
+        new_node = Node("MockType2")
+
+        with self.assertRaises(Exception) as context:
+            with hetGraph.batch():
+                hetGraph.add_node(new_node)
+                hetGraph.add_edge(Edge(hetGraph.nodes[0], new_node, False))
+                hetGraph.delete_node(new_node)
+                hetGraph.add_edge(Edge(hetGraph.nodes[0], new_node, False))
+
+        self.assertTrue("One of the nodes you are trying to connect does not exist in the graph." in str(context.exception))
+        self.assertEqual(len(hetGraph.nodes), 4)
+        self.assertEqual(len(hetGraph.graph.vs), 4)
+        self.assertEqual(len(hetGraph.graph.es), 2)
+        self.assertEqual(hetGraph.get_node_type_dist(), {"MockType1": 2, "MockType2": 1, "MockType3": 1})
+
+    def test_addExistingNodeToGraph(self):
+        hetGraph = createSimpleMockHetGraph()
+
+        with self.assertRaises(Exception) as context:
+            hetGraph.add_node(hetGraph.nodes[0])
+
+        self.assertTrue(f"The graph already contains a node with the id {hetGraph.nodes[0].id}" in str(context.exception))
+        self.assertEqual(len(hetGraph.graph.vs), 4)
+
     def test_networkSchemaPlottingTerminal(self):
         nodes = [Node("MockType1"),Node("MockType1"),Node("MockType2"),Node("MockType3")]
         edges = [Edge(nodes[0],nodes[2],False,"EdgeType1"), Edge(nodes[1], nodes[3],False)]